@@ -5,6 +5,8 @@ import hashlib
 import base64
 import secrets
 
+from model_layer.canonical import canonical_bytes
+
 MAX_PAYLOAD = 64 * 1024
 SERVER_VERSION = "coord-v2-1"
 
@@ -17,7 +19,8 @@ def _canonicalize_request(obj: dict) -> bytes:
     for k in sorted([k for k in ("version", "client_nonce", "payload", "meta") if k in obj]):
         canonical[k] = obj[k]
     # JSON canonicalization: separators without spaces, sorted keys already applied
-    return json.dumps(canonical, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    # (nested objects keep their key order, as they always have)
+    return canonical_bytes(canonical, ensure_ascii=False, sort_keys=False)
 
 
 @app.post("/coord/v2")
@@ -5,28 +5,62 @@ Usage examples:
   echo '{"prompt": "Confirm readiness in one sentence."}' | python llm-cli/llm.py --json
   python llm-cli/llm.py --json --input-file tests/data/sample.json
   python llm-cli/llm.py "Hello"            # non-json mode
+  python llm-cli/llm.py --jsonl --concurrency 8 < prompts.jsonl   # batch, one result line per input
+  echo '{"prompt": "Hi"}' | python llm-cli/llm.py --json --stream   # NDJSON token/done events
+  python llm-cli/llm.py serve --cache &                      # resident daemon on a Unix socket
+  LLM_SOCKET=/run/user/1000/llm-cli.sock python llm-cli/llm.py --json < req.json   # forward to it
+  python llm-cli/llm.py --json --cache --cache-ttl 86400 < req.json # reuse identical guarded answers
+  OLLAMA_URLS=http://box1:11434,http://box2:11434 python llm-cli/llm.py --jsonl < prompts.jsonl   # spread over endpoints
+
+Library use: `call_llm` routes through a shared, pooled `llm_client.LLMClient`
+(keep-alive connections, safe to share across threads); pass `client=` to use
+one with custom timeouts or pool size. With several endpoints configured
+(`OLLAMA_URLS` or repeated `--endpoint`), clients are wrapped in an
+`llm_router.RoutingClient` that prefers endpoints with the model already
+loaded, then the least busy one, and sidelines endpoints that keep failing.
+Identical non-streaming requests in flight at the same time (same model,
+prompt and options) share one upstream call; each caller still gets its own
+request_id and audit entry, flagged `coalesced`. Generation calls are
+idempotent, so transient failures are retried under `RETRY_POLICY` (bounded,
+jittered exponential backoff, optional total deadline that also caps the
+connect/read timeouts); every attempt is listed in the audit entry.
+
+Cold start: only cheap stdlib modules are imported at load time. `requests`,
+`uuid`, `datetime`, the cache and the daemon transport are imported on first
+use, and one-shot CLI calls go through the stdlib `http.client` backend, so
+`--help`, input validation errors and thin-client calls never load the HTTP
+stack. `startup_bench.py` guards the import budget.
 """
 
 import argparse
-import hashlib
 import json
+import os
 import sys
+import threading
 import time
-import uuid
-from datetime import datetime
 
-import requests
-from pathlib import Path
+from llm_client import (LLMClient, RetryPolicy, StdlibClient, DEFAULT_CONNECT_TIMEOUT, DEFAULT_POOL_SIZE,
+                        DEFAULT_READ_TIMEOUT, capped_timeout, retryable)
 
 OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
 
-AUDIT_PATH = Path(__file__).parent / "audit.log"
+AUDIT_PATH = os.environ.get("LLM_AUDIT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit.log"))
+CACHE_DIR = os.environ.get("LLM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "llm-cli"))
 STDIN_BUFFER = None
 
+# Transient failures (connection errors, timeouts, 429/5xx) are retried with
+# jittered backoff; main() replaces this from --retries/--retry-backoff/--deadline.
+RETRY_POLICY = RetryPolicy()
+
+_audit_lock = threading.Lock()
+
+
 def write_audit(entry: dict):
-    # Minimal, append-only audit trail.
-    with AUDIT_PATH.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    # Minimal, append-only audit trail. Serialized so concurrent batch workers
+    # never interleave partial lines.
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    with _audit_lock, open(AUDIT_PATH, "a", encoding="utf-8") as f:
+        f.write(line)
 
 SYSTEM_GUARD = (
     "You are a local inference worker. "
@@ -40,40 +74,252 @@ class LLMError(Exception):
     pass
 
 
-def call_llm(prompt, model="gemma:2b", stream=False):
-    payload = {
-        "model": model,
-        "system": SYSTEM_GUARD,
-        "prompt": prompt,
-        "stream": stream,
-    }
+class Singleflight:
+    """Collapse concurrent calls that share a key into one execution.
 
-    r = requests.post(OLLAMA_URL, json=payload, stream=stream)
-    r.raise_for_status()
+    `do(key, fn)` runs `fn()` unless a call with the same key is already in
+    flight, in which case it waits for that call and shares its result (or its
+    exception). Returns `(result, shared)`; nothing is remembered afterwards.
+    """
 
-    if not stream:
-        return r.json().get("response")
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
 
-    # Simple streaming loop
-    out_lines = []
-    for line in r.iter_lines():
-        if line:
-            data = json.loads(line)
-            if data.get("response"):
-                out_lines.append(data["response"])
-            if data.get("done"):
-                break
-    return "".join(out_lines)
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = fn()
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"], False
+
+
+# Identical non-streaming requests in flight at once share one upstream call.
+_inflight = Singleflight()
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def configured_endpoints(endpoints=None):
+    """Endpoints from --endpoint flags, else OLLAMA_URLS (comma-separated), else OLLAMA_URL."""
+    spec = ",".join(endpoints) if endpoints else os.environ.get("OLLAMA_URLS")
+    if not spec:
+        return [OLLAMA_URL]
+    from llm_router import parse_endpoints
+
+    return parse_endpoints(spec) or [OLLAMA_URL]
+
+
+def route(clients):
+    """A single endpoint is used directly; several are spread over by a RoutingClient."""
+    if len(clients) == 1:
+        return clients[0]
+    from llm_router import RoutingClient
+
+    return RoutingClient(clients)
+
+
+def get_client():
+    """Return the process-wide pooled client, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = route([LLMClient(url) for url in configured_endpoints()])
+    return _default_client
+
+
+def _deadline_timeout(client, remaining):
+    """Cap the client's (connect, read) timeouts at the remaining deadline budget.
+
+    A RoutingClient has no timeouts of its own: it is handed the budget and
+    caps the timeouts of whichever endpoint client serves the call.
+    """
+    if remaining is None:
+        return {}
+    timeout = getattr(client, "timeout", None)
+    if timeout is None:
+        return {"remaining": remaining}
+    return {"timeout": capped_timeout(timeout, remaining)}
+
+
+def call_llm(prompt, model="gemma:2b", stream=False, client=None, options=None, timings=None, retry=None, attempts=None):
+    """Call the model, retrying transient failures per `retry` (default RETRY_POLICY).
+
+    `attempts`, if given, receives one record per attempt; on failure the
+    records are also available as the exception's `attempts` attribute.
+    """
+    client = client or get_client()
+    attempts = [] if attempts is None else attempts
+
+    def attempt(remaining):
+        return client.generate(prompt, model=model, system=SYSTEM_GUARD, stream=stream, options=options,
+                               timings=timings, **_deadline_timeout(client, remaining))
+
+    try:
+        return (retry or RETRY_POLICY).call(attempt, attempts)
+    except Exception as e:
+        e.attempts = attempts
+        raise
 
 
 def sha256_hex(s: str) -> str:
+    import hashlib
+
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
+def utc_now() -> str:
+    from datetime import datetime
+
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def stream_llm(prompt, model="gemma:2b", on_token=None, client=None, options=None, timings=None, retry=None, attempts=None):
+    """Stream a completion, calling `on_token(text)` for each chunk as it arrives.
+
+    Returns (response, metrics); metrics hold time to first token, total time and
+    generation throughput (from Ollama's eval counters when it reports them).
+    A `timings` dict, if given, receives the client's latency breakdown.
+    Failures are retried as in `call_llm`, but only before the first token.
+    """
+    client = client or get_client()
+    attempts = [] if attempts is None else attempts
+    start = time.perf_counter()
+    first = None
+    parts = []
+    final = {}
+
+    def attempt(remaining):
+        nonlocal first, final
+        chunks = client.stream_generate(prompt, model=model, system=SYSTEM_GUARD, options=options, timings=timings,
+                                        **_deadline_timeout(client, remaining))
+        for data in chunks:
+            text = data.get("response")
+            if text:
+                if first is None:
+                    first = time.perf_counter()
+                parts.append(text)
+                if on_token is not None:
+                    on_token(text)
+            if data.get("done"):
+                final = data
+
+    try:
+        # Once a token has reached the caller the output cannot be taken back.
+        (retry or RETRY_POLICY).call(attempt, attempts, retry_on=lambda e: first is None and retryable(e))
+    except Exception as e:
+        e.attempts = attempts
+        raise
+    end = time.perf_counter()
+
+    tokens = final.get("eval_count", len(parts))
+    if final.get("eval_duration"):
+        tokens_per_sec = tokens / (final["eval_duration"] / 1e9)
+    elif first is not None and end > first:
+        tokens_per_sec = tokens / (end - first)
+    else:
+        tokens_per_sec = None
+
+    metrics = {
+        "ttft_ms": round((first - start) * 1000, 3) if first is not None else None,
+        "total_ms": round((end - start) * 1000, 3),
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens_per_sec, 3) if tokens_per_sec is not None else None,
+    }
+    return "".join(parts), metrics
+
+
+def cache_key(model: str, prompt_hash: str, options=None) -> str:
+    # Everything that can change the model output must be part of the key.
+    material = {
+        "model": model,
+        "system_hash": sha256_hex(SYSTEM_GUARD),
+        "prompt_hash": prompt_hash,
+        "options": options or {},
+    }
+    return sha256_hex(json.dumps(material, sort_keys=True, separators=(",", ":")))
+
+
+def cached_call(prompt, model, *, prompt_hash=None, options=None, client=None, cache=None, timings=None,
+                coalesce=True, attempts=None):
+    """Non-streaming call served from `cache` when possible.
+
+    Returns (response, cache_hit, coalesced). With `coalesce`, callers asking
+    the same question while an identical call is in flight wait for it instead
+    of going upstream; they get its response and a copy of its `timings` and
+    `attempts`. Both are only filled when the model is actually called.
+    """
+    key = cache_key(model, prompt_hash or sha256_hex(prompt), options)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True, False
+
+    def upstream():
+        measured, tries = {}, []
+        response = call_llm(prompt, model=model, stream=False, client=client, options=options, timings=measured,
+                            attempts=tries)
+        if cache is not None and response is not None:
+            try:
+                cache.put(key, response, model=model)
+            except Exception:
+                # A full or read-only cache must not fail the call
+                pass
+        return response, measured, tries
+
+    if coalesce:
+        (response, measured, tries), coalesced = _inflight.do(key, upstream)
+    else:
+        (response, measured, tries), coalesced = upstream(), False
+    if timings is not None:
+        timings.update(measured)
+    if attempts is not None:
+        attempts.extend(dict(a) for a in tries)
+    return response, False, coalesced
+
+
+def format_timings(timings) -> str:
+    """One-line human summary of a latency breakdown (see llm_client)."""
+    if not timings:
+        return "timings: n/a (served from cache)"
+    t = timings
+    parts = [f"connect {t.get('connect_ms', 0):.1f}ms", f"ttfb {t.get('ttfb_ms', 0):.1f}ms", f"total {t.get('total_ms', 0):.1f}ms"]
+    if "load_ms" in t:
+        parts.append(f"load {t['load_ms']:.1f}ms")
+    if "prompt_eval_ms" in t:
+        parts.append(f"prompt {t.get('prompt_eval_count', 0)} tok/{t['prompt_eval_ms']:.1f}ms")
+    if "eval_ms" in t:
+        rate = t.get("eval_count", 0) / (t["eval_ms"] / 1000) if t["eval_ms"] else 0.0
+        parts.append(f"eval {t.get('eval_count', 0)} tok/{t['eval_ms']:.1f}ms ({rate:.1f} tok/s)")
+    if "overhead_ms" in t:
+        parts.append(f"overhead {t['overhead_ms']:.1f}ms")
+    return "timings: " + " | ".join(parts)
+
+
 def make_metadata(prompt: str, model: str):
+    import uuid
+
     return {
         "request_id": str(uuid.uuid4()),
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": utc_now(),
         "model": model,
         "prompt_hash": sha256_hex(prompt),
         "prompt_len": len(prompt),
@@ -113,57 +359,426 @@ def json_input_from_args(args):
     raise LLMError("no JSON input provided (stdin, --input-file, or prompt)")
 
 
-def handle_json_mode(args):
-    data = json_input_from_args(args)
+def client_from_args(args, pooled=False):
+    """One-shot calls use the import-free stdlib backend; batch and daemon use the pool."""
+    urls = configured_endpoints(args.endpoint)
+    if not pooled:
+        return route([StdlibClient(url, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout) for url in urls])
 
+    # Batch mode needs at least one pooled connection per in-flight request.
+    pool_size = max(args.pool_size, args.concurrency) if args.jsonl else args.pool_size
+    return route([
+        LLMClient(url, pool_size=pool_size, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+        for url in urls
+    ])
+
+
+def validate_request(data):
     if not isinstance(data, dict) or "prompt" not in data:
         raise LLMError("JSON input must be an object with a 'prompt' string field")
 
     if not isinstance(data["prompt"], str):
         raise LLMError("'prompt' field must be a string")
 
-    prompt = data["prompt"]
-    model = args.model
+    if data.get("options") is not None and not isinstance(data["options"], dict):
+        raise LLMError("'options' field must be an object")
+
+    return data["prompt"]
+
+
+def run_request(data, model, client=None, mode="json", cache=None):
+    """Validate one JSON request object, call the model and audit the success."""
+    prompt = validate_request(data)
 
     meta = make_metadata(prompt, model)
 
-    # Call LLM (non-streaming for JSON mode)
-    response = call_llm(prompt, model=model, stream=False)
+    timings = {}
+    attempts = []
+    response, cache_hit, coalesced = cached_call(
+        prompt, model, prompt_hash=meta["prompt_hash"], options=data.get("options"), client=client, cache=cache,
+        timings=timings, attempts=attempts,
+    )
+    if timings:
+        meta["timings"] = timings
 
     out = {
         "request": meta,
         "response": response,
         "status": "ok",
+        "cache_hit": cache_hit,
+        "coalesced": coalesced,
     }
 
-    # Audit success
+    audit_success(meta, mode, cache_hit=cache_hit, coalesced=coalesced, attempts=attempts,
+                  **({"timings": timings} if timings else {}))
+    return out
+
+
+def run_stream_request(data, model, emit, client=None, mode="json-stream"):
+    """Validate one JSON request and stream it as NDJSON events via `emit`.
+
+    Emits `{"event": "token", "text": ...}` per chunk as it arrives, then a
+    `{"event": "done", ...}` object carrying metadata (with streaming metrics)
+    and the full response.
+    """
+    prompt = validate_request(data)
+
+    meta = make_metadata(prompt, model)
+
+    timings = {}
+    attempts = []
+    response, metrics = stream_llm(
+        prompt, model, on_token=lambda text: emit({"event": "token", "text": text}),
+        client=client, options=data.get("options"), timings=timings, attempts=attempts,
+    )
+    meta.update(metrics)
+    meta["timings"] = timings
+
+    out = {
+        "event": "done",
+        "request": meta,
+        "response": response,
+        "status": "ok",
+    }
+
+    audit_success(meta, mode, ttft_ms=metrics["ttft_ms"], tokens_per_sec=metrics["tokens_per_sec"], timings=timings,
+                  attempts=attempts)
+    emit(out)
+    return out
+
+
+def audit_success(meta, mode, **extra):
     try:
-        write_audit({
-            "ts": datetime.utcnow().isoformat() + "Z",
+        write_audit(dict({
+            "ts": utc_now(),
+            "request_id": meta.get("request_id"),
             "prompt_hash": meta.get("prompt_hash"),
-            "model": model,
-            "mode": "json",
+            "model": meta.get("model"),
+            "mode": mode,
             "ok": True,
-        })
+        }, **extra))
     except Exception:
         # Audit must not break CLI
         pass
 
-    print(json.dumps(out, ensure_ascii=False))
+
+def audit_failure(prompt_hash, model, mode, error):
+    entry = {
+        "ts": utc_now(),
+        "prompt_hash": prompt_hash,
+        "model": model,
+        "mode": mode,
+        "ok": False,
+        "error": str(error),
+    }
+    if getattr(error, "attempts", None):
+        entry["attempts"] = error.attempts
+    try:
+        write_audit(entry)
+    except Exception:
+        pass
+
+
+def cache_from_args(args):
+    if not args.cache:
+        return None
+    from llm_cache import ResponseCache
+
+    return ResponseCache(
+        args.cache_dir,
+        max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        ttl=args.cache_ttl,
+    )
+
+
+def emit_ndjson(obj):
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def report_timings(args, out, label=None):
+    """With --timings, print the latency summary of a successful result to stderr."""
+    if not getattr(args, "timings", False) or out.get("status") != "ok":
+        return
+    line = format_timings(out.get("request", {}).get("timings"))
+    print(f"[{label}] {line}" if label is not None else line, file=sys.stderr, flush=True)
+
+
+def handle_json_mode(args, client=None, cache=None):
+    data = json_input_from_args(args)
+    if args.stream:
+        out = run_stream_request(data, args.model, emit_ndjson, client=client)
+    else:
+        out = run_request(data, args.model, client=client, cache=cache)
+        print(json.dumps(out, ensure_ascii=False))
+    report_timings(args, out)
+
+
+def jsonl_lines_from_args(args):
+    # Priority: --input-file -> stdin; lines are consumed lazily so large batches stream.
+    if args.input_file:
+        try:
+            fh = open(args.input_file, "r", encoding="utf-8")
+        except Exception as e:
+            raise LLMError(f"failed to read input file: {e}")
+        with fh:
+            yield from fh
+        return
+
+    if not sys.stdin.isatty():
+        yield from sys.stdin
+        return
+
+    raise LLMError("no JSONL input provided (stdin or --input-file)")
+
+
+def run_batch_record(index, line, model, client=None, cache=None):
+    """Process one JSONL record; failures become error result lines, never exceptions."""
+    prompt_hash = None
+    try:
+        try:
+            data = json.loads(line)
+        except Exception as e:
+            raise LLMError(f"failed to parse JSON record: {e}")
+        if isinstance(data, dict) and isinstance(data.get("prompt"), str):
+            prompt_hash = sha256_hex(data["prompt"])
+        out = run_request(data, model, client=client, mode="jsonl", cache=cache)
+    except Exception as e:
+        audit_failure(prompt_hash, model, "jsonl", e)
+        out = {"status": "error", "message": str(e)}
+
+    out["index"] = index
+    return out
+
+
+def handle_jsonl_mode(args, client=None, cache=None, process=None):
+    """Run many `{"prompt": ...}` records with at most `--concurrency` calls in flight.
+
+    One result line is written per non-blank input line, in input order unless
+    `--unordered` is given (completion order). `process(index, line)` produces a
+    record's result (default: call the model here). Returns the number of failed records.
+    """
+    if process is None:
+        def process(index, line):
+            return run_batch_record(index, line, args.model, client, cache)
+
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    concurrency = args.concurrency
+    if concurrency < 1:
+        raise LLMError("--concurrency must be >= 1")
+    # Bound buffered-but-unwritten results so memory stays flat on long inputs.
+    window = concurrency * 2
+    failures = 0
+
+    def emit(out):
+        nonlocal failures
+        if out.get("status") != "ok":
+            failures += 1
+        sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+        report_timings(args, out, out.get("index"))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        pending = deque()
+        index = 0
+        for line in jsonl_lines_from_args(args):
+            if not line.strip():
+                continue
+            pending.append(ex.submit(process, index, line))
+            index += 1
+            while len(pending) >= window:
+                if args.unordered:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in [f for f in pending if f in done]:
+                        pending.remove(fut)
+                        emit(fut.result())
+                else:
+                    emit(pending.popleft().result())
+
+        if args.unordered:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in [f for f in pending if f in done]:
+                    pending.remove(fut)
+                    emit(fut.result())
+        else:
+            while pending:
+                emit(pending.popleft().result())
+
+    return failures
+
+
+def handle_daemon_request(req, emit, *, model, client=None, cache=None):
+    """Serve one request forwarded over the daemon socket (same contract as --json)."""
+    prompt_hash = None
+    stream = isinstance(req, dict) and bool(req.get("stream"))
+    mode = "daemon-stream" if stream else "daemon"
+    try:
+        if isinstance(req, dict) and isinstance(req.get("prompt"), str):
+            prompt_hash = sha256_hex(req["prompt"])
+        req_model = req.get("model", model) if isinstance(req, dict) else model
+        if not isinstance(req_model, str):
+            raise LLMError("'model' field must be a string")
+        if stream:
+            run_stream_request(req, req_model, emit, client=client, mode=mode)
+        else:
+            emit(run_request(req, req_model, client=client, mode=mode, cache=cache))
+    except Exception as e:
+        audit_failure(prompt_hash, model, mode, e)
+        emit({"status": "error", "message": str(e)})
+
+
+def run_daemon(args, client, cache):
+    from llm_daemon import DaemonServer, default_socket_path
+
+    path = args.socket or default_socket_path()
+
+    def dispatch(req, emit):
+        handle_daemon_request(req, emit, model=args.model, client=client, cache=cache)
+
+    server = DaemonServer(path, dispatch)
+    print(json.dumps({"status": "serving", "socket": path}), file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def forward_request(daemon, req, emit):
+    """Send one request to the daemon, passing every reply to `emit`; returns the terminal reply."""
+    reply = None
+    try:
+        for reply in daemon.request(req):
+            emit(reply)
+    except OSError as e:
+        raise LLMError(f"llm daemon unavailable at {daemon.path}: {e}")
+    if reply is None:
+        raise LLMError("daemon closed connection")
+    return reply
+
+
+def handle_forwarded(args, daemon):
+    """Thin client mode: the daemon does metadata, caching, the model call and auditing."""
+    if args.jsonl:
+        if args.stream or args.json:
+            raise LLMError("--jsonl cannot be combined with --stream or --json")
+
+        def process(index, line):
+            try:
+                data = json.loads(line)
+            except Exception as e:
+                out = {"status": "error", "message": f"failed to parse JSON record: {e}"}
+                audit_failure(None, args.model, "jsonl", out["message"])
+            else:
+                req = dict(data, model=args.model) if isinstance(data, dict) else data
+                try:
+                    out = forward_request(daemon, req, lambda reply: None)
+                except Exception as e:
+                    # The daemon never saw the record, so it is audited here.
+                    prompt = data.get("prompt") if isinstance(data, dict) else None
+                    audit_failure(sha256_hex(prompt) if isinstance(prompt, str) else None, args.model, "jsonl", e)
+                    out = {"status": "error", "message": str(e)}
+            out["index"] = index
+            return out
+
+        failures = handle_jsonl_mode(args, process=process)
+        sys.exit(2 if failures else 0)
+
+    if args.json:
+        data = json_input_from_args(args)
+        if not isinstance(data, dict):
+            raise LLMError("JSON input must be an object with a 'prompt' string field")
+        out = forward_request(daemon, dict(data, model=args.model, stream=args.stream), emit_ndjson if args.stream else lambda reply: None)
+        if out.get("status") != "ok":
+            print(json.dumps(out), file=sys.stderr)
+            sys.exit(2)
+        if not args.stream:
+            print(json.dumps(out, ensure_ascii=False))
+        report_timings(args, out)
+        return
+
+    if not args.prompt:
+        print("No prompt provided.", file=sys.stderr)
+        sys.exit(1)
+
+    def echo(reply):
+        if reply.get("event") == "token":
+            sys.stdout.write(reply["text"])
+            sys.stdout.flush()
+
+    out = forward_request(daemon, {"prompt": " ".join(args.prompt), "model": args.model, "stream": args.stream}, echo)
+    if out.get("status") != "ok":
+        print(json.dumps(out), file=sys.stderr)
+        sys.exit(2)
+    print("" if args.stream else out["response"])
+    report_timings(args, out)
+
+
+def _failed_prompt_hash(args):
+    """Best-effort prompt_hash for the audit entry of a failed one-shot run."""
+    try:
+        if getattr(args, "json", False):
+            return sha256_hex(json_input_from_args(args).get("prompt", ""))
+        if getattr(args, "prompt", None):
+            return sha256_hex(" ".join(args.prompt))
+    except Exception:
+        pass
+    return None
+
+
+def _mode_of(args):
+    if getattr(args, "jsonl", False):
+        return "jsonl"
+    return "json" if getattr(args, "json", False) else "text"
 
 
 def main():
     ap = argparse.ArgumentParser(prog="llm")
     ap.add_argument("prompt", nargs="*", help="Prompt text")
     ap.add_argument("-m", "--model", default="gemma:2b")
-    ap.add_argument("--stream", action="store_true", help="Stream responses (not supported with --json)")
+    ap.add_argument("--stream", action="store_true", help="Print tokens as they arrive; with --json, emit NDJSON token/done events")
     ap.add_argument("--json", action="store_true", help="JSON in / JSON out mode: accept JSON via stdin or --input-file and emit JSON")
-    ap.add_argument("--input-file", help="Path to JSON input file")
-    args = ap.parse_args()
+    ap.add_argument("--jsonl", action="store_true", help="Batch mode: read one JSON object per line via stdin or --input-file and emit one JSON result line per input")
+    ap.add_argument("--concurrency", type=int, default=4, help="Maximum in-flight requests in --jsonl mode")
+    ap.add_argument("--unordered", action="store_true", help="In --jsonl mode, write results in completion order instead of input order")
+    ap.add_argument("--input-file", help="Path to JSON (or JSONL with --jsonl) input file")
+    ap.add_argument("--cache", action="store_true", help="Serve identical non-streaming requests from the on-disk response cache")
+    ap.add_argument("--cache-dir", default=str(CACHE_DIR), help="Response cache directory (env LLM_CACHE_DIR)")
+    ap.add_argument("--cache-max-mb", type=float, default=256, help="Evict least-recently-used cache entries beyond this size")
+    ap.add_argument("--cache-ttl", type=float, default=None, help="Seconds before a cached response expires (default: never)")
+    ap.add_argument("--endpoint", action="append", help="Ollama endpoint (base or /api/generate URL); repeat to route across several (env OLLAMA_URLS, comma-separated)")
+    ap.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT, help="Seconds to wait for a connection to Ollama")
+    ap.add_argument("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT, help="Seconds to wait for response data")
+    ap.add_argument("--retries", type=int, default=2, help="Extra attempts after a connection error, timeout, 429 or 5xx")
+    ap.add_argument("--retry-backoff", type=float, default=0.5, help="Base seconds for jittered exponential backoff between attempts")
+    ap.add_argument("--deadline", type=float, default=None, help="Total seconds budget per request across all attempts and backoff (caps connect/read timeouts)")
+    ap.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="Maximum pooled keep-alive connections")
+    ap.add_argument("--timings", action="store_true", help="Print a latency breakdown (connect, first byte, load, prompt eval, generation) to stderr")
+    ap.add_argument("--socket", default=os.environ.get("LLM_SOCKET"), help="Forward requests to a running `llm.py serve` daemon on this Unix socket (env LLM_SOCKET); with serve, the socket to listen on")
+
+    # `llm.py serve [options]` runs the resident daemon instead of a one-shot call.
+    argv = sys.argv[1:]
+    serve = argv[:1] == ["serve"]
+    args = ap.parse_args(argv[1:] if serve else argv)
+
+    if args.retries < 0:
+        ap.error("--retries must be >= 0")
+    if args.deadline is not None and args.deadline <= 0:
+        ap.error("--deadline must be > 0")
+    global RETRY_POLICY
+    RETRY_POLICY = RetryPolicy(args.retries, backoff=args.retry_backoff, deadline=args.deadline)
+
+    if serve:
+        run_daemon(args, client_from_args(args, pooled=True), cache_from_args(args))
+        return
 
     try:
         # Autodetect JSON on stdin if it begins with '{' and --json not provided
-        if not args.json and not sys.stdin.isatty():
+        if not args.json and not args.jsonl and not sys.stdin.isatty():
             raw = sys.stdin.read()
             if raw.strip().startswith("{"):
                 # set buffer for downstream parsing and treat as JSON mode
@@ -171,10 +786,23 @@ def main():
                 STDIN_BUFFER = raw
                 args.json = True
 
+        if args.socket:
+            from llm_daemon import DaemonClient
+
+            handle_forwarded(args, DaemonClient(args.socket))
+            return
+
+        client = client_from_args(args, pooled=args.jsonl)
+        cache = cache_from_args(args)
+
+        if args.jsonl:
+            if args.stream or args.json:
+                raise LLMError("--jsonl cannot be combined with --stream or --json")
+            failures = handle_jsonl_mode(args, client=client, cache=cache)
+            sys.exit(2 if failures else 0)
+
         if args.json:
-            if args.stream:
-                raise LLMError("streaming is not supported with --json mode")
-            handle_json_mode(args)
+            handle_json_mode(args, client=client, cache=cache)
             return
 
         # Non-JSON mode: basic behavior
@@ -183,63 +811,27 @@ def main():
             sys.exit(1)
 
         prompt = " ".join(args.prompt)
+        timings = {}
         if args.stream:
-            call_llm(prompt, model=args.model, stream=True)
+            def echo(text):
+                sys.stdout.write(text)
+                sys.stdout.flush()
+
+            stream_llm(prompt, model=args.model, on_token=echo, client=client, timings=timings)
+            sys.stdout.write("\n")
         else:
-            out = call_llm(prompt, model=args.model, stream=False)
+            out, _, _ = cached_call(prompt, args.model, client=client, cache=cache, timings=timings)
             print(out)
+        if args.timings:
+            print(format_timings(timings), file=sys.stderr)
     except LLMError as e:
-        # Attempt to capture prompt_hash for audit if possible
-        try:
-            prompt_hash = None
-            if args.json:
-                try:
-                    data = json_input_from_args(args)
-                    prompt_hash = sha256_hex(data.get("prompt", ""))
-                except Exception:
-                    prompt_hash = None
-            elif args.prompt:
-                prompt_hash = sha256_hex(" ".join(args.prompt))
-        except Exception:
-            prompt_hash = None
-
-        try:
-            write_audit({
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "prompt_hash": prompt_hash,
-                "model": getattr(args, "model", None),
-                "mode": "json" if getattr(args, "json", False) else "text",
-                "ok": False,
-                "error": str(e),
-            })
-        except Exception:
-            pass
-
+        audit_failure(_failed_prompt_hash(args), getattr(args, "model", None), _mode_of(args), e)
         print(json.dumps({"status": "error", "message": str(e)}), file=sys.stderr)
         sys.exit(2)
     except Exception as e:
-        try:
-            prompt_hash = None
-            if getattr(args, "prompt", None):
-                prompt_hash = sha256_hex(" ".join(args.prompt))
-        except Exception:
-            prompt_hash = None
-
-        try:
-            write_audit({
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "prompt_hash": prompt_hash,
-                "model": getattr(args, "model", None),
-                "mode": "json" if getattr(args, "json", False) else "text",
-                "ok": False,
-                "error": str(e),
-            })
-        except Exception:
-            pass
-
+        audit_failure(_failed_prompt_hash(args), getattr(args, "model", None), _mode_of(args), e)
         print(json.dumps({"status": "error", "message": str(e)}), file=sys.stderr)
         sys.exit(3)
 
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+"""Content-addressed on-disk response cache for llm-cli.
+
+Entries are stored one JSON file per key under `<dir>/<key[:2]>/<key>.json`.
+Keys are opaque hex digests computed by the caller (llm.py hashes model,
+system guard, prompt and generation options). The cache is bounded by total
+size with least-recently-used eviction (file mtime is bumped on every hit) and
+entries older than `ttl` seconds are treated as misses and removed.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ResponseCache:
+    def __init__(self, directory, *, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError("max_bytes must be a positive integer")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive if provided")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> size in bytes; loaded lazily, refreshed from disk before evicting
+        self._index = None
+        self._total = 0
+
+    def _path(self, key):
+        return self.directory / key[:2] / (key + ".json")
+
+    def _load_index(self):
+        index = {}
+        if self.directory.is_dir():
+            for sub in os.scandir(self.directory):
+                if not sub.is_dir():
+                    continue
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(".json"):
+                        index[entry.name[:-5]] = entry.stat().st_size
+        self._index = index
+        self._total = sum(index.values())
+
+    def _forget(self, key):
+        size = self._index.pop(key, None) if self._index is not None else None
+        if size is not None:
+            self._total -= size
+
+    def get(self, key):
+        """Return the cached response text for `key`, or None on miss/expiry."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+            if self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                self._forget(key)
+                return None
+
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return entry.get("response")
+
+    def put(self, key, response, **meta):
+        """Store `response` under `key` atomically, then evict down to `max_bytes`."""
+        entry = dict(meta, response=response, created=time.time())
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+
+            if self._index is None:
+                self._load_index()
+            else:
+                self._forget(key)
+                self._index[key] = len(data)
+                self._total += len(data)
+
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other processes may share the directory: rescan before deciding what to drop.
+        self._load_index()
+        by_age = []
+        for key in self._index:
+            try:
+                by_age.append((self._path(key).stat().st_mtime, key))
+            except OSError:
+                pass
+        by_age.sort()
+        for _, key in by_age:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            self._forget(key)
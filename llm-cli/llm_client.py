@@ -0,0 +1,431 @@
+"""Pooled, thread-safe HTTP client for the local Ollama generate endpoint.
+
+`LLMClient` keeps a keep-alive connection pool so repeated calls (scripts
+calling `call_llm` in a loop, worker threads) reuse TCP connections instead of
+paying connection setup per prompt.
+
+`StdlibClient` offers the same interface on `http.client` with no third-party
+imports; llm.py uses it for one-shot CLI calls, where importing `requests`
+costs more than the request itself. Heavy imports are deferred to client
+construction so importing this module stays cheap.
+
+Both clients accept an optional caller-owned `timings` dict which they fill
+with a latency breakdown: `connect_ms` (0 when a pooled connection was reused),
+`ttfb_ms` (request start to response headers), `total_ms`, and Ollama's own
+counters (`load_ms`, `prompt_eval_count`, `prompt_eval_ms`, `eval_count`,
+`eval_ms`, `ollama_total_ms`) plus `overhead_ms`, the part of `total_ms` Ollama
+did not account for (queueing and transport).
+
+`generate` / `stream_generate` take an optional `timeout=(connect, read)` that
+overrides the client's defaults for one call. `RetryPolicy` retries transient
+failures (connection errors, timeouts, 429 and 5xx) with jittered exponential
+backoff inside an optional total deadline.
+
+Usage:
+  client = LLMClient("http://127.0.0.1:11434/api/generate", pool_size=8)
+  text = client.generate("Hello", model="gemma:2b", system="...")
+"""
+
+import json
+import threading
+import time
+
+DEFAULT_URL = "http://127.0.0.1:11434/api/generate"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# Generation can legitimately take minutes on a cold model, so the read bound is
+# generous, but finite: a server that stops answering must not hang a caller.
+DEFAULT_READ_TIMEOUT = 300.0
+
+
+def capped_timeout(timeout, remaining):
+    """`timeout` (connect, read) with each bound capped at `remaining` seconds."""
+    return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+
+
+def ps_url(generate_url):
+    """URL of Ollama's loaded-models endpoint on the same server as `generate_url`."""
+    base = generate_url[: -len("/api/generate")] if generate_url.endswith("/api/generate") else generate_url.rstrip("/")
+    return base + "/api/ps"
+
+
+def loaded_model_names(data):
+    return sorted({m.get("name") or m.get("model") for m in data.get("models") or [] if m.get("name") or m.get("model")})
+
+
+def build_payload(prompt, model, system, stream, options):
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+    }
+    if system is not None:
+        payload["system"] = system
+    if options:
+        payload["options"] = options
+    return payload
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def record_ollama_counters(timings, final):
+    """Copy Ollama's reported counters (nanosecond durations) from the final response object."""
+    if timings is None:
+        return
+    for src, dst in (("load_duration", "load_ms"), ("prompt_eval_duration", "prompt_eval_ms"),
+                     ("eval_duration", "eval_ms"), ("total_duration", "ollama_total_ms")):
+        if isinstance(final.get(src), (int, float)):
+            timings[dst] = round(final[src] / 1e6, 3)
+    for key in ("prompt_eval_count", "eval_count"):
+        if isinstance(final.get(key), int):
+            timings[key] = final[key]
+    if "ollama_total_ms" in timings and "total_ms" in timings:
+        timings["overhead_ms"] = round(max(timings["total_ms"] - timings["ollama_total_ms"], 0.0), 3)
+
+
+# Thread-local slot the timed urllib3 connections report connect durations into.
+_connect_clock = threading.local()
+_timed_pools = None
+
+
+def _timed_pool_classes():
+    """urllib3 pool classes whose connections record how long `connect()` took."""
+    global _timed_pools
+    if _timed_pools is None:
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        def timed(conn_cls):
+            class Timed(conn_cls):
+                def connect(self):
+                    start = time.perf_counter()
+                    super().connect()
+                    _connect_clock.seconds = getattr(_connect_clock, "seconds", 0.0) + time.perf_counter() - start
+            return Timed
+
+        class TimedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = timed(HTTPConnection)
+
+        class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = timed(HTTPSConnection)
+
+        _timed_pools = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+    return _timed_pools
+
+
+class HTTPStatusError(Exception):
+    """Non-2xx response from the stdlib backend (mirrors requests' HTTPError text)."""
+
+    def __init__(self, status, reason, url):
+        self.status = status
+        super().__init__(f"{status} Error: {reason} for url: {url}")
+
+
+def status_of(exc):
+    """HTTP status carried by either backend's error, or None if there was no HTTP answer."""
+    status = getattr(exc, "status", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def retryable(exc):
+    """Transient failures worth another attempt: no HTTP answer at all, 429, or 5xx.
+
+    Both backends raise OSError subclasses for connection errors and timeouts.
+    A malformed response body is not transient, even where it is an OSError
+    too (requests' JSONDecodeError is also a ValueError).
+    """
+    status = status_of(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, OSError) and not isinstance(exc, ValueError)
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff and a total deadline.
+
+    Attempt n (1-based) that fails with a `retryable` error is followed by a
+    sleep drawn uniformly from [0, min(max_backoff, backoff * 2**(n-1))], up to
+    `retries` extra attempts. With `deadline` (seconds), no retry is started
+    that could not begin before the budget runs out, and each attempt is told
+    how much of the budget remains.
+    """
+
+    def __init__(self, retries=2, *, backoff=0.5, max_backoff=8.0, deadline=None):
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError("retries must be an integer >= 0")
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+    def delay(self, attempt):
+        import random
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def call(self, fn, attempts=None, retry_on=retryable):
+        """Run `fn(remaining)` until it succeeds or the policy gives up.
+
+        `remaining` is the unspent deadline budget in seconds (None without a
+        deadline). One record per attempt is appended to `attempts` if given.
+        """
+        start = time.monotonic()
+        n = 0
+        while True:
+            n += 1
+            remaining = None if self.deadline is None else max(self.deadline - (time.monotonic() - start), 0.0)
+            t0 = time.perf_counter()
+            try:
+                result = fn(remaining)
+            except Exception as e:
+                record = {"attempt": n, "ok": False, "error": str(e), "elapsed_ms": _ms(time.perf_counter() - t0)}
+                if status_of(e) is not None:
+                    record["status"] = status_of(e)
+                if attempts is not None:
+                    attempts.append(record)
+                if n > self.retries or not retry_on(e):
+                    raise
+                pause = self.delay(n)
+                if self.deadline is not None and time.monotonic() - start + pause >= self.deadline:
+                    raise
+                record["backoff_ms"] = _ms(pause)
+                time.sleep(pause)
+                continue
+            if attempts is not None:
+                attempts.append({"attempt": n, "ok": True, "elapsed_ms": _ms(time.perf_counter() - t0)})
+            return result
+
+
+class LLMClient:
+    """Reusable Ollama client holding a keep-alive connection pool.
+
+    A single instance may be shared across threads: the underlying urllib3 pool
+    hands each concurrent request its own connection (up to `pool_size`, further
+    callers block until one is returned) and the session carries no per-call state.
+    """
+
+    def __init__(self, url=DEFAULT_URL, *, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("pool_size must be an integer >= 1")
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        adapter.poolmanager.pool_classes_by_scheme = dict(_timed_pool_classes())
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _post(self, payload, timings, timeout=None):
+        # Always stream the body so the time to response headers can be observed.
+        _connect_clock.seconds = 0.0
+        start = time.perf_counter()
+        r = self._session.post(self.url, json=payload, stream=True, timeout=timeout or self.timeout)
+        if timings is not None:
+            timings["connect_ms"] = _ms(_connect_clock.seconds)
+            timings["ttfb_ms"] = _ms(time.perf_counter() - start)
+        return r, start
+
+    def generate(self, prompt, model="gemma:2b", *, system=None, stream=False, options=None, timings=None, timeout=None):
+        """Send one prompt and return the response text.
+
+        With `stream=True` the chunked NDJSON body is consumed incrementally and
+        the concatenated text is returned. `options` is forwarded verbatim as
+        Ollama generation options (temperature, seed, ...).
+        """
+        if stream:
+            chunks = self.stream_generate(prompt, model, system=system, options=options, timings=timings, timeout=timeout)
+            return "".join(c.get("response") or "" for c in chunks)
+
+        r, start = self._post(build_payload(prompt, model, system, False, options), timings, timeout)
+        # Context manager returns the connection to the pool even on errors.
+        with r:
+            r.raise_for_status()
+            data = r.json()
+        if timings is not None:
+            timings["total_ms"] = _ms(time.perf_counter() - start)
+            record_ollama_counters(timings, data)
+        return data.get("response")
+
+    def stream_generate(self, prompt, model="gemma:2b", *, system=None, options=None, timings=None, timeout=None):
+        """Yield Ollama's streamed chunk objects as soon as each one arrives.
+
+        The last chunk yielded has `done: true` and carries Ollama's eval counters.
+        """
+        r, start = self._post(build_payload(prompt, model, system, True, options), timings, timeout)
+        with r:
+            r.raise_for_status()
+            # chunk_size=None hands lines over as the server flushes them instead
+            # of waiting to fill a fixed-size read buffer.
+            for line in r.iter_lines(chunk_size=None):
+                if line:
+                    data = json.loads(line)
+                    if data.get("done") and timings is not None:
+                        timings["total_ms"] = _ms(time.perf_counter() - start)
+                        record_ollama_counters(timings, data)
+                    yield data
+                    if data.get("done"):
+                        break
+
+    def loaded_models(self, timeout=None):
+        """Names of the models the server currently holds in memory (GET /api/ps)."""
+        with self._session.get(ps_url(self.url), timeout=timeout or self.timeout) as r:
+            r.raise_for_status()
+            return loaded_model_names(r.json())
+
+    def close(self):
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _apply_read_timeout(conn, timeout):
+    conn.timeout = timeout[0]
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout[1])
+
+
+class StdlibClient:
+    """Ollama client on `http.client` with one keep-alive connection per thread.
+
+    Same `generate` / `stream_generate` interface as `LLMClient`, without the
+    `requests` import. A connection found closed by the server on reuse is
+    reopened once transparently.
+    """
+
+    def __init__(self, url=DEFAULT_URL, *, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {parts.scheme!r}")
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._local = threading.local()
+
+    def _connect(self, timeout):
+        import http.client
+
+        cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        conn = cls(self._host, self._port, timeout=timeout[0])
+        conn.connect()
+        return conn
+
+    def _post(self, payload, timings, timeout=None):
+        body = json.dumps(payload).encode("utf-8")
+        return self._send("POST", self._path, body, timings, timeout)
+
+    def _send(self, method, path, body, timings, timeout=None):
+        import http.client
+
+        timeout = timeout or self.timeout
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        start = time.perf_counter()
+        connect = 0.0
+        conn = getattr(self._local, "conn", None)
+        reused = conn is not None
+        if conn is None:
+            conn = self._local.conn = self._connect(timeout)
+            connect = time.perf_counter() - start
+        try:
+            _apply_read_timeout(conn, timeout)
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self.close()
+            if not reused:
+                raise
+            t = time.perf_counter()
+            conn = self._local.conn = self._connect(timeout)
+            connect += time.perf_counter() - t
+            _apply_read_timeout(conn, timeout)
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except BaseException:
+            self.close()
+            raise
+
+        if timings is not None:
+            timings["connect_ms"] = _ms(connect)
+            timings["ttfb_ms"] = _ms(time.perf_counter() - start)
+        if resp.status >= 400:
+            resp.read()
+            raise HTTPStatusError(resp.status, resp.reason, self.url)
+        return resp, start
+
+    def generate(self, prompt, model="gemma:2b", *, system=None, stream=False, options=None, timings=None, timeout=None):
+        if stream:
+            chunks = self.stream_generate(prompt, model, system=system, options=options, timings=timings, timeout=timeout)
+            return "".join(c.get("response") or "" for c in chunks)
+
+        resp, start = self._post(build_payload(prompt, model, system, False, options), timings, timeout)
+        try:
+            data = json.loads(resp.read())
+        except BaseException:
+            self.close()
+            raise
+        if timings is not None:
+            timings["total_ms"] = _ms(time.perf_counter() - start)
+            record_ollama_counters(timings, data)
+        return data.get("response")
+
+    def stream_generate(self, prompt, model="gemma:2b", *, system=None, options=None, timings=None, timeout=None):
+        resp, start = self._post(build_payload(prompt, model, system, True, options), timings, timeout)
+        finished = False
+        try:
+            for line in iter(resp.readline, b""):
+                if line.strip():
+                    data = json.loads(line)
+                    if data.get("done") and timings is not None:
+                        timings["total_ms"] = _ms(time.perf_counter() - start)
+                        record_ollama_counters(timings, data)
+                    yield data
+                    if data.get("done"):
+                        break
+            # Drain the chunked terminator so the connection can be reused.
+            resp.read()
+            finished = True
+        finally:
+            if not finished:
+                self.close()
+
+    def loaded_models(self, timeout=None):
+        """Names of the models the server currently holds in memory (GET /api/ps)."""
+        from urllib.parse import urlsplit
+
+        resp, _ = self._send("GET", urlsplit(ps_url(self.url)).path, None, None, timeout)
+        try:
+            return loaded_model_names(json.loads(resp.read()))
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
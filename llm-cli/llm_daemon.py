@@ -0,0 +1,125 @@
+"""Unix-socket transport for the resident llm-cli daemon (`llm.py serve`).
+
+Protocol: newline-delimited JSON. The client writes one request object per
+line (the same object `--json` accepts, plus optional "model" and "stream");
+the daemon answers with one result line, or for streaming requests with
+`{"event": "token"}` lines followed by a terminal line (`"event": "done"` or
+an error object). A connection may carry any number of requests in sequence.
+
+Stdlib only: the thin client must not pay for importing the HTTP stack.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+
+
+def default_socket_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return str(Path(runtime) / "llm-cli.sock")
+    return "/tmp/llm-cli-%d.sock" % os.getuid()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                self._send({"status": "error", "message": f"failed to parse JSON request: {e}"})
+                continue
+            self.server.dispatch(req, self._send)
+
+    def _send(self, obj):
+        self.wfile.write((json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """One thread per connection; `dispatch(request, emit)` serves each request."""
+
+    daemon_threads = True
+
+    def __init__(self, path, dispatch):
+        self.dispatch = dispatch
+        _remove_stale_socket(path)
+        # Socket is owner-only: it fronts the audit trail and the model endpoint.
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"daemon already listening on {path}")
+
+
+class DaemonClient:
+    """Forwards requests to a running daemon; one connection per calling thread."""
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+        return conn
+
+    def request(self, obj):
+        """Send one request and yield reply objects up to and including the terminal one."""
+        sock, rfile = self._conn()
+        try:
+            sock.sendall((json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8"))
+            while True:
+                line = rfile.readline()
+                if not line:
+                    raise ConnectionError("daemon closed the connection")
+                reply = json.loads(line)
+                yield reply
+                if reply.get("event") != "token":
+                    return
+        except BaseException:
+            # A half-read reply leaves the stream unusable; reconnect next time.
+            self._drop()
+            raise
+
+    def _drop(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    def close(self):
+        self._drop()
@@ -0,0 +1,217 @@
+"""Spread requests over several Ollama endpoints with model affinity.
+
+`RoutingClient` wraps one client per endpoint (`LLMClient` or `StdlibClient`)
+and exposes the same `generate` / `stream_generate` interface. For each
+request it picks, among healthy endpoints:
+
+  1. one that already has the requested model loaded, so no box pays for a
+     cold model swap while another has it warm; otherwise
+  2. the one with the fewest outstanding requests (ties go to the endpoint
+     listed first).
+
+Which models are loaded is learned from successful requests and refreshed
+from each endpoint's `/api/ps` at most every `ps_interval` seconds. Only an
+endpoint's first probe delays a request, by at most `ps_timeout` seconds;
+later refreshes run on a background thread while requests are routed on the
+last known lists.
+
+An endpoint whose requests fail `failure_threshold` times in a row (connection
+errors and 5xx; 4xx are the caller's fault) is skipped for `cooldown` seconds,
+then given one trial request. If a request cannot reach an endpoint at all, it
+is retried on the next candidate; once the first chunk has arrived it is not.
+
+`remaining` (seconds) caps each endpoint client's own timeouts, failovers
+included, the way `timeout` would for a single client.
+
+Stdlib only, and `timings["endpoint"]` records which endpoint served a call.
+"""
+
+import threading
+import time
+
+from llm_client import capped_timeout, status_of
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30.0
+DEFAULT_PS_INTERVAL = 30.0
+# /api/ps answers from memory; an endpoint slower than this is not worth waiting on.
+DEFAULT_PS_TIMEOUT = 2.0
+
+
+def endpoint_url(url):
+    """Accept either a base URL (`http://host:11434`) or a full generate URL."""
+    url = url.strip().rstrip("/")
+    return url if url.endswith("/api/generate") else url + "/api/generate"
+
+
+def parse_endpoints(spec):
+    """Split a comma-separated endpoint list (the `OLLAMA_URLS` format)."""
+    return [endpoint_url(u) for u in (spec or "").split(",") if u.strip()]
+
+
+def _is_connect_error(exc):
+    """True when the request never got an HTTP answer, so another endpoint may take it."""
+    return isinstance(exc, OSError) and status_of(exc) is None
+
+
+def _with_deadline(client, kw, end):
+    """`kw` with the client's timeouts capped at the time left before `end` (None: no deadline)."""
+    if end is None:
+        return kw
+    return dict(kw, timeout=capped_timeout(client.timeout, max(end - time.monotonic(), 0.0)))
+
+
+def _counts_against_health(exc):
+    status = status_of(exc)
+    if status is not None:
+        return status >= 500
+    return isinstance(exc, (OSError, ValueError))
+
+
+class Endpoint:
+    """Routing state for one endpoint; mutated only under the router's lock."""
+
+    def __init__(self, client):
+        self.client = client
+        self.url = client.url
+        self.outstanding = 0
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self.models = set()
+        self.models_checked_at = None
+
+    def healthy(self, now):
+        return self.unhealthy_until <= now
+
+
+class RoutingClient:
+    def __init__(self, clients, *, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 cooldown=DEFAULT_COOLDOWN, ps_interval=DEFAULT_PS_INTERVAL, ps_timeout=DEFAULT_PS_TIMEOUT,
+                 clock=time.monotonic):
+        if not clients:
+            raise ValueError("RoutingClient needs at least one endpoint client")
+        self.endpoints = [Endpoint(c) for c in clients]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ps_interval = ps_interval
+        self.ps_timeout = ps_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return ",".join(ep.url for ep in self.endpoints)
+
+    def _refresh_models(self, now):
+        """Probe /api/ps on endpoints whose loaded-model list has gone stale.
+
+        Endpoints never probed are probed here; the others in the background.
+        """
+        if self.ps_interval is None:
+            return
+        with self._lock:
+            stale = [ep for ep in self.endpoints
+                     if ep.healthy(now) and (ep.models_checked_at is None or now - ep.models_checked_at >= self.ps_interval)]
+            first = [ep for ep in stale if ep.models_checked_at is None]
+            # Claim the probe so concurrent callers do not all hit /api/ps.
+            for ep in stale:
+                ep.models_checked_at = now
+        self._probe_models(first)
+        refresh = [ep for ep in stale if ep not in first]
+        if refresh:
+            threading.Thread(target=self._probe_models, args=(refresh,), daemon=True).start()
+
+    def _probe_models(self, endpoints):
+        for ep in endpoints:
+            loaded = getattr(ep.client, "loaded_models", None)
+            if loaded is None:
+                continue
+            try:
+                models = set(loaded(timeout=(self.ps_timeout, self.ps_timeout)))
+            except Exception:
+                continue  # The request itself will find out whether the endpoint is down.
+            with self._lock:
+                ep.models = models
+
+    def _acquire(self, model, tried):
+        """Pick an endpoint for `model` and count the request against it."""
+        now = self._clock()
+        self._refresh_models(now)
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep not in tried]
+            if not candidates:
+                return None
+            healthy = [ep for ep in candidates if ep.healthy(now)]
+            if healthy:
+                warm = [ep for ep in healthy if model in ep.models]
+                pool = warm or healthy
+                ep = min(pool, key=lambda e: (e.outstanding, self.endpoints.index(e)))
+            else:
+                # Everything is cooling down: try whichever recovers first.
+                ep = min(candidates, key=lambda e: e.unhealthy_until)
+            ep.outstanding += 1
+            return ep
+
+    def _release(self, ep, model, exc=None):
+        with self._lock:
+            ep.outstanding -= 1
+            if exc is None:
+                ep.failures = 0
+                ep.unhealthy_until = 0.0
+                ep.models.add(model)
+            elif _counts_against_health(exc):
+                ep.failures += 1
+                if ep.failures >= self.failure_threshold:
+                    ep.unhealthy_until = self._clock() + self.cooldown
+
+    def generate(self, prompt, model="gemma:2b", *, timings=None, remaining=None, **kw):
+        end = None if remaining is None else time.monotonic() + remaining
+        tried = []
+        while True:
+            ep = self._acquire(model, tried)
+            tried.append(ep)
+            if timings is not None:
+                timings["endpoint"] = ep.url
+            try:
+                text = ep.client.generate(prompt, model, timings=timings, **_with_deadline(ep.client, kw, end))
+            except Exception as e:
+                self._release(ep, model, e)
+                if _is_connect_error(e) and len(tried) < len(self.endpoints):
+                    continue
+                raise
+            self._release(ep, model)
+            return text
+
+    def stream_generate(self, prompt, model="gemma:2b", *, timings=None, remaining=None, **kw):
+        end = None if remaining is None else time.monotonic() + remaining
+        tried = []
+        while True:
+            ep = self._acquire(model, tried)
+            tried.append(ep)
+            if timings is not None:
+                timings["endpoint"] = ep.url
+            started = False
+            try:
+                for chunk in ep.client.stream_generate(prompt, model, timings=timings, **_with_deadline(ep.client, kw, end)):
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                self._release(ep, model)
+                raise
+            except Exception as e:
+                self._release(ep, model, e)
+                if not started and _is_connect_error(e) and len(tried) < len(self.endpoints):
+                    continue
+                raise
+            self._release(ep, model)
+            return
+
+    def close(self):
+        for ep in self.endpoints:
+            ep.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
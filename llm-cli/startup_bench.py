@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for llm.py, based on `python -X importtime`.
+
+Imports `llm` in fresh interpreters, reports the cumulative import time of the
+module (best of --runs) and every module it pulled in, and exits non-zero if
+the time exceeds the budget or if any module that must stay lazy was loaded.
+
+Usage:
+  python llm-cli/startup_bench.py                 # default budget
+  python llm-cli/startup_bench.py --budget-ms 30 --runs 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_BUDGET_MS = 40.0
+
+# Only needed once a network call, cache lookup or daemon hop actually happens.
+LAZY_MODULES = ("requests", "urllib3", "uuid", "datetime", "http.client", "socketserver", "llm_cache", "llm_daemon", "llm_router")
+
+
+def measure_once():
+    code = "import sys; sys.path.insert(0, %r); import llm" % HERE
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if p.returncode != 0:
+        raise RuntimeError(f"importing llm failed: {p.stderr.strip().splitlines()[-1:]}")
+
+    entries = []
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        entries.append((name.rstrip(), int(cumulative)))
+
+    # importtime prints children before their parent: llm's subtree is everything
+    # after the interpreter's own top-level `site` import up to the `llm` line.
+    start = max((i for i, (name, _) in enumerate(entries) if name == " site"), default=-1) + 1
+    llm_us = None
+    subtree = []
+    for name, cumulative in entries[start:]:
+        if name == " llm":
+            llm_us = cumulative
+            break
+        subtree.append(name.strip())
+    if llm_us is None:
+        raise RuntimeError("llm import not found in -X importtime output")
+    return llm_us / 1000.0, subtree
+
+
+def run(runs, budget_ms):
+    best_ms = None
+    loaded = set()
+    for _ in range(runs):
+        ms, modules = measure_once()
+        best_ms = ms if best_ms is None else min(best_ms, ms)
+        loaded.update(modules)
+
+    eager = sorted(m for m in loaded if m.split(".")[0] in LAZY_MODULES or m in LAZY_MODULES)
+    reasons = []
+    if best_ms > budget_ms:
+        reasons.append(f"import llm took {best_ms:.1f}ms (budget {budget_ms:.1f}ms)")
+    if eager:
+        reasons.append(f"modules loaded eagerly: {eager}")
+
+    return {
+        "ok": not reasons,
+        "reasons": reasons,
+        "import_ms": round(best_ms, 3),
+        "budget_ms": budget_ms,
+        "runs": runs,
+        "modules": sorted(loaded),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=float(os.environ.get("LLM_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    args = p.parse_args()
+
+    summary = run(args.runs, args.budget_ms)
+    print(json.dumps(summary, indent=2))
+    if not summary["ok"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
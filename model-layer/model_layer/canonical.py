@@ -0,0 +1,154 @@
+"""Canonical JSON encoding and hashing shared by every model-layer stage.
+
+`canonical_json(obj)` is byte-for-byte identical to
+`json.dumps(obj, sort_keys=True, separators=(",", ":"))`; `ensure_ascii=False`
+and `sort_keys=False` reproduce the variants some callers have always used.
+
+Fast paths: top-level scalars are encoded directly, and everything else goes
+through one pre-built C encoder per option set instead of constructing a new
+`JSONEncoder` on each call as `json.dumps` does for non-default options.
+Objects nested too deeply for the C encoder (which recurses) are encoded by
+an iterative encoder that follows the C encoder's rules exactly, so there is
+no depth limit.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Dict, List, Tuple
+
+_ENCODERS: Dict[Tuple[bool, bool], json.JSONEncoder] = {
+    (ascii_only, sort): json.JSONEncoder(sort_keys=sort, separators=(",", ":"), ensure_ascii=ascii_only)
+    for ascii_only in (True, False)
+    for sort in (True, False)
+}
+
+_END = object()
+
+
+def canonical_json(obj: Any, *, ensure_ascii: bool = True, sort_keys: bool = True) -> str:
+    t = type(obj)
+    if t is str:
+        return encode_basestring_ascii(obj) if ensure_ascii else encode_basestring(obj)
+    if t is int:
+        return int.__repr__(obj)
+    if obj is None:
+        return "null"
+    if t is bool:
+        return "true" if obj else "false"
+    try:
+        return _ENCODERS[ensure_ascii, sort_keys].encode(obj)
+    except RecursionError:
+        return _encode_iterative(obj, ensure_ascii, sort_keys)
+
+
+def canonical_bytes(obj: Any, *, ensure_ascii: bool = True, sort_keys: bool = True) -> bytes:
+    return canonical_json(obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys).encode("utf-8")
+
+
+def sha256_digest(obj: Any, *, ensure_ascii: bool = True, sort_keys: bool = True) -> bytes:
+    """Raw SHA-256 of the canonical UTF-8 encoding of `obj`."""
+    return hashlib.sha256(canonical_bytes(obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys)).digest()
+
+
+def sha256_hex(obj: Any, *, ensure_ascii: bool = True, sort_keys: bool = True) -> str:
+    """Hex SHA-256 of the canonical UTF-8 encoding of `obj` (the model layer's content id)."""
+    return hashlib.sha256(canonical_bytes(obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys)).hexdigest()
+
+
+def _float_repr(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _key_str(key: Any) -> str:
+    # Same coercions, in the same order, as the C encoder's dict keys.
+    if isinstance(key, str):
+        return key
+    if isinstance(key, float):
+        return _float_repr(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _encode_iterative(obj: Any, ensure_ascii: bool, sort_keys: bool) -> str:
+    """Explicit-stack encoder with the C encoder's output, for arbitrarily deep objects."""
+    encode_str = encode_basestring_ascii if ensure_ascii else encode_basestring
+    chunks: List[str] = []
+    markers = set()
+    # Open containers: [is_dict, marker id, item iterator, items written so far]
+    stack: List[List[Any]] = []
+    value = obj
+    while True:
+        if value is None:
+            chunks.append("null")
+        elif value is True:
+            chunks.append("true")
+        elif value is False:
+            chunks.append("false")
+        elif isinstance(value, str):
+            chunks.append(encode_str(value))
+        elif isinstance(value, int):
+            chunks.append(int.__repr__(value))
+        elif isinstance(value, float):
+            chunks.append(_float_repr(value))
+        elif isinstance(value, (list, tuple)):
+            seq = list if isinstance(value, list) else tuple
+            if seq.__len__(value) == 0:
+                chunks.append("[]")
+            else:
+                if id(value) in markers:
+                    raise ValueError("Circular reference detected")
+                markers.add(id(value))
+                chunks.append("[")
+                stack.append([False, id(value), seq.__iter__(value), 0])
+        elif isinstance(value, dict):
+            if dict.__len__(value) == 0:
+                chunks.append("{}")
+            else:
+                if id(value) in markers:
+                    raise ValueError("Circular reference detected")
+                markers.add(id(value))
+                pairs = list(value.items())
+                if sort_keys:
+                    pairs.sort()
+                chunks.append("{")
+                stack.append([True, id(value), iter(pairs), 0])
+        else:
+            raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+        # Move to the next value, closing every container that is exhausted.
+        while stack:
+            frame = stack[-1]
+            item = next(frame[2], _END)
+            if item is _END:
+                chunks.append("}" if frame[0] else "]")
+                markers.discard(frame[1])
+                stack.pop()
+                continue
+            if frame[3]:
+                chunks.append(",")
+            frame[3] += 1
+            if frame[0]:
+                if not isinstance(item, tuple) or len(item) != 2:
+                    raise ValueError("items must return 2-tuples")
+                chunks.append(encode_str(_key_str(item[0])) + ":")
+                value = item[1]
+            else:
+                value = item
+            break
+        else:
+            return "".join(chunks)
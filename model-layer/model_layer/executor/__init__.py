@@ -1,3 +1,17 @@
-from .executor import execute_envelope
+from .executor import execute_envelope, iter_execute_envelope, iter_trace_records
+from .trace_writer import write_trace_ndjson
+from .batch import TraceCache, execute_envelopes
+from .async_executor import execute_envelope_async, run_envelope
+from .mock_adapter import MockAdapter
 
-__all__ = ["execute_envelope"]
+__all__ = [
+    "execute_envelope",
+    "iter_execute_envelope",
+    "iter_trace_records",
+    "write_trace_ndjson",
+    "execute_envelopes",
+    "TraceCache",
+    "execute_envelope_async",
+    "run_envelope",
+    "MockAdapter",
+]
@@ -0,0 +1,189 @@
+"""Asynchronous executor running envelope steps against adapter callables.
+
+`execute_envelope_async(envelope, adapters)` runs every step concurrently on
+the event loop. Each step is handed to its adapter (an async callable taking
+the step dict and returning the step output); `timeout_ms` is enforced as a
+real deadline, and a step that misses it is cancelled and recorded as
+`timed_out`. An adapter that raises records the step as `failed`. In a
+wave-scheduled envelope only one wave runs at a time: a wave's steps start
+once every step of the previous wave has finished. In an envelope with
+`after` dependencies each step starts as soon as the steps it waits for have
+finished, so independent branches run concurrently; its adapter receives
+their outputs, in `after` order, as the step's `inputs`.
+
+The trace has the same schema as execute_envelope: `result` hashes the
+adapter output with the step id, and `payload_hash` (used for quorum) is the
+digest of the output, so an adapter echoing the payload reproduces the
+simulated trace apart from `duration_ms`, which is measured. Kept out of
+executor.py, which stays pure.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
+
+from ..canonical import canonical_bytes
+from ..records import TraceStep
+from .executor import (_SATISFIED, _QuorumTracker, _dependencies, _result_id, _skipped_record, _step_id,
+                       _validated_steps, _wave_ranges)
+
+AdapterFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def _adapter_for(adapters: Union[AdapterFn, Mapping[str, AdapterFn]], step: Dict[str, Any]) -> AdapterFn:
+    if callable(adapters):
+        return adapters
+    try:
+        return adapters[step.get("adapter")]
+    except KeyError:
+        raise ValueError(f"no adapter callable for step adapter {step.get('adapter')!r}") from None
+
+
+def _elapsed_ms(start: float) -> int:
+    return int((time.monotonic() - start) * 1000)
+
+
+async def _run_step(step: Dict[str, Any], sid: Any, fn: AdapterFn,
+                    limit: Optional[asyncio.Semaphore]) -> Tuple[TraceStep, Any]:
+    group = step.get("group")
+    timeout = step.get("timeout_ms")
+    if limit is not None:
+        await limit.acquire()
+    try:
+        # The deadline covers the adapter call only, not time spent queued for a slot.
+        start = time.monotonic()
+        try:
+            if timeout is None:
+                output = await fn(step)
+            else:
+                output = await asyncio.wait_for(fn(step), int(timeout) / 1000)
+        except asyncio.TimeoutError:
+            return TraceStep(sid, "timed_out", _elapsed_ms(start), None, None, group), None
+        except Exception:
+            return TraceStep(sid, "failed", _elapsed_ms(start), None, None, group), None
+        duration = _elapsed_ms(start)
+    finally:
+        if limit is not None:
+            limit.release()
+    canon = canonical_bytes(output)
+    return TraceStep(sid, "ok", duration, _result_id(sid, canon), hashlib.sha256(canon).digest(), group), output
+
+
+async def execute_envelope_async(envelope: Dict[str, Any], adapters: Union[AdapterFn, Mapping[str, AdapterFn]],
+                                 *, max_concurrency: Optional[int] = None,
+                                 early_quorum: bool = False) -> Dict[str, Any]:
+    """Execute the envelope's steps concurrently and return its execution trace.
+
+    `adapters` is one async callable for every step, or a mapping from the
+    step's `adapter` field to a callable. `max_concurrency` bounds how many
+    adapter calls are in flight at once. If execution is cancelled or a step
+    output cannot be canonicalized, steps still running are cancelled.
+
+    With `early_quorum=True` a group's remaining members are cancelled as soon
+    as its quorum outcome is settled (see execute_envelope) and recorded as
+    "skipped", so a verify group waits for its median responder rather than
+    its slowest.
+
+    A step whose dependency timed out, failed or was blocked is recorded as
+    "blocked" without running, as in execute_envelope.
+    """
+    steps = _validated_steps(envelope, None)
+    if max_concurrency is not None and (not isinstance(max_concurrency, int) or isinstance(max_concurrency, bool)
+                                        or max_concurrency < 1):
+        raise ValueError("max_concurrency must be a positive integer")
+    # Resolve ids and adapters before anything runs, so bad input fails fast.
+    memo: Dict[int, Any] = {}
+    calls = [(step, step.get("id") or _step_id(step, memo), _adapter_for(adapters, step)) for step in steps]
+
+    limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    tasks: Dict[int, "asyncio.Future[TraceStep]"] = {}
+    index: Dict["asyncio.Future[TraceStep]", int] = {}
+    members: Dict[Any, List[int]] = {}
+    for i, step in enumerate(steps):
+        if step.get("group"):
+            members.setdefault(step["group"], []).append(i)
+
+    deps = _dependencies(steps)
+    dependents: Dict[int, List[int]] = {}
+    waiting: Dict[int, int] = {}  # step index -> dependencies still without a record
+    for j, ds in enumerate(deps or ()):
+        if ds:
+            waiting[j] = len(ds)
+            for i in ds:
+                dependents.setdefault(i, []).append(j)
+    outputs: Dict[int, Any] = {}  # outputs of steps that others depend on
+
+    tracker = _QuorumTracker(steps)
+    records: List[Optional[TraceStep]] = [None] * len(calls)
+
+    def start(i: int, pending: Set[asyncio.Future]) -> None:
+        step, sid, fn = calls[i]
+        if deps is not None and deps[i]:
+            step = dict(step, inputs=[outputs.get(d) for d in deps[i]])
+        t = tasks[i] = asyncio.ensure_future(_run_step(step, sid, fn, limit))
+        index[t] = i
+        pending.add(t)
+
+    def release(i: int, pending: Set[asyncio.Future]) -> None:
+        # Step i has its record: start, or block, each dependent it was the last one holding back.
+        stack = [i]
+        while stack:
+            for j in dependents.get(stack.pop(), ()):
+                waiting[j] -= 1
+                if waiting[j] or records[j] is not None:
+                    continue
+                if all(records[d].status in _SATISFIED for d in deps[j]):
+                    start(j, pending)
+                else:
+                    records[j] = _skipped_record(calls[j][0], calls[j][1], "blocked")
+                    stack.append(j)
+
+    try:
+        for wave in _wave_ranges(steps):
+            # Members of groups settled in an earlier wave are already recorded as skipped.
+            pending: Set[asyncio.Future] = set()
+            for i in wave:
+                if records[i] is None and not waiting.get(i):
+                    start(i, pending)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in sorted(done, key=index.get):
+                    i = index[t]
+                    if records[i] is not None:
+                        continue  # finished in the same round its group was settled
+                    r, output = t.result()
+                    records[i] = r
+                    if i in dependents:
+                        outputs[i] = output
+                    if tracker.add(r.group, r.payload_hash) is not None and early_quorum:
+                        # Group settled: stop the members still running or waiting for a slot.
+                        for j in members[r.group]:
+                            if records[j] is None:
+                                records[j] = _skipped_record(calls[j][0], calls[j][1])
+                                if j in tasks:
+                                    tasks[j].cancel()
+                                    pending.discard(tasks[j])
+                                release(j, pending)
+                    release(i, pending)
+    finally:
+        running = [t for t in tasks.values() if not t.done()]
+        for t in running:
+            t.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return {
+        "envelope_id": envelope.get("envelope_id"),
+        "plan_id": envelope.get("plan_id"),
+        "steps": [r.to_dict() for r in records],
+        "quorum": tracker.quorum(),
+    }
+
+
+def run_envelope(envelope: Dict[str, Any], adapters: Union[AdapterFn, Mapping[str, AdapterFn]],
+                 *, max_concurrency: Optional[int] = None, early_quorum: bool = False) -> Dict[str, Any]:
+    """Synchronous wrapper: execute_envelope_async on a fresh event loop."""
+    return asyncio.run(execute_envelope_async(envelope, adapters, max_concurrency=max_concurrency,
+                                              early_quorum=early_quorum))
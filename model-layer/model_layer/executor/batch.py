@@ -0,0 +1,78 @@
+"""Batch execution with an envelope-level trace cache.
+
+`execute_envelopes(envelopes)` runs many envelopes in one call, the pattern
+of the phase-3 stress runner and the break harness. Every envelope is
+validated before any of them executes. An envelope seen before, earlier in
+the batch or in an earlier call sharing the same `TraceCache`, is served
+from the cache without being revalidated or rehashed step by step.
+
+The cache key is the SHA-256 of the canonical envelope rather than
+`envelope_id` alone. A verified envelope_id covers plan_id and the step ids,
+but not payloads, timeouts or groups, so two envelopes with the same id can
+still produce different traces. Hashing the whole envelope is one pass of the
+C encoder, far cheaper than executing it. Envelopes that cannot be
+canonicalized (the executor tolerates that for timed-out steps) run uncached.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from ..cache import LRUCache
+from ..canonical import sha256_digest
+from .executor import _execute_steps, _trace_from_records, _validated_steps
+
+
+class TraceCache(LRUCache):
+    """Bounded LRU of execution traces keyed by envelope digest; safe to share between threads."""
+
+
+def _cache_key(envelope: Any, early_quorum: bool) -> Optional[Hashable]:
+    if not isinstance(envelope, dict):
+        return None
+    try:
+        return (early_quorum, sha256_digest(envelope))
+    except (TypeError, ValueError):
+        return None
+
+
+def _copy_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+    # Traces hold only strings, ints and None below these containers.
+    return dict(trace, steps=[dict(s) for s in trace["steps"]], quorum=dict(trace["quorum"]))
+
+
+def execute_envelopes(envelopes: Iterable[Dict[str, Any]], *, workers: Optional[int] = None,
+                      early_quorum: bool = False, cache: Optional[TraceCache] = None) -> List[Dict[str, Any]]:
+    """Execute each envelope and return their traces in input order.
+
+    Each trace equals `execute_envelope(envelope, workers, early_quorum=...)`
+    and is the caller's own copy. Pass a `TraceCache` to keep traces across
+    calls and read hit counts from it; duplicates within one batch count as
+    hits. If any envelope is invalid, its error is raised before anything
+    executes.
+    """
+    cache = TraceCache() if cache is None else cache
+    keys: List[Hashable] = []
+    traces: Dict[Hashable, Dict[str, Any]] = {}
+    todo: Dict[Hashable, Any] = {}
+    for envelope in envelopes:
+        key = _cache_key(envelope, early_quorum)
+        if key is None:
+            key = object()  # never matches, never cached
+        elif key in traces or key in todo:
+            cache._count_hit()
+            keys.append(key)
+            continue
+        else:
+            cached = cache.get(key)
+            if cached is not None:
+                traces[key] = cached
+                keys.append(key)
+                continue
+        todo[key] = (envelope, _validated_steps(envelope, workers))
+        keys.append(key)
+
+    for key, (envelope, steps) in todo.items():
+        trace = traces[key] = _trace_from_records(_execute_steps(envelope, steps, workers, early_quorum))
+        if isinstance(key, tuple):
+            cache.put(key, trace)
+    return [_copy_trace(traces[key]) for key in keys]
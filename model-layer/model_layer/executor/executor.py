@@ -2,35 +2,200 @@
 
 Function `execute_envelope(envelope)` consumes an execution envelope and
 returns a deterministic execution trace describing each step's outcome.
+With `workers=N` payload canonicalization and step digests run in a process
+pool (when the machine and the envelope are large enough for the pool to pay
+off, see _pool_workers); the trace is identical for any worker count.
+`iter_execute_envelope` yields step results one at a time for envelopes whose
+trace should not be held in memory.
+
+Internally steps are executed into slotted `TraceStep` records with raw
+digests; dicts with hex digests are produced only where results leave the
+module (`iter_trace_records` exposes the records themselves).
 """
 from __future__ import annotations
 
-import json
 import hashlib
-from typing import Any, Dict, List
+import io
+import os
+import pickle
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from ..canonical import canonical_bytes, canonical_json, sha256_hex
+from ..merkle import MERKLE_SCHEME, slice_envelope_id
+from ..records import TraceStep
 
-def canonical_json(obj: Any) -> str:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+# Upper bound on steps per process-pool shard (see _iter_parallel).
+_MAX_SHARD_STEPS = 2048
+# Fewer steps than this per worker and starting the pool costs more than it saves.
+_MIN_STEPS_PER_WORKER = 1000
 
 
 def _id_for(obj: Any) -> str:
-    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+    return sha256_hex(obj)
+
+
+def _payload_digest(payload: Any, memo: Dict[int, Any]) -> Tuple[bytes, bytes]:
+    """Canonical bytes and raw SHA-256 of `payload`, computed once per distinct payload object.
+
+    `memo` is keyed by object identity and must not outlive the payloads it
+    refers to (execute_envelope keeps one per call). An entry may hold the
+    exception canonicalization raised, re-raised when the digest is needed.
+    """
+    key = id(payload)
+    hit = memo.get(key)
+    if hit is None:
+        canon = canonical_bytes(payload)
+        hit = memo[key] = (canon, hashlib.sha256(canon).digest())
+    elif isinstance(hit, Exception):
+        raise hit
+    elif hit[1] is None:
+        # Snapshot taken without its digest (see _snapshot_payloads).
+        hit = memo[key] = (hit[0], hashlib.sha256(hit[0]).digest())
+    return hit
+
+
+def _snapshot_payloads(steps: List[Dict[str, Any]], memo: Dict[int, Any]) -> None:
+    """Record the canonical bytes of every distinct payload before any step runs.
+
+    Payloads are serialized last step first, so a payload whose serialization
+    mutates a payload shared with an earlier step (e.g. a dict subclass with
+    side-effecting `items()`) cannot change the bytes recorded for later
+    steps. The bytes are the snapshot: nothing is copied, and execution never
+    reads the caller's payload objects again.
+    """
+    for st in reversed(steps):
+        if "payload" not in st:
+            continue
+        payload = st.get("payload")
+        if id(payload) in memo:
+            continue
+        try:
+            # Digest deferred to first use, which may be in a worker process.
+            memo[id(payload)] = (canonical_bytes(payload), None)
+        except (TypeError, ValueError, RecursionError) as e:
+            # Only fatal if a step actually needs the digest (timed-out steps do not).
+            memo[id(payload)] = e
+
+
+class _NotPlain(Exception):
+    pass
+
+
+class _PlainPickler(pickle.Pickler):
+    """Pickler for payloads built only from exact builtin types.
+
+    The C pickler calls reducer_override for every object it does not
+    serialize natively; exact dicts, lists, tuples, strings and numbers never
+    reach it. Refusing everything that does means no user code (such as a
+    dict subclass's items()) runs while a payload is pickled, so the pickle
+    is as faithful a snapshot as its canonical bytes and far cheaper to take.
+    """
+
+    def reducer_override(self, obj: Any) -> Any:
+        raise _NotPlain
+
+
+class _PlainPayload:
+    """Snapshot of a plain payload as pickle bytes, canonicalized by the worker that needs it."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __reduce__(self):
+        return (_PlainPayload, (self.data,))
+
+    def canonical(self) -> Any:
+        """The memo entry _snapshot_payloads would have recorded for the payload."""
+        try:
+            return (canonical_bytes(pickle.loads(self.data)), None)
+        except (TypeError, ValueError, RecursionError) as e:
+            return e
+
+
+def _snapshot_for_pool(steps: List[Dict[str, Any]], memo: Dict[int, Any]) -> None:
+    """_snapshot_payloads for the process pool, leaving canonicalization to the workers.
+
+    Payloads are visited in the same order. Plain payloads are pickled, which
+    runs no user code; any other payload is canonicalized here, exactly as in
+    the serial path, so mutation through serialization has the same effect.
+    """
+    for st in reversed(steps):
+        if "payload" not in st:
+            continue
+        payload = st.get("payload")
+        if id(payload) in memo:
+            continue
+        buf = io.BytesIO()
+        try:
+            _PlainPickler(buf, pickle.HIGHEST_PROTOCOL).dump(payload)
+        except Exception:
+            # Not plain (or too deep to pickle): nothing ran but our reducer_override.
+            try:
+                memo[id(payload)] = (canonical_bytes(payload), None)
+            except (TypeError, ValueError, RecursionError) as e:
+                memo[id(payload)] = e
+        else:
+            memo[id(payload)] = _PlainPayload(buf.getvalue())
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _pool_workers(workers: Optional[int], n_steps: int) -> int:
+    """Worker processes worth starting for `n_steps`; 1 means execute serially.
+
+    No more than the CPUs this process may run on, and no more than one per
+    _MIN_STEPS_PER_WORKER steps: beyond either, extra processes only add
+    start-up and transfer costs.
+    """
+    if workers is None or workers <= 1:
+        return 1
+    return max(1, min(workers, _cpu_count(), n_steps // _MIN_STEPS_PER_WORKER))
+
+
+def _step_id(step: Dict[str, Any], memo: Dict[int, Any]) -> str:
+    """_id_for(step) for a step without an id, with the payload taken from its snapshot."""
+    if "payload" not in step or not all(isinstance(k, str) for k in step):
+        return _id_for(step)
+    payload_canon, _ = _payload_digest(step.get("payload"), memo)
+    h = hashlib.sha256(b"{")
+    for i, key in enumerate(sorted(step)):
+        h.update((("," if i else "") + canonical_json(key) + ":").encode("utf-8"))
+        h.update(payload_canon if key == "payload" else canonical_bytes(step[key]))
+    h.update(b"}")
+    return h.hexdigest()
 
 
-def _simulate_step(step: Dict[str, Any]) -> Dict[str, Any]:
+def _result_id(sid: Any, payload_canon: bytes) -> bytes:
+    # Byte-identical to _id_for({"id": sid, "payload": payload}): sorted keys put
+    # "id" first, so the payload's canonical bytes can be spliced in unchanged.
+    h = hashlib.sha256(b'{"id":' + canonical_bytes(sid) + b',"payload":')
+    h.update(payload_canon)
+    h.update(b"}")
+    return h.digest()
+
+
+def _simulate_record(step: Dict[str, Any], memo: Dict[int, Any]) -> TraceStep:
     """Simulate executing a single step in a deterministic way.
 
     Expected step fields:
-      - id (string)
+      - id (string) optional (derived from the step's content when absent)
       - payload (object) optional
       - timeout_ms (int) optional
       - simulate_duration_ms (int) optional (used to trigger timeout)
       - group (string) optional (for verification/quorum)
 
-    Returns a dict with: id, status, duration_ms, result
+    `memo` (see _payload_digest) holds the payload snapshots taken by
+    _execute_steps, so steps sharing a payload reuse its canonical form.
     """
-    sid = step.get("id") or _id_for(step)
+    sid = step.get("id") or _step_id(step, memo)
     duration = int(step.get("simulate_duration_ms", 0))
     timeout = step.get("timeout_ms")
 
@@ -40,51 +205,223 @@ def _simulate_step(step: Dict[str, Any]) -> Dict[str, Any]:
         payload_hash = None
     else:
         status = "ok"
+        payload_canon, payload_hash = _payload_digest(step.get("payload"), memo)
         # deterministic result: hash of payload (or empty) and step id
-        result = _id_for({"id": sid, "payload": step.get("payload")})
-        # payload-only deterministic identifier (used for quorum checks)
-        payload_hash = _id_for(step.get("payload"))
-
-    return {
-        "id": sid,
-        "status": status,
-        "duration_ms": duration,
-        "result": result,
-        "payload_hash": payload_hash,
-        "group": step.get("group"),
-    }
+        result = _result_id(sid, payload_canon)
+        # payload_hash: payload-only deterministic identifier (used for quorum checks)
+
+    return TraceStep(sid, status, duration, result, payload_hash, step.get("group"))
 
 
-def _compute_quorum(groups: Dict[str, List[Dict[str, Any]]]) -> Dict[str, bool]:
-    """For each group of step results, compute whether a majority agreed.
+class _QuorumTracker:
+    """Per-group `{payload_hash: count}` tallies, noting when each group is settled.
 
-    Use `payload_hash` to determine equivalence of results across different
-    step ids (so identical payloads count towards quorum).
+    Majorities are of all the group's members, including any that never
+    run because a dependency failed. A group is decided as soon as one
+    payload hash holds a majority of the group's members, or when no hash
+    can reach one even if every remaining member agrees with it. The
+    decision is the majority check the complete tally would give, so
+    skipping the remaining members does not change it.
     """
-    quorum = {}
-    for gid, members in groups.items():
-        counts = {}
-        for m in members:
-            r = m.get("payload_hash")
-            counts[r] = counts.get(r, 0) + 1
-        majority = any(c > (len(members) // 2) for c in counts.values())
-        quorum[gid] = majority
-    return quorum
-
-
-def execute_envelope(envelope: Dict[str, Any]) -> Dict[str, Any]:
-    """Execute the envelope deterministically and return an execution trace.
 
-    Trace schema (informal):
-      {
-        "envelope_id": str,
-        "plan_id": str,
-        "steps": [ {id,status,duration_ms,result,group}, ... ],
-        "quorum": { group_id: boolean }
-      }
+    def __init__(self, steps: List[Dict[str, Any]]):
+        self.sizes: Dict[Any, int] = {}
+        for st in steps:
+            gid = st.get("group")
+            if gid:
+                self.sizes[gid] = self.sizes.get(gid, 0) + 1
+        self.tallies: Dict[Any, Dict[Any, int]] = {}
+        # Per group: [results counted, largest count of any one hash]
+        self._progress: Dict[Any, List[int]] = {}
+        self.decided: Dict[Any, bool] = {}
+
+    def add(self, gid: Any, payload_hash: Any) -> Optional[bool]:
+        """Count one result; returns the group's outcome if this result settled it."""
+        if not gid or gid in self.decided:
+            return None
+        counts = self.tallies.setdefault(gid, {})
+        count = counts[payload_hash] = counts.get(payload_hash, 0) + 1
+        progress = self._progress.setdefault(gid, [0, 0])
+        progress[0] += 1
+        progress[1] = max(progress[1], count)
+        total = self.sizes[gid]
+        if progress[1] > total // 2:
+            self.decided[gid] = True
+        elif progress[1] + total - progress[0] <= total // 2:
+            self.decided[gid] = False
+        return self.decided.get(gid)
+
+    def quorum(self) -> Dict[str, bool]:
+        # A majority of the whole group: members that never ran (blocked) count against it.
+        return {gid: self.decided.get(gid, self._progress.get(gid, (0, 0))[1] > size // 2)
+                for gid, size in self.sizes.items()}
+
+
+def _skipped_record(step: Dict[str, Any], sid: Any, status: str = "skipped") -> TraceStep:
+    return TraceStep(sid, status, 0, None, None, step.get("group"))
+
+
+# A dependent step runs once all its dependencies end with one of these;
+# otherwise it is recorded as "blocked" without running.
+_SATISFIED = frozenset(("ok", "skipped"))
+
+
+class _StepError:
+    """The exception a step raised in a pool worker.
+
+    Raised by the parent only if the step's result is used: a member of a
+    settled group or a blocked step would not have run serially.
+    """
+
+    __slots__ = ("exc", "id", "group")
+
+    def __init__(self, exc: Exception, sid: Any, group: Any):
+        self.exc = exc
+        self.id = sid
+        self.group = group
+
+
+def _execute_shard(shard: Tuple[List[Any], List[Any]]) -> List[Any]:
+    """Process-pool entry point: simulate a contiguous run of prepared steps.
+
+    `shard` is (snapshots, steps): each prepared step's "payload" is an index
+    into `snapshots` (canonical bytes, or the exception taking them raised),
+    and a prepared step may itself be an exception, returned in its place.
+    A step that raises is returned as a _StepError.
     """
+    snapshots, prepared = shard
+    tokens = [object() for _ in snapshots]
+    memo: Dict[int, Any] = {id(t): snap.canonical() if isinstance(snap, _PlainPayload) else snap
+                            for t, snap in zip(tokens, snapshots)}
+    out: List[Any] = []
+    for step in prepared:
+        if isinstance(step, Exception):
+            out.append(step)
+            continue
+        if "payload" in step:
+            step["payload"] = tokens[step["payload"]]
+        try:
+            out.append(_simulate_record(step, memo))
+        except Exception as e:
+            out.append(_StepError(e, step["id"], step.get("group")))
+    return out
+
+
+def _prepare_shard(steps: List[Dict[str, Any]], memo: Dict[int, Any]) -> Tuple[List[Any], List[Any]]:
+    """Picklable form of `steps`: only the fields _simulate_record reads, with
+    resolved ids and payloads replaced by their snapshots."""
+    snapshots: List[Any] = []
+    index: Dict[int, int] = {}
+    prepared: List[Any] = []
+    for step in steps:
+        try:
+            if not step.get("id") and "payload" in step and isinstance(memo.get(id(step["payload"])), _PlainPayload):
+                # The id digests the payload, so it is needed here rather than in the worker.
+                memo[id(step["payload"])] = memo[id(step["payload"])].canonical()
+            sid = step.get("id") or _step_id(step, memo)
+        except Exception as e:
+            prepared.append(e)
+            continue
+        item = {k: step[k] for k in ("simulate_duration_ms", "timeout_ms", "group") if k in step}
+        item["id"] = sid
+        if "payload" in step:
+            key = id(step.get("payload"))
+            if key not in index:
+                index[key] = len(snapshots)
+                snapshots.append(memo[key])
+            item["payload"] = index[key]
+        prepared.append(item)
+    return snapshots, prepared
+
+
+def _iter_parallel(steps: List[Dict[str, Any]], memo: Dict[int, Any], workers: int) -> Iterator[Any]:
+    """Records of `steps` from the pool in step order; see _execute_shard."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    # A few shards per worker evens out uneven payload sizes; the cap and the
+    # bounded window keep very large envelopes from being prepared all at once.
+    size = min(max(1, -(-len(steps) // (workers * 4))), _MAX_SHARD_STEPS)
+    starts = iter(range(0, len(steps), size))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Any] = deque()
+        for i in starts:
+            pending.append(pool.submit(_execute_shard, _prepare_shard(steps[i:i + size], memo)))
+            if len(pending) >= workers * 2:
+                break
+        # Shards are consumed in submission order, so the trace keeps step
+        # order and the first failing step raises, as in the serial path.
+        while pending:
+            part = pending.popleft().result()
+            i = next(starts, None)
+            if i is not None:
+                pending.append(pool.submit(_execute_shard, _prepare_shard(steps[i:i + size], memo)))
+            for s in part:
+                if isinstance(s, Exception):
+                    # The step id could not be computed, which fails serially too.
+                    raise s
+                yield s
+
+
+def _wave_ranges(steps: List[Dict[str, Any]]) -> List[range]:
+    """Index ranges of `steps`, one per wave, in execution order.
+
+    Either every step carries a `wave` (a non-negative int, non-decreasing in
+    step order, as build_execution_envelope(schedule="waves") emits) or none
+    does, in which case all steps form one wave.
+    """
+    if "wave" not in steps[0]:
+        if any("wave" in st for st in steps):
+            raise ValueError("either every step or no step may have a wave")
+        return [range(len(steps))]
+    ranges = []
+    start = 0
+    prev = None
+    for idx, st in enumerate(steps):
+        if "wave" not in st:
+            raise ValueError("either every step or no step may have a wave")
+        wave = st["wave"]
+        if not isinstance(wave, int) or isinstance(wave, bool) or wave < 0:
+            raise ValueError(f"step[{idx}].wave must be a non-negative integer")
+        if prev is not None and wave != prev:
+            if wave < prev:
+                raise ValueError("steps must be ordered by wave")
+            ranges.append(range(start, idx))
+            start = idx
+        prev = wave
+    ranges.append(range(start, len(steps)))
+    return ranges
+
+
+def _dependencies(steps: List[Dict[str, Any]]) -> Optional[List[Tuple[int, ...]]]:
+    """Per step, the indexes of the steps named in its `after`; None if no step has one.
+
+    `after` may only name ids of earlier steps, so step order is always a
+    topological order and the graph cannot have a cycle.
+    """
+    if not any("after" in st for st in steps):
+        return None
+    position: Dict[str, int] = {}
+    deps: List[Tuple[int, ...]] = []
+    for idx, st in enumerate(steps):
+        after = st.get("after", [])
+        if not isinstance(after, list):
+            raise TypeError(f"step[{idx}].after must be a list")
+        if not all(isinstance(a, str) and a in position for a in after):
+            raise ValueError(f"step[{idx}].after must list ids of earlier steps")
+        deps.append(tuple(position[a] for a in after))
+        sid = st.get("id")
+        if isinstance(sid, str):
+            if sid in position:
+                raise ValueError(f"duplicate step id in dependency graph: {sid}")
+            position[sid] = idx
+    return deps
+
+
+def _validated_steps(envelope: Dict[str, Any], workers: Optional[int]) -> List[Dict[str, Any]]:
     if not isinstance(envelope, dict):
         raise TypeError("envelope must be an object")
+    if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers < 1):
+        raise ValueError("workers must be a positive integer")
     if "envelope_id" not in envelope or "steps" not in envelope:
         raise ValueError("envelope must contain envelope_id and steps")
 
@@ -100,49 +437,159 @@ def execute_envelope(envelope: Dict[str, Any]) -> Dict[str, Any]:
     for idx, step in enumerate(steps):
         if not isinstance(step, dict):
             raise TypeError(f"step[{idx}] must be an object/dict")
+    _wave_ranges(steps)
+    if _dependencies(steps) is not None and "wave" in steps[0]:
+        raise ValueError("steps cannot have both a wave and after")
 
-    expected_envelope_id = _id_for({"plan_id": envelope.get("plan_id"), "steps": [s.get("id") for s in steps]})
+    step_ids = [s.get("id") for s in steps]
+    id_scheme = envelope.get("id_scheme")
+    if id_scheme is None:
+        expected_envelope_id = _id_for({"plan_id": envelope.get("plan_id"), "steps": step_ids})
+    elif id_scheme == MERKLE_SCHEME:
+        # Also accepts a slice carrying step_count, step_offset and proof.
+        expected_envelope_id = slice_envelope_id(envelope, step_ids)
+    else:
+        raise ValueError(f"unknown envelope id_scheme: {id_scheme!r}")
     if isinstance(envelope_id, str) and len(envelope_id) == 64 and all(c in "0123456789abcdef" for c in envelope_id):
         if envelope_id != expected_envelope_id:
             raise ValueError("envelope_id mismatch: possible tampering or reordered steps")
+    return steps
 
-    trace_steps = []
-    groups: Dict[str, List[Dict[str, Any]]] = {}
-
-    # Defensive snapshotting: deep-copy payloads in reverse order so that
-    # mutable payloads that attempt to mutate shared targets during
-    # serialization/copying do not affect snapshots of later steps.
-    import copy as _copy
-
-    n = len(steps)
-    _snapshots = [None] * n
-    for i in range(n - 1, -1, -1):
-        st = steps[i]
-        # do not call into mapping methods earlier than necessary; we still use deepcopy
-        # which may have side-effects, but doing it reverse minimizes cross-step leakage
-        if isinstance(st, dict) and "payload" in st:
-            _snapshots[i] = _copy.deepcopy(st.get("payload"))
-
-    # Execute steps in forward order using the precomputed snapshots
-    for idx, step in enumerate(steps):
-        if not isinstance(step, dict):
-            raise TypeError("each step must be an object")
-        safe_step = dict(step)
-        if "payload" in safe_step:
-            safe_step["payload"] = _snapshots[idx]
-        s = _simulate_step(safe_step)
-        trace_steps.append(s)
-        gid = s.get("group")
-        if gid:
-            groups.setdefault(gid, []).append(s)
-
-    quorum = _compute_quorum(groups) if groups else {}
 
-    trace = {
+def iter_execute_envelope(envelope: Dict[str, Any], workers: Optional[int] = None, *,
+                          early_quorum: bool = False) -> Iterator[Dict[str, Any]]:
+    """Execute the envelope, yielding each step result as soon as it is ready.
+
+    The last item yielded is the summary `{envelope_id, plan_id, quorum}`.
+    Quorum is tallied per group as results pass by, so no result is retained;
+    memory beyond the envelope itself is the payload snapshots plus one count
+    per distinct payload hash per group. Validation errors are raised on the
+    first `next()`. `workers` and `early_quorum` are as for execute_envelope.
+    """
+    for item in iter_trace_records(envelope, workers, early_quorum=early_quorum):
+        yield item.to_dict() if isinstance(item, TraceStep) else item
+
+
+def iter_trace_records(envelope: Dict[str, Any], workers: Optional[int] = None, *,
+                       early_quorum: bool = False) -> Iterator[Any]:
+    """iter_execute_envelope yielding `TraceStep` records (raw digests) instead of dicts.
+
+    The final summary item is still a plain dict.
+    """
+    steps = _validated_steps(envelope, workers)
+    yield from _execute_steps(envelope, steps, workers, early_quorum)
+
+
+def _execute_steps(envelope: Dict[str, Any], steps: List[Dict[str, Any]], workers: Optional[int],
+                   early_quorum: bool) -> Iterator[Any]:
+    """iter_trace_records for `steps` already returned by _validated_steps."""
+    # Defensive snapshotting: canonical payload bytes are taken once per
+    # distinct payload, in reverse order, before any step executes, so
+    # payloads that mutate shared targets during serialization do not affect
+    # snapshots of later steps. Serially, memory stays flat: no payload is
+    # copied. For the pool, plain payloads are pickled instead.
+    memo: Dict[int, Any] = {}
+    workers = _pool_workers(workers, len(steps))
+    if workers > 1:
+        _snapshot_for_pool(steps, memo)
+    else:
+        _snapshot_payloads(steps, memo)
+
+    tracker = _QuorumTracker(steps)
+    decided = tracker.decided if early_quorum else {}
+    deps = _dependencies(steps)
+    unsatisfied = set()  # indexes of steps that did not end in _SATISFIED, tracked only for graphs
+
+    def blocked(i: int) -> bool:
+        return deps is not None and any(d in unsatisfied for d in deps[i])
+
+    if workers > 1:
+        # Shards are dispatched ahead of the tally, so settled groups' results
+        # (or errors) are discarded instead.
+        parallel = _iter_parallel(steps, memo, workers)
+        executed = (_skipped_record(step, s.id) if s.group in decided else s for step, s in zip(steps, parallel))
+    else:
+        # Execute steps in forward order against the snapshots
+        executed = (_skipped_record(step, step.get("id") or _step_id(step, memo)) if step.get("group") in decided
+                    else _skipped_record(step, step.get("id") or _step_id(step, memo), "blocked") if blocked(i)
+                    else _simulate_record(step, memo) for i, step in enumerate(steps))
+
+    for i, s in enumerate(executed):
+        if isinstance(s, _StepError):
+            if not blocked(i):
+                parallel.close()  # shut the pool down here rather than whenever it is collected
+                raise s.exc
+            s = _skipped_record(steps[i], s.id, "blocked")
+        if deps is not None:
+            if s.status != "skipped" and s.status != "blocked" and blocked(i):
+                s = _skipped_record(steps[i], s.id, "blocked")
+            if s.status not in _SATISFIED:
+                unsatisfied.add(i)
+        if s.status != "skipped" and s.status != "blocked":
+            tracker.add(s.group, s.payload_hash)
+        yield s
+
+    yield {
         "envelope_id": envelope.get("envelope_id"),
         "plan_id": envelope.get("plan_id"),
+        "quorum": tracker.quorum(),
+    }
+
+
+def execute_envelope(envelope: Dict[str, Any], workers: Optional[int] = None, *,
+                     early_quorum: bool = False) -> Dict[str, Any]:
+    """Execute the envelope deterministically and return an execution trace.
+
+    Trace schema (informal):
+      {
+        "envelope_id": str,
+        "plan_id": str,
+        "steps": [ {id,status,duration_ms,result,group}, ... ],
+        "quorum": { group_id: boolean }
+      }
+
+    `workers` > 1 shards step execution across up to that many processes,
+    capped by the usable CPUs and the envelope size (small envelopes run
+    serially). Payload snapshots are still taken here, before any step runs:
+    plain payloads are pickled, and the workers canonicalize and hash them.
+    The trace is the same as with `workers=None`. For envelopes too large to
+    hold the whole trace, use iter_execute_envelope.
+
+    With `early_quorum=True`, once a group's quorum outcome is settled (a
+    majority `payload_hash`, or none possible any more) its remaining members
+    are not executed and are recorded with status "skipped". The quorum
+    outcome is the same as without it.
+
+    A step whose `after` names a step that ended neither "ok" nor "skipped"
+    (timed out, or itself blocked) is not executed and is recorded with
+    status "blocked". A blocked member still counts towards its group's
+    size, so it can keep the group from reaching a majority.
+
+    Wave-scheduled envelopes must list their steps in wave order. Simulated
+    results do not depend on timing, so waves do not change the trace; the
+    asynchronous executor starts each wave only after the previous one ends.
+    """
+    return _trace_from_records(iter_trace_records(envelope, workers, early_quorum=early_quorum))
+
+
+def _trace_from_records(records: Iterable[Any]) -> Dict[str, Any]:
+    """Trace dict from iter_trace_records output (step records, then the summary).
+
+    Records are converted to dicts as they arrive rather than collected first.
+    """
+    trace_steps = []
+    summary: Dict[str, Any] = {}
+    for item in records:
+        if isinstance(item, TraceStep):
+            trace_steps.append(item.to_dict())
+        else:
+            summary = item
+
+    trace = {
+        "envelope_id": summary["envelope_id"],
+        "plan_id": summary["plan_id"],
         "steps": trace_steps,
-        "quorum": quorum,
+        "quorum": summary["quorum"],
     }
     return trace
 
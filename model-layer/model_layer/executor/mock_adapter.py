@@ -0,0 +1,51 @@
+"""Local mock adapter for the async executor.
+
+`MockAdapter` is an async adapter callable that sleeps for a configurable
+latency and then echoes the step payload, so `execute_envelope_async` with a
+mock reproduces the simulated trace. By default the latency is the step's
+`simulate_duration_ms`, making simulated timeouts real ones.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+
+class MockAdapter:
+    """Echo adapter with configurable latency and failures.
+
+    `latency_ms` applies to every step unless `latencies` has an entry for
+    the step id; with neither, `simulate_duration_ms` is used. Steps whose id
+    is in `fail` raise RuntimeError. `calls`, `completed` and `cancelled`
+    record step ids as they start, finish and are cancelled.
+    """
+
+    def __init__(self, latency_ms: Optional[int] = None, *, latencies: Optional[Dict[Any, int]] = None,
+                 fail: Iterable[Any] = ()):
+        self.latency_ms = latency_ms
+        self.latencies = dict(latencies or {})
+        self.fail = set(fail)
+        self.calls: list = []
+        self.completed: list = []
+        self.cancelled: list = []
+
+    def latency_for(self, step: Dict[str, Any]) -> int:
+        sid = step.get("id")
+        if sid in self.latencies:
+            return self.latencies[sid]
+        if self.latency_ms is not None:
+            return self.latency_ms
+        return int(step.get("simulate_duration_ms", 0))
+
+    async def __call__(self, step: Dict[str, Any]) -> Any:
+        sid = step.get("id")
+        self.calls.append(sid)
+        try:
+            await asyncio.sleep(self.latency_for(step) / 1000)
+        except asyncio.CancelledError:
+            self.cancelled.append(sid)
+            raise
+        if sid in self.fail:
+            raise RuntimeError(f"mock failure for step {sid!r}")
+        self.completed.append(sid)
+        return step.get("payload")
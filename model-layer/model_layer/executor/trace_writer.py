@@ -0,0 +1,30 @@
+"""NDJSON trace output for large envelopes.
+
+`write_trace_ndjson(envelope, out)` streams `iter_execute_envelope` to `out`
+(a path or a text file object): one canonical JSON line per step result, in
+step order, then one summary line `{envelope_id, plan_id, quorum}`. Only one
+step result is in memory at a time. Kept out of executor.py, which stays
+free of I/O.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional, TextIO, Union
+
+from ..canonical import canonical_json
+from .executor import iter_execute_envelope
+
+
+def write_trace_ndjson(envelope: Dict[str, Any], out: Union[str, os.PathLike, TextIO], workers: Optional[int] = None) -> Dict[str, Any]:
+    """Write the execution trace as NDJSON and return the summary record."""
+    if hasattr(out, "write"):
+        return _write(envelope, out, workers)
+    with open(out, "w", encoding="utf-8") as fh:
+        return _write(envelope, fh, workers)
+
+
+def _write(envelope: Dict[str, Any], fh: TextIO, workers: Optional[int]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    for record in iter_execute_envelope(envelope, workers):
+        fh.write(canonical_json(record) + "\n")
+    return record
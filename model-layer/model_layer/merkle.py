@@ -0,0 +1,159 @@
+"""Merkle envelope ids: verify one step or a slice of an envelope in O(log n).
+
+A flat envelope id hashes the whole step-id list, so checking any step means
+rehashing every step. With `id_scheme: "merkle"` the step ids are instead the
+leaves of a Merkle tree shaped as in RFC 6962 (the left subtree holds the
+largest power of two leaves smaller than n), and
+
+    envelope_id = sha256(canonical({"plan_id", "step_count", "steps_root"}))
+
+A contiguous slice of steps plus `range_proof()` (at most two hashes per tree
+level) is enough to recompute the id, so a shard can check its own steps
+without seeing the rest. Leaves and interior nodes are hashed with distinct
+prefixes so one cannot be passed off as the other.
+
+`MerkleAccumulator` keeps only the roots of its perfect subtrees (one per set
+bit of the leaf count), so appending a step is amortized O(1) and the root is
+available at any point without revisiting earlier steps.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .canonical import canonical_bytes, sha256_hex
+
+MERKLE_SCHEME = "merkle"
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def leaf_hash(step_id: Any) -> bytes:
+    return hashlib.sha256(_LEAF + canonical_bytes(step_id)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Size of the left subtree of an n-leaf tree (n >= 2)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class MerkleAccumulator:
+    """Append-only Merkle tree over step ids holding O(log n) state."""
+
+    __slots__ = ("_peaks", "size")
+
+    def __init__(self, step_ids: Iterable[Any] = ()):
+        # (leaf count, root) of each perfect subtree, largest first
+        self._peaks: List[Tuple[int, bytes]] = []
+        self.size = 0
+        for step_id in step_ids:
+            self.append(step_id)
+
+    def append(self, step_id: Any) -> None:
+        self._push(leaf_hash(step_id))
+
+    def _push(self, digest: bytes) -> None:
+        count = 1
+        while self._peaks and self._peaks[-1][0] == count:
+            left = self._peaks.pop()[1]
+            digest = _node(left, digest)
+            count *= 2
+        self._peaks.append((count, digest))
+        self.size += 1
+
+    def root(self) -> bytes:
+        if not self._peaks:
+            raise ValueError("merkle tree has no leaves")
+        digest = self._peaks[-1][1]
+        for _, left in reversed(self._peaks[:-1]):
+            digest = _node(left, digest)
+        return digest
+
+
+def _subtree_root(leaves: Sequence[bytes]) -> bytes:
+    acc = MerkleAccumulator()
+    for digest in leaves:
+        acc._push(digest)
+    return acc.root()
+
+
+def merkle_envelope_id(plan_id: Any, root: bytes, step_count: int) -> str:
+    return sha256_hex({"plan_id": plan_id, "step_count": step_count, "steps_root": root.hex()})
+
+
+def _collect_proof(leaves: Sequence[bytes], lo: int, hi: int, start: int, end: int, out: List[str]) -> None:
+    if hi <= start or end <= lo:
+        out.append(_subtree_root(leaves[start:end]).hex())
+    elif not (lo <= start and end <= hi):
+        k = start + _split(end - start)
+        _collect_proof(leaves, lo, hi, start, k, out)
+        _collect_proof(leaves, lo, hi, k, end, out)
+
+
+def range_proof(step_ids: Sequence[Any], lo: int, hi: int) -> List[str]:
+    """Hex subtree roots needed, with step_ids[lo:hi], to recompute the root."""
+    n = len(step_ids)
+    if not 0 <= lo < hi <= n:
+        raise ValueError(f"invalid step range [{lo}, {hi}) for {n} steps")
+    proof: List[str] = []
+    _collect_proof([leaf_hash(s) for s in step_ids], lo, hi, 0, n, proof)
+    return proof
+
+
+def _rebuild(leaves: Sequence[bytes], proof: Iterator[str], lo: int, hi: int, start: int, end: int) -> bytes:
+    if hi <= start or end <= lo:
+        item = next(proof, None)
+        if not isinstance(item, str) or len(item) != 64:
+            raise ValueError("invalid merkle proof: missing or malformed hash")
+        return bytes.fromhex(item)
+    if lo <= start and end <= hi:
+        return _subtree_root(leaves[start - lo:end - lo])
+    k = start + _split(end - start)
+    left = _rebuild(leaves, proof, lo, hi, start, k)
+    return _node(left, _rebuild(leaves, proof, lo, hi, k, end))
+
+
+def range_root(step_count: int, lo: int, step_ids: Sequence[Any], proof: Sequence[str]) -> bytes:
+    """Root of a `step_count`-leaf tree whose leaves lo.. are `step_ids`, given their range proof."""
+    hi = lo + len(step_ids)
+    if not 0 <= lo < hi <= step_count:
+        raise ValueError(f"invalid step range [{lo}, {hi}) for {step_count} steps")
+    it = iter(proof)
+    root = _rebuild([leaf_hash(s) for s in step_ids], it, lo, hi, 0, step_count)
+    if next(it, None) is not None:
+        raise ValueError("invalid merkle proof: unused hashes")
+    return root
+
+
+def envelope_slice(envelope: Dict[str, Any], lo: int, hi: int) -> Dict[str, Any]:
+    """Steps lo..hi of a merkle envelope, with what is needed to verify them alone."""
+    if envelope.get("id_scheme") != MERKLE_SCHEME:
+        raise ValueError("envelope does not use merkle ids")
+    steps = envelope["steps"]
+    return {
+        "plan_id": envelope.get("plan_id"),
+        "steps": steps[lo:hi],
+        "envelope_id": envelope["envelope_id"],
+        "id_scheme": MERKLE_SCHEME,
+        "step_count": len(steps),
+        "step_offset": lo,
+        "proof": range_proof([s.get("id") for s in steps], lo, hi),
+    }
+
+
+def slice_envelope_id(envelope: Dict[str, Any], step_ids: Optional[Sequence[Any]] = None) -> str:
+    """Envelope id implied by a merkle envelope or a slice made by envelope_slice."""
+    if step_ids is None:
+        step_ids = [s.get("id") for s in envelope["steps"]]
+    step_count = envelope.get("step_count", len(step_ids))
+    offset = envelope.get("step_offset", 0)
+    for name, value in (("step_count", step_count), ("step_offset", offset)):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError(f"envelope.{name} must be an integer")
+    root = range_root(step_count, offset, step_ids, envelope.get("proof", ()))
+    return merkle_envelope_id(envelope.get("plan_id"), root, step_count)
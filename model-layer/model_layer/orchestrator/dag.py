@@ -0,0 +1,83 @@
+"""Dependency graphs between plan nodes.
+
+A plan may carry `depends_on: {node: [node, ...]}`, e.g. a merge that waits
+for its verifiers, which wait for a generator. The orchestrator then emits
+the steps in `critical_path_order`: a topological order that, whenever
+several steps are ready, takes first the one with the longest chain of steps
+still depending on it, then the smallest node id. Each dependent step lists
+the ids of the steps it waits for in `after`.
+
+Every step shares the plan's timeout, so chain length in steps is the
+critical-path measure. Starting the longest chain first keeps the tail of
+the schedule from waiting on a late critical chain.
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, List, Tuple
+
+
+def _validated_depends_on(nodes: List[str], depends_on: Any) -> Dict[str, List[str]]:
+    if not isinstance(depends_on, dict):
+        raise TypeError("plan.depends_on must be an object")
+    known = set(nodes)
+    deps: Dict[str, List[str]] = {}
+    for node, parents in depends_on.items():
+        if node not in known:
+            raise ValueError(f"depends_on names a node not in plan.nodes: {node}")
+        if not isinstance(parents, list):
+            raise TypeError(f"depends_on[{node!r}] must be a list")
+        for p in parents:
+            if p not in known:
+                raise ValueError(f"depends_on[{node!r}] names a node not in plan.nodes: {p}")
+        if len(set(parents)) != len(parents):
+            raise ValueError(f"duplicate dependency in depends_on[{node!r}]")
+        deps[node] = sorted(parents)
+    return deps
+
+
+def critical_path_order(nodes: List[str], depends_on: Any) -> List[Tuple[str, List[str]]]:
+    """(node, sorted dependencies) for each of the unique `nodes`, in schedule order.
+
+    Raises ValueError if the dependencies form a cycle.
+    """
+    deps = _validated_depends_on(nodes, depends_on)
+    children: Dict[str, List[str]] = {n: [] for n in nodes}
+    indegree = {n: 0 for n in nodes}
+    for node, parents in deps.items():
+        for p in parents:
+            children[p].append(node)
+            indegree[node] += 1
+
+    # Kahn's algorithm once to find a topological order (and any cycle) ...
+    remaining = dict(indegree)
+    ready = sorted(n for n in nodes if not remaining[n])
+    topo: List[str] = []
+    while ready:
+        node = ready.pop()
+        topo.append(node)
+        for c in children[node]:
+            remaining[c] -= 1
+            if not remaining[c]:
+                ready.append(c)
+    if len(topo) != len(nodes):
+        cycle = sorted(n for n in nodes if remaining[n])
+        raise ValueError(f"dependency cycle among nodes: {', '.join(cycle)}")
+
+    # ... then the longest chain of steps from each node to the end of the plan ...
+    level: Dict[str, int] = {}
+    for node in reversed(topo):
+        level[node] = 1 + max((level[c] for c in children[node]), default=0)
+
+    # ... and again, taking the ready node with the longest chain first.
+    heap = [(-level[n], n) for n in nodes if not indegree[n]]
+    heapq.heapify(heap)
+    order = []
+    while heap:
+        _, node = heapq.heappop(heap)
+        order.append((node, deps.get(node, [])))
+        for c in children[node]:
+            indegree[c] -= 1
+            if not indegree[c]:
+                heapq.heappush(heap, (-level[c], c))
+    return order
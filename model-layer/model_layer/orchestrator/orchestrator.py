@@ -6,35 +6,98 @@ I/O or network access.
 """
 from __future__ import annotations
 
-import json
-import hashlib
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
-
-def canonical_json(obj: Any) -> str:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+from ..cache import LRUCache
+from ..canonical import sha256_digest, sha256_hex
+from ..merkle import MERKLE_SCHEME, MerkleAccumulator, merkle_envelope_id
+from ..records import EnvelopeStep, freeze
+from ..registry import AdapterRegistry
+from .dag import _validated_depends_on, critical_path_order
+from .waves import WAVES_SCHEDULE, assign_waves
 
 
 def _id_for(obj: Any) -> str:
-    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+    return sha256_hex(obj)
 
 
-def _adapter_map(adapters: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+def _adapter_map(adapters: Union[List[Dict[str, Any]], AdapterRegistry]) -> Dict[str, Dict[str, Any]]:
+    if isinstance(adapters, AdapterRegistry):
+        return adapters.by_id
     return {a["adapter_id"]: a for a in adapters}
 
 
-def build_execution_envelope(plan: Dict[str, Any], adapters: List[Dict[str, Any]]) -> Dict[str, Any]:
+class EnvelopeCache(LRUCache):
+    """Bounded LRU of built envelopes keyed on the plan's canonical hash and the adapter fingerprint."""
+
+
+def adapter_fingerprint(adapters: Union[List[Dict[str, Any]], AdapterRegistry]) -> str:
+    """Stable digest of an adapter list: changes whenever any descriptor, or their order, does."""
+    if isinstance(adapters, AdapterRegistry):
+        return adapters.fingerprint
+    return sha256_hex(adapters)
+
+
+def build_execution_envelope(plan: Dict[str, Any], adapters: Union[List[Dict[str, Any]], AdapterRegistry], *, id_scheme: Optional[str] = None,
+                             cache: Optional[EnvelopeCache] = None, schedule: Optional[str] = None) -> Dict[str, Any]:
+    """Build the envelope; `id_scheme="merkle"` derives envelope_id from a Merkle root (see merkle.py).
+
+    `adapters` is a descriptor list or an AdapterRegistry.
+
+    `schedule="waves"` packs the steps into waves sized by each adapter's
+    concurrency and memory limit (see waves.py); steps are then ordered by
+    wave and carry `replica` and `wave`. In this mode plan.nodes may repeat an
+    adapter id, one step per occurrence, and the plan may give a per-step
+    `memory_mb` estimate.
+
+    A plan with `depends_on: {node: [node, ...]}` must be acyclic. Its steps
+    come in critical-path topological order (see dag.py), and each dependent
+    step lists the ids of the steps it waits for in `after`.
+
+    With `cache`, an envelope already built for an identical plan and adapter
+    list is returned as is: the same shared object, frozen (FrozenDict and
+    FrozenList) so no caller can change it for the others. Copy it to modify.
+    Plans or adapters that cannot be canonicalized bypass the cache.
+    """
+    # Before the cache lookup: a tuple canonicalizes like a list, so a plan
+    # of the wrong shape would otherwise get the envelope of a valid one.
+    _validate_plan(plan, id_scheme, schedule)
+    if cache is not None:
+        try:
+            key = (sha256_digest(plan), adapter_fingerprint(adapters), id_scheme, schedule)
+        except (TypeError, ValueError):
+            key = None
+        if key is not None:
+            envelope = cache.get(key)
+            if envelope is None:
+                envelope = freeze(_build_envelope(plan, adapters, id_scheme, schedule))
+                cache.put(key, envelope)
+            return envelope
+    return _build_envelope(plan, adapters, id_scheme, schedule)
+
+
+def _validate_plan(plan: Dict[str, Any], id_scheme: Optional[str], schedule: Optional[str]) -> None:
     if not isinstance(plan, dict):
         raise TypeError("plan must be an object")
+    if id_scheme not in (None, MERKLE_SCHEME):
+        raise ValueError(f"unknown id_scheme: {id_scheme!r}")
+    if schedule not in (None, WAVES_SCHEDULE):
+        raise ValueError(f"unknown schedule: {schedule!r}")
     if "strategy" not in plan or "nodes" not in plan:
         raise ValueError("plan must contain strategy and nodes")
     if not isinstance(plan["nodes"], list):
         raise TypeError("nodes must be a list")
+    if plan.get("depends_on") is not None:
+        _validated_depends_on(plan["nodes"], plan["depends_on"])
+
 
+def _build_envelope(plan: Dict[str, Any], adapters: Union[List[Dict[str, Any]], AdapterRegistry], id_scheme: Optional[str],
+                    schedule: Optional[str] = None) -> Dict[str, Any]:
+    """The envelope for a plan that passed _validate_plan."""
     # Structural validations
     if len(plan["nodes"]) == 0:
         raise ValueError("plan.nodes must not be empty")
-    if len(set(plan["nodes"])) != len(plan["nodes"]):
+    if schedule is None and len(set(plan["nodes"])) != len(plan["nodes"]):
         raise ValueError("duplicate node ids in plan.nodes")
 
     amap = _adapter_map(adapters)
@@ -47,9 +110,19 @@ def build_execution_envelope(plan: Dict[str, Any], adapters: List[Dict[str, Any]
     # Determine node ordering: deterministic sorted order
     nodes_sorted = sorted(plan["nodes"])
 
-    steps = []
+    steps: List[EnvelopeStep] = []
     timeout_ms = plan.get("timeout_ms")
-    for node in nodes_sorted:
+    depends_on = plan.get("depends_on")
+    if depends_on is not None and schedule is not None:
+        raise ValueError("plan.depends_on cannot be combined with a schedule")
+    if schedule == WAVES_SCHEDULE:
+        placed = [(node, replica, wave, None) for node, replica, wave in assign_waves(nodes_sorted, amap, plan.get("memory_mb"))]
+    elif depends_on is not None:
+        placed = [(node, None, None, parents) for node, parents in critical_path_order(nodes_sorted, depends_on)]
+    else:
+        placed = [(node, None, None, None) for node in nodes_sorted]
+    step_ids: Dict[str, str] = {}
+    for node, replica, wave, parents in placed:
         step = {
             "node": node,
             "adapter": amap[node]["adapter_id"],
@@ -57,16 +130,33 @@ def build_execution_envelope(plan: Dict[str, Any], adapters: List[Dict[str, Any]
         }
         if timeout_ms is not None:
             step["timeout_ms"] = timeout_ms
-        # deterministic per-step id
-        step_id = _id_for(step)
-        step["id"] = step_id
-        steps.append(step)
+        if wave is not None:
+            step["replica"] = replica
+            step["wave"] = wave
+        after = None
+        if parents:
+            # Covered by the step id, so the envelope_id pins the whole graph.
+            after = step["after"] = [step_ids[p] for p in parents]
+        # deterministic per-step id, kept as a raw digest until the envelope is returned
+        step_id = sha256_digest(step)
+        if depends_on is not None:
+            step_ids[node] = step_id.hex()
+        steps.append(EnvelopeStep(step["node"], step["adapter"], step["mode"], step_id, timeout_ms, replica, wave, after))
 
     plan_id = plan.get("plan_id") or _id_for(plan)
+    step_dicts = [s.to_dict() for s in steps]
+    if id_scheme == MERKLE_SCHEME:
+        tree = MerkleAccumulator(s["id"] for s in step_dicts)
+        return {
+            "plan_id": plan_id,
+            "steps": step_dicts,
+            "envelope_id": merkle_envelope_id(plan_id, tree.root(), tree.size),
+            "id_scheme": MERKLE_SCHEME,
+        }
     envelope = {
         "plan_id": plan_id,
-        "steps": steps,
-        "envelope_id": _id_for({"plan_id": plan_id, "steps": [s["id"] for s in steps]}),
+        "steps": step_dicts,
+        "envelope_id": _id_for({"plan_id": plan_id, "steps": [s["id"] for s in step_dicts]}),
     }
     return envelope
 
@@ -0,0 +1,64 @@
+"""Capacity-aware wave scheduling for envelope steps.
+
+With `schedule="waves"` the orchestrator gives every step a `wave` number.
+All steps of one wave may run at once, and wave k+1 starts only after wave k
+has finished. Each adapter takes at most `slots` steps per wave:
+
+    slots = min(capabilities.concurrency, limits.memory_mb_max // plan.memory_mb)
+
+The memory term applies only when the plan gives a per-step `memory_mb`
+estimate and the adapter declares `limits.memory_mb_max`. A plan whose
+estimate exceeds an adapter's limit is rejected, as the adapter contract
+requires.
+
+An adapter's steps fill its slots in order, so the adapter is saturated in
+every wave but its last one. The number of waves is the fewest any schedule
+within the slots can have: the largest ceil(steps / slots) over all adapters.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+WAVES_SCHEDULE = "waves"
+
+
+def _positive_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+
+def wave_slots(descriptor: Dict[str, Any], memory_mb: Optional[int] = None) -> int:
+    """Steps the adapter can run in one wave."""
+    adapter_id = descriptor.get("adapter_id")
+    concurrency = (descriptor.get("capabilities") or {}).get("concurrency", 1)
+    if not _positive_int(concurrency):
+        raise ValueError(f"adapter {adapter_id!r}: capabilities.concurrency must be a positive integer")
+    memory_max = (descriptor.get("limits") or {}).get("memory_mb_max")
+    if memory_mb is None or memory_max is None:
+        return concurrency
+    if not _positive_int(memory_max):
+        raise ValueError(f"adapter {adapter_id!r}: limits.memory_mb_max must be a positive integer")
+    if memory_mb > memory_max:
+        raise ValueError(f"plan memory_mb {memory_mb} exceeds memory_mb_max {memory_max} of adapter {adapter_id!r}")
+    return min(concurrency, memory_max // memory_mb)
+
+
+def assign_waves(nodes: List[str], amap: Dict[str, Dict[str, Any]],
+                 memory_mb: Optional[int] = None) -> List[Tuple[str, int, int]]:
+    """(node, replica, wave) for every entry of sorted `nodes`, in wave order.
+
+    `replica` numbers the repeats of a node (a fanout wider than the adapter
+    set lists nodes more than once). Within a wave, entries keep the order of
+    `nodes`.
+    """
+    if memory_mb is not None and not _positive_int(memory_mb):
+        raise ValueError("plan.memory_mb must be a positive integer")
+    slots: Dict[str, int] = {}
+    replicas: Dict[str, int] = {}
+    out = []
+    for node in nodes:
+        if node not in slots:
+            slots[node] = wave_slots(amap[node], memory_mb)
+        replica = replicas[node] = replicas.get(node, -1) + 1
+        out.append((node, replica, replica // slots[node]))
+    out.sort(key=lambda t: t[2])  # stable
+    return out
@@ -6,23 +6,21 @@ validates inputs strictly.
 """
 from __future__ import annotations
 
-import hashlib
-import json
 import random
-from typing import Any, Dict, List, Optional
-
-MAX_FANOUT = 1000
+from typing import Any, Dict, List, Optional, Union
 
+from ..canonical import sha256_hex
+from ..registry import AdapterRegistry
+from .selection import weighted_allocation, weighted_order
 
-def canonical_json(obj: Any) -> str:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+MAX_FANOUT = 1000
 
 
 def _id_for(obj: Any) -> str:
-    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+    return sha256_hex(obj)
 
 
-def build_execution_plan(prompt: str, adapters: List[Dict[str, Any]], *, strategy: str = "single", fanout: Optional[int] = None, quorum: Optional[int] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+def build_execution_plan(prompt: str, adapters: Union[List[Dict[str, Any]], AdapterRegistry], *, strategy: str = "single", fanout: Optional[int] = None, quorum: Optional[int] = None, seed: Optional[int] = None, selection: str = "seeded", health: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
     """Builds a deterministic execution plan from inputs.
 
     Validations / invariants:
@@ -31,23 +29,39 @@ def build_execution_plan(prompt: str, adapters: List[Dict[str, Any]], *, strateg
     - quorum must be positive and <= node count if provided
     - strategy must be one of 'single', 'fanout', 'verify'
     - seed if provided must be an int >= 0
+    - selection must be 'seeded' (default) or 'weighted'; 'weighted' picks
+      nodes by capacity (concurrency, and latency from the `health`
+      snapshot keyed by adapter_id), see selection.py. Without a seed the
+      weighted order is seeded from the prompt, so requests spread by capacity
+      instead of all landing on the same nodes
+    - verify needs `quorum` adapters that are not unavailable
 
     Returns dict with keys: plan_id, strategy, nodes (list of adapter ids), seed
     """
     if not isinstance(prompt, str):
         raise TypeError("prompt must be a string")
-    if not isinstance(adapters, list) or len(adapters) == 0:
+    # A registry's ids are kept in registration order, the order a list would be in.
+    ids = adapters.ids() if isinstance(adapters, AdapterRegistry) else None
+    if (ids is None and not isinstance(adapters, list)) or len(adapters) == 0:
         raise ValueError("adapters must be a non-empty list")
 
     if seed is not None:
         if not isinstance(seed, int) or seed < 0:
             raise ValueError("seed must be a non-negative integer")
+        selection_seed: Any = seed
     else:
         seed = 0
+        # Same derivation as the C11 planner's request hash: one order per prompt.
+        selection_seed = _id_for({"prompt": prompt})
 
     if strategy not in ("single", "fanout", "verify"):
         raise ValueError("unsupported strategy")
 
+    if selection not in ("seeded", "weighted"):
+        raise ValueError("selection must be 'seeded' or 'weighted'")
+    if health is not None and not isinstance(health, dict):
+        raise TypeError("health must be an object keyed by adapter_id")
+
     if fanout is not None:
         if not isinstance(fanout, int) or fanout < 1:
             raise ValueError("fanout must be an integer >= 1")
@@ -55,11 +69,16 @@ def build_execution_plan(prompt: str, adapters: List[Dict[str, Any]], *, strateg
             raise ValueError("fanout exceeds maximum allowed")
 
     num_adapters = len(adapters)
+    # Weighted: every strategy takes nodes from the front of one capacity-weighted order.
+    order = weighted_order(adapters, selection_seed, health) if selection == "weighted" else None
 
     if strategy == "single":
         if quorum is not None:
             raise ValueError("quorum provided for single strategy is invalid")
-        nodes = [adapters[seed % num_adapters]["adapter_id"]]
+        if order is not None:
+            nodes = [order[0]]
+        else:
+            nodes = [ids[seed % num_adapters] if ids is not None else adapters[seed % num_adapters]["adapter_id"]]
     elif strategy == "fanout":
         if quorum is not None:
             raise ValueError("quorum provided for fanout strategy is invalid")
@@ -71,10 +90,13 @@ def build_execution_plan(prompt: str, adapters: List[Dict[str, Any]], *, strateg
             n = min(n, MAX_FANOUT)
         rng = random.Random(seed)
         # deterministic selection without repetition unless n <= num_adapters
-        nodes = []
-        pool = [a["adapter_id"] for a in adapters]
-        for i in range(n):
-            nodes.append(pool[rng.randrange(len(pool))])
+        if order is not None:
+            nodes = weighted_allocation(adapters, n, selection_seed, health)
+        else:
+            nodes = []
+            pool = ids if ids is not None else [a["adapter_id"] for a in adapters]
+            for i in range(n):
+                nodes.append(pool[rng.randrange(len(pool))])
     elif strategy == "verify":
         # verify requires quorum
         if quorum is None:
@@ -83,13 +105,19 @@ def build_execution_plan(prompt: str, adapters: List[Dict[str, Any]], *, strateg
             raise ValueError("quorum must be a positive integer")
         if quorum > num_adapters:
             raise ValueError("quorum cannot exceed number of adapters")
+        if order is not None and quorum > len(order):
+            raise ValueError(f"quorum {quorum} exceeds the {len(order)} available adapters")
         # deterministic selection of adapters for verification
-        pool = [a["adapter_id"] for a in adapters]
+        pool = order if order is not None else (ids if ids is not None else [a["adapter_id"] for a in adapters])
         rng = random.Random(seed)
         nodes = [pool[i % len(pool)] for i in range(quorum)]
 
+    plan_key = {"prompt": prompt, "strategy": strategy, "seed": seed}
+    if order is not None:
+        # Weighted plans for the same prompt and seed differ by health snapshot.
+        plan_key.update(selection=selection, health=health)
     plan = {
-        "plan_id": _id_for({"prompt": prompt, "strategy": strategy, "seed": seed}),
+        "plan_id": _id_for(plan_key),
         "strategy": strategy,
         "nodes": nodes,
         "seed": seed,
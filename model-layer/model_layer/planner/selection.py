@@ -0,0 +1,118 @@
+"""Deterministic capacity-weighted node selection shared by both planners.
+
+Sorted-order and seeded-uniform selection send the same share of traffic to
+every adapter, so the smallest ids (or unlucky seeds) take the load whatever
+their capacity. `weighted_order` ranks adapters by weighted sampling without
+replacement (Efraimidis–Spirakis keys): each adapter is first with
+probability proportional to its weight,
+
+    weight = capabilities.concurrency / latency_ms
+
+where latency_ms comes from the adapter's health snapshot (adapter_health.json).
+An adapter without a latency reading is assumed to have the median latency
+of those that have one. `degraded` halves the weight, `unavailable` excludes
+the adapter.
+
+The random draw for each adapter is derived from sha256(seed, adapter_id),
+not from a stateful RNG, so the order is a pure function of the seed, the
+descriptors and the health snapshot, and does not depend on adapter order.
+Varying the seed per request (the planners use the request's seed or hash)
+spreads load in proportion to capacity.
+
+`weighted_allocation` fills a fanout wider than the adapter set: replicas are
+apportioned to the weights by largest remainder and interleaved by smooth
+weighted round-robin, so a 16x adapter gets 16x the replicas.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..canonical import sha256_digest
+
+DEGRADED_FACTOR = 0.5
+
+
+def _concurrency(descriptor: Dict[str, Any]) -> int:
+    concurrency = (descriptor.get("capabilities") or {}).get("concurrency", 1)
+    if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+        raise ValueError(f"adapter {descriptor.get('adapter_id')!r}: capabilities.concurrency must be a positive integer")
+    return concurrency
+
+
+def _latency(health: Optional[Dict[str, Any]]) -> Optional[int]:
+    latency = ((health or {}).get("details") or {}).get("latency_ms")
+    if latency is None:
+        return None
+    if not isinstance(latency, (int, float)) or isinstance(latency, bool) or latency < 0:
+        raise ValueError("health latency_ms must be a non-negative number")
+    return latency
+
+
+def adapter_weights(adapters: Iterable[Dict[str, Any]], health: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, float]:
+    """adapter_id -> selection weight (0.0 for unavailable adapters)."""
+    health = health or {}
+    adapters = list(adapters)
+    known = sorted(lat for lat in (_latency(health.get(a["adapter_id"])) for a in adapters) if lat is not None)
+    default_latency = known[len(known) // 2] if known else 1
+    weights = {}
+    for a in adapters:
+        h = health.get(a["adapter_id"]) or {}
+        latency = _latency(h)
+        weight = _concurrency(a) / max(default_latency if latency is None else latency, 1)
+        status = h.get("status")
+        if status == "unavailable":
+            weight = 0.0
+        elif status == "degraded":
+            weight *= DEGRADED_FACTOR
+        weights[a["adapter_id"]] = weight
+    return weights
+
+
+def _uniform(seed: Any, adapter_id: str) -> float:
+    # Uniform in (0, 1), fixed by (seed, adapter_id)
+    return (int.from_bytes(sha256_digest([seed, adapter_id])[:8], "big") + 0.5) / 2.0 ** 64
+
+
+def weighted_order(adapters: Iterable[Dict[str, Any]], seed: Any,
+                   health: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+    """Available adapter ids, best first, in a capacity-weighted random order fixed by `seed`."""
+    weights = adapter_weights(adapters, health)
+    keys = [(math.log(_uniform(seed, aid)) / w, aid) for aid, w in weights.items() if w > 0]
+    if not keys:
+        raise ValueError("no available adapters to select from")
+    keys.sort(key=lambda k: (-k[0], k[1]))
+    return [aid for _, aid in keys]
+
+
+def weighted_allocation(adapters: Iterable[Dict[str, Any]], n: int, seed: Any,
+                        health: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+    """`n` adapter ids allocated by weight.
+
+    Up to the number of available adapters this is the front of
+    `weighted_order`, without repeats. Beyond it each adapter gets a number
+    of replicas proportional to its weight (largest remainder, ties going to
+    the adapter earlier in `weighted_order`), in smooth weighted round-robin
+    order so no adapter's replicas bunch together.
+    """
+    adapters = list(adapters)
+    order = weighted_order(adapters, seed, health)
+    if n <= len(order):
+        return order[:n]
+    weights = adapter_weights(adapters, health)
+    total = sum(weights[aid] for aid in order)
+    quotas = [n * weights[aid] / total for aid in order]
+    counts = [int(q) for q in quotas]
+    by_remainder = sorted(range(len(order)), key=lambda i: (counts[i] - quotas[i], i))
+    for i in by_remainder[:n - sum(counts)]:
+        counts[i] += 1
+    # Smooth weighted round-robin over the counts yields each adapter exactly counts[i] times.
+    current = [0] * len(order)
+    nodes = []
+    for _ in range(n):
+        for i, c in enumerate(counts):
+            current[i] += c
+        pick = max(range(len(order)), key=lambda i: (current[i], -i))
+        current[pick] -= n
+        nodes.append(order[pick])
+    return nodes
@@ -0,0 +1,172 @@
+"""Compact record types for plans, envelope steps and trace steps.
+
+The planner, orchestrator and executor build these internally instead of
+per-step dicts: `__slots__` removes the per-instance dict, and SHA-256
+digests are held as raw 32-byte values instead of 64-character hex strings.
+Conversion happens only at the API boundary: `to_dict()` yields exactly the
+dict the stage has always returned, and `from_dict()` accepts it back.
+
+Identifier fields may hold either a digest or a caller-supplied string (tests
+use ids like "s1"): only lowercase 64-character hex strings are packed, so
+`from_dict(d).to_dict() == d` for every valid input.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+_HEX = frozenset("0123456789abcdef")
+
+
+def pack_digest(value: Any) -> Any:
+    """Raw bytes for a lowercase hex SHA-256 string; anything else unchanged."""
+    if isinstance(value, str) and len(value) == 64 and _HEX.issuperset(value):
+        return bytes.fromhex(value)
+    return value
+
+
+def unpack_digest(value: Any) -> Any:
+    """Inverse of pack_digest: raw 32-byte digests become lowercase hex."""
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+class Plan:
+    """Execution plan as produced by the planner."""
+
+    __slots__ = ("plan_id", "strategy", "nodes", "seed", "quorum")
+
+    def __init__(self, plan_id: Any, strategy: str, nodes: Tuple[str, ...], seed: int, quorum: Optional[int] = None):
+        self.plan_id = pack_digest(plan_id)
+        self.strategy = strategy
+        self.nodes = tuple(nodes)
+        self.seed = seed
+        self.quorum = quorum
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Plan":
+        return cls(d.get("plan_id"), d["strategy"], d["nodes"], d.get("seed"), d.get("quorum"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {
+            "plan_id": unpack_digest(self.plan_id),
+            "strategy": self.strategy,
+            "nodes": list(self.nodes),
+            "seed": self.seed,
+        }
+        if self.quorum is not None:
+            d["quorum"] = self.quorum
+        return d
+
+
+class EnvelopeStep:
+    """One orchestrator step; `id` is the digest of the other fields.
+
+    `replica` and `wave` are set only in wave-scheduled envelopes, `after`
+    (the hex ids of the steps this one waits for) only in dependency graphs.
+    """
+
+    __slots__ = ("node", "adapter", "mode", "timeout_ms", "id", "replica", "wave", "after")
+
+    def __init__(self, node: str, adapter: str, mode: str, id: Any, timeout_ms: Optional[int] = None,
+                 replica: Optional[int] = None, wave: Optional[int] = None, after: Optional[Tuple[str, ...]] = None):
+        self.node = node
+        self.adapter = adapter
+        self.mode = mode
+        self.timeout_ms = timeout_ms
+        self.id = pack_digest(id)
+        self.replica = replica
+        self.wave = wave
+        self.after = None if after is None else tuple(after)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "EnvelopeStep":
+        return cls(d["node"], d["adapter"], d["mode"], d["id"], d.get("timeout_ms"), d.get("replica"), d.get("wave"),
+                   d.get("after"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"node": self.node, "adapter": self.adapter, "mode": self.mode}
+        if self.timeout_ms is not None:
+            d["timeout_ms"] = self.timeout_ms
+        if self.wave is not None:
+            d["replica"] = self.replica
+            d["wave"] = self.wave
+        if self.after is not None:
+            d["after"] = list(self.after)
+        d["id"] = unpack_digest(self.id)
+        return d
+
+
+class TraceStep:
+    """One executed step; `result` and `payload_hash` are raw digests (None when timed out)."""
+
+    __slots__ = ("id", "status", "duration_ms", "result", "payload_hash", "group")
+
+    def __init__(self, id: Any, status: str, duration_ms: int, result: Optional[bytes],
+                 payload_hash: Optional[bytes], group: Any = None):
+        self.id = pack_digest(id)
+        self.status = status
+        self.duration_ms = duration_ms
+        self.result = result
+        self.payload_hash = payload_hash
+        self.group = group
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "TraceStep":
+        return cls(d["id"], d["status"], d["duration_ms"], pack_digest(d.get("result")),
+                   pack_digest(d.get("payload_hash")), d.get("group"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": unpack_digest(self.id),
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "result": unpack_digest(self.result),
+            "payload_hash": unpack_digest(self.payload_hash),
+            "group": self.group,
+        }
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable; copy it to modify")
+
+
+class FrozenDict(dict):
+    """dict that refuses mutation, for envelopes shared through a cache.
+
+    Still a dict, so every stage accepts it unchanged; copies (copy.copy,
+    copy.deepcopy, pickle) come back as plain, mutable dicts.
+    """
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """list counterpart of FrozenDict."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __copy__(self):
+        return list(self)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(obj: Any) -> Any:
+    """Deep copy of `obj` with dicts and lists replaced by FrozenDict and FrozenList."""
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
@@ -0,0 +1,140 @@
+"""Indexed, in-place updatable set of adapter descriptors.
+
+Planners, the orchestrator and `check_plan_acceptance` take either a plain
+list of descriptors or an `AdapterRegistry`. The registry validates each
+descriptor once, when it is added, and keeps these up to date as adapters
+come and go instead of rebuilding them per call:
+
+  - the adapter_id map, registration order and sorted id order;
+  - indexes by supported strategy, backend_type and determinism;
+  - `fingerprint`, equal to `adapter_fingerprint()` of the descriptor list,
+    so envelope cache keys agree whether a list or the registry is passed.
+
+Descriptors are stored frozen (see records.FrozenDict), so a caller keeping a
+reference cannot change an adapter behind the indexes' back.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .canonical import sha256_hex
+from .records import freeze
+
+
+class AdapterRegistry:
+    """Adapter descriptors in registration order, with lookup indexes.
+
+    `validator`, if given, is called with each descriptor before it is added
+    (for instance `validate_adapter.validate_descriptor` for the full C10
+    schema); the registry itself only requires a unique string `adapter_id`.
+    """
+
+    def __init__(self, adapters: Iterable[Dict[str, Any]] = (), *,
+                 validator: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self._validator = validator
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        # index name -> key -> {adapter_id: None}, insertion-ordered like _by_id
+        self._indexes: Dict[str, Dict[Any, Dict[str, None]]] = {"strategy": {}, "backend_type": {}, "deterministic": {}}
+        self._lock = threading.RLock()
+        self._derived: Dict[str, Any] = {}
+        self.version = 0
+        for descriptor in adapters:
+            self.add(descriptor)
+
+    @staticmethod
+    def _index_keys(descriptor: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+        caps = descriptor.get("capabilities") or {}
+        for strategy in caps.get("supported_strategies") or ():
+            yield "strategy", strategy
+        if "backend_type" in descriptor:
+            yield "backend_type", descriptor["backend_type"]
+        yield "deterministic", bool(caps.get("deterministic", False))
+
+    def add(self, descriptor: Dict[str, Any]) -> None:
+        if not isinstance(descriptor, dict):
+            raise TypeError("adapter descriptor must be an object")
+        adapter_id = descriptor.get("adapter_id")
+        if not isinstance(adapter_id, str) or not adapter_id:
+            raise ValueError("adapter descriptor must have a non-empty string adapter_id")
+        if not isinstance(descriptor.get("capabilities", {}), dict):
+            raise TypeError("adapter capabilities must be an object")
+        if self._validator is not None:
+            self._validator(descriptor)
+        frozen = freeze(descriptor)
+        with self._lock:
+            if adapter_id in self._by_id:
+                raise ValueError(f"duplicate adapter_id: {adapter_id}")
+            self._by_id[adapter_id] = frozen
+            for name, key in self._index_keys(frozen):
+                self._indexes[name].setdefault(key, {})[adapter_id] = None
+            self._changed()
+
+    def remove(self, adapter_id: str) -> Dict[str, Any]:
+        """Remove and return the descriptor for `adapter_id` (KeyError if unknown)."""
+        with self._lock:
+            descriptor = self._by_id.pop(adapter_id)
+            for name, key in self._index_keys(descriptor):
+                members = self._indexes[name][key]
+                del members[adapter_id]
+                if not members:
+                    del self._indexes[name][key]
+            self._changed()
+            return descriptor
+
+    def _changed(self) -> None:
+        self._derived.clear()
+        self.version += 1
+
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = compute()
+            return self._derived[name]
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, adapter_id: Any) -> bool:
+        return adapter_id in self._by_id
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.descriptors())
+
+    def get(self, adapter_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(adapter_id)
+
+    @property
+    def by_id(self) -> Dict[str, Dict[str, Any]]:
+        """adapter_id -> descriptor; treat as read-only."""
+        return self._by_id
+
+    def descriptors(self) -> Tuple[Dict[str, Any], ...]:
+        return self._cached("descriptors", lambda: tuple(self._by_id.values()))
+
+    def ids(self) -> Tuple[str, ...]:
+        """Adapter ids in registration order."""
+        return self._cached("ids", lambda: tuple(self._by_id))
+
+    def sorted_ids(self) -> Tuple[str, ...]:
+        return self._cached("sorted_ids", lambda: tuple(sorted(self._by_id)))
+
+    def _lookup(self, index: str, key: Any) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._by_id[i] for i in self._indexes[index].get(key, ())]
+
+    def supporting(self, strategy: str) -> List[Dict[str, Any]]:
+        """Descriptors listing `strategy` in capabilities.supported_strategies."""
+        return self._lookup("strategy", strategy)
+
+    def with_backend(self, backend_type: str) -> List[Dict[str, Any]]:
+        return self._lookup("backend_type", backend_type)
+
+    def deterministic(self, flag: bool = True) -> List[Dict[str, Any]]:
+        """Descriptors whose capabilities.deterministic is `flag` (absent counts as False)."""
+        return self._lookup("deterministic", bool(flag))
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable digest of the descriptors in registration order; changes with any add or remove."""
+        return self._cached("fingerprint", lambda: sha256_hex(list(self._by_id.values())))
@@ -3,29 +3,40 @@
 Builds deterministic execution plans from a validated prompt and a set of adapter descriptors.
 """
 from typing import Dict, Iterable, Optional
-import json
-import hashlib
+
+from model_layer.canonical import sha256_hex
+from model_layer.planner.selection import weighted_order
+from model_layer.registry import AdapterRegistry
 
 from .strategies import single_strategy, fanout_strategy, verify_strategy, quorum_strategy
 
 
 def _canonical_request_hash(validated_prompt: Dict) -> str:
     # Canonical JSON representation for determinism
-    data = json.dumps(validated_prompt, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+    return sha256_hex(validated_prompt)
 
 
-def build_execution_plan(validated_prompt: Dict, adapters: Iterable[Dict], *, strategy_hint: Optional[str] = None, fanout: Optional[int] = None, quorum_size: Optional[int] = None, timeout_ms: int = 5000) -> Dict:
+def build_execution_plan(validated_prompt: Dict, adapters: Iterable[Dict], *, strategy_hint: Optional[str] = None, fanout: Optional[int] = None, quorum_size: Optional[int] = None, timeout_ms: int = 5000, selection: str = 'sorted', health: Optional[Dict[str, Dict]] = None) -> Dict:
     """Return a deterministic execution plan dict.
 
     Args:
         validated_prompt: already-validated prompt payload
-        adapters: iterable of adapter descriptors (dicts)
+        adapters: iterable of adapter descriptors (dicts), or an AdapterRegistry
         strategy_hint: optional preferred strategy
+        selection: 'sorted' (default, lowest adapter ids first) or 'weighted'
+            (capacity-weighted order seeded by the request hash, see
+            model_layer.planner.selection)
+        health: optional adapter_id -> health snapshot used by 'weighted'
     """
-    adapters = list(adapters)
-    if not adapters:
+    if not isinstance(adapters, AdapterRegistry):
+        adapters = list(adapters)
+    if not len(adapters):
         raise ValueError("no adapters available")
+    if selection not in ('sorted', 'weighted'):
+        raise ValueError(f"unsupported selection: {selection}")
+    request_hash = _canonical_request_hash(validated_prompt)
+    # Same request + same health -> same nodes; different requests spread by capacity.
+    order = weighted_order(adapters, request_hash, health) if selection == 'weighted' else None
 
     # simple capability filtering: ensure adapters are capable of any strategy
     # (C11 only maps to strategies; adapters declare supported_strategies)
@@ -36,7 +47,8 @@ def build_execution_plan(validated_prompt: Dict, adapters: Iterable[Dict], *, st
         # else if >=3 -> quorum; else fanout
         if len(adapters) == 1:
             strategy = 'single'
-        elif any('verify' in a.get('capabilities', {}).get('supported_strategies', []) for a in adapters):
+        elif (adapters.supporting('verify') if isinstance(adapters, AdapterRegistry)
+              else any('verify' in a.get('capabilities', {}).get('supported_strategies', []) for a in adapters)):
             strategy = 'verify'
         elif len(adapters) >= 3:
             strategy = 'quorum'
@@ -47,13 +59,13 @@ def build_execution_plan(validated_prompt: Dict, adapters: Iterable[Dict], *, st
 
     # Strategy dispatch
     if strategy == 'single':
-        plan_meta = single_strategy(adapters)
+        plan_meta = single_strategy(adapters, order=order)
     elif strategy == 'fanout':
-        plan_meta = fanout_strategy(adapters, fanout=fanout)
+        plan_meta = fanout_strategy(adapters, fanout=fanout, order=order)
     elif strategy == 'verify':
-        plan_meta = verify_strategy(adapters)
+        plan_meta = verify_strategy(adapters, order=order)
     elif strategy == 'quorum':
-        plan_meta = quorum_strategy(adapters, size=quorum_size)
+        plan_meta = quorum_strategy(adapters, size=quorum_size, order=order)
     else:
         raise ValueError(f"unsupported strategy: {strategy}")
 
@@ -65,8 +77,9 @@ def build_execution_plan(validated_prompt: Dict, adapters: Iterable[Dict], *, st
         "merge_policy": plan_meta['merge_policy'],
         "constraints": validated_prompt.get('constraints', {}),
         "_explain": {
-            "request_hash": _canonical_request_hash(validated_prompt),
+            "request_hash": request_hash,
             "reason": f"selected strategy {plan_meta['strategy']} deterministically"
+            + (" with capacity-weighted node selection" if order is not None else "")
         }
     }
 
@@ -3,40 +3,53 @@
 These functions are pure and avoid side effects. They select node lists and assemble
 minimal execution plan fragments; they do not perform execution.
 """
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional, Sequence
 
+from model_layer.registry import AdapterRegistry
 
-def _pick_nodes_sorted(adapters: Iterable[Dict], n: int) -> List[str]:
+
+def _sorted_ids(adapters: Iterable[Dict]) -> Sequence[str]:
+    # An AdapterRegistry keeps its sorted ids current; plain iterables are sorted per call
+    if isinstance(adapters, AdapterRegistry):
+        return adapters.sorted_ids()
+    return sorted([a['adapter_id'] for a in adapters])
+
+
+def _ordered_ids(adapters: Iterable[Dict], order: Optional[Sequence[str]]) -> Sequence[str]:
+    # `order` (e.g. selection.weighted_order) replaces the default lexicographic preference
+    return _sorted_ids(adapters) if order is None else order
+
+
+def _pick_nodes_sorted(adapters: Iterable[Dict], n: int, order: Optional[Sequence[str]] = None) -> List[str]:
     # Stable selection: sort by adapter_id and take first n
-    ids = sorted([a['adapter_id'] for a in adapters])
-    return ids[:n]
+    return list(_ordered_ids(adapters, order)[:n])
 
 
-def single_strategy(adapters: Iterable[Dict], *, constraints: Dict = None) -> Dict:
+def single_strategy(adapters: Iterable[Dict], *, constraints: Dict = None, order: Optional[Sequence[str]] = None) -> Dict:
     # Single chooses the first eligible adapter
-    nodes = _pick_nodes_sorted(adapters, 1)
+    nodes = _pick_nodes_sorted(adapters, 1, order)
     return {"strategy": "single", "nodes": nodes, "merge_policy": "first_success"}
 
 
-def fanout_strategy(adapters: Iterable[Dict], *, fanout: int = None, constraints: Dict = None) -> Dict:
-    ids = sorted([a['adapter_id'] for a in adapters])
+def fanout_strategy(adapters: Iterable[Dict], *, fanout: int = None, constraints: Dict = None, order: Optional[Sequence[str]] = None) -> Dict:
+    ids = _ordered_ids(adapters, order)
     if fanout is None or fanout > len(ids):
         fanout = len(ids)
-    nodes = ids[:fanout]
+    nodes = list(ids[:fanout])
     return {"strategy": "fanout", "nodes": nodes, "merge_policy": "rank"}
 
 
-def verify_strategy(adapters: Iterable[Dict], *, constraints: Dict = None) -> Dict:
+def verify_strategy(adapters: Iterable[Dict], *, constraints: Dict = None, order: Optional[Sequence[str]] = None) -> Dict:
     # Deterministic primary + verifier pairing: pick first two adapters
-    ids = sorted([a['adapter_id'] for a in adapters])
+    ids = _ordered_ids(adapters, order)
     if len(ids) < 2:
         raise ValueError("verify requires at least two adapters")
-    nodes = ids[:2]
+    nodes = list(ids[:2])
     return {"strategy": "verify", "nodes": nodes, "merge_policy": "first_success"}
 
 
-def quorum_strategy(adapters: Iterable[Dict], *, size: int = None, constraints: Dict = None) -> Dict:
-    ids = sorted([a['adapter_id'] for a in adapters])
+def quorum_strategy(adapters: Iterable[Dict], *, size: int = None, constraints: Dict = None, order: Optional[Sequence[str]] = None) -> Dict:
+    ids = _ordered_ids(adapters, order)
     if size is None:
         # default odd size: smallest odd >=1 and <= len(ids)
         size = 1 if len(ids) == 0 else (1 if len(ids) == 1 else (3 if len(ids) >= 3 else (1)))
@@ -44,5 +57,5 @@ def quorum_strategy(adapters: Iterable[Dict], *, size: int = None, constraints:
         raise ValueError("quorum size must be odd")
     if size > len(ids):
         raise ValueError("quorum size larger than available adapters")
-    nodes = ids[:size]
+    nodes = list(ids[:size])
     return {"strategy": "quorum", "nodes": nodes, "merge_policy": "vote"}
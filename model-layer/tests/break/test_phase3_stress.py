@@ -7,3 +7,10 @@ def test_phase3_small_stress():
     assert summary["ok"]
     assert summary["failure_count"] == 0
     assert len(summary["unique_trace_hashes"]) == 1
+
+
+def test_phase3_stress_with_trace_cache():
+    summary = run_stress(runs=50, workers=4, seed=0, prompt="smoke", adapters=[{"adapter_id": "a0", "capabilities": {}}], strategy="single", fanout=1, quorum=0, fail_on_violation=True, trace_cache=8)
+    assert summary["ok"] and len(summary["unique_trace_hashes"]) == 1
+    assert summary["trace_cache"]["hits"] + summary["trace_cache"]["misses"] == 50
+    assert summary["trace_cache"]["size"] == 1
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import random
+import sys
+
+import pytest
+
+from model_layer.canonical import _encode_iterative, canonical_json, sha256_digest, sha256_hex
+
+
+def _random_value(rnd, depth=0):
+    r = rnd.random()
+    if depth > 4 or r < 0.4:
+        return rnd.choice([
+            None, True, False, rnd.randint(-10**20, 10**20), rnd.uniform(-1e6, 1e6),
+            float("nan"), float("inf"), "plain", "café ☃ \U0001f600 \"q\"\n\x00",
+        ])
+    if r < 0.7:
+        items = [_random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 4))]
+        return items if rnd.random() < 0.7 else tuple(items)
+    return {rnd.choice(["a", "b", "é", "Z"]) + str(rnd.randint(0, 9)): _random_value(rnd, depth + 1)
+            for _ in range(rnd.randint(0, 4))}
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("sort_keys", [True, False])
+def test_byte_identical_to_json_dumps(ensure_ascii, sort_keys):
+    rnd = random.Random(16)
+    for _ in range(2000):
+        obj = _random_value(rnd)
+        expected = json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=ensure_ascii)
+        assert canonical_json(obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys) == expected
+        assert _encode_iterative(obj, ensure_ascii, sort_keys) == expected
+
+
+def test_non_string_keys_and_errors_match_json():
+    obj = {1: "i", 2.5: "f", None: "n", "s": "s"}
+    assert _encode_iterative(obj, True, False) == json.dumps(obj, separators=(",", ":"))
+    # Separate dict: True == 1, so in `obj` it would overwrite the int key.
+    bools = {True: "t", False: "f"}
+    assert _encode_iterative(bools, True, False) == json.dumps(bools, separators=(",", ":")) == '{"true":"t","false":"f"}'
+    with pytest.raises(TypeError, match="keys must be str"):
+        _encode_iterative({(1,): 1}, True, True)
+    with pytest.raises(TypeError, match="Object of type set is not JSON serializable"):
+        _encode_iterative([{1}], True, True)
+    loop = []
+    loop.append(loop)
+    with pytest.raises(ValueError, match="Circular reference detected"):
+        _encode_iterative(loop, True, True)
+
+
+def test_nesting_beyond_recursion_limit():
+    depth = sys.getrecursionlimit() * 20
+    obj = {}
+    inner = obj
+    for _ in range(depth):
+        inner["k"] = {}
+        inner = inner["k"]
+
+    assert canonical_json(obj) == '{"k":' * depth + "{}" + "}" * depth
+
+
+def test_hashes_are_sha256_of_canonical_utf8():
+    obj = {"b": [1, "é"], "a": None}
+    canon = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    assert sha256_hex(obj, ensure_ascii=False) == hashlib.sha256(canon).hexdigest()
+    assert sha256_digest(obj) == hashlib.sha256(canonical_json(obj).encode("utf-8")).digest()
@@ -26,3 +26,24 @@ def test_rejects_mismatched_hash_envelope_id():
         assert False, "expected ValueError"
     except ValueError as e:
         assert "envelope_id mismatch" in str(e)
+
+
+def test_payload_snapshot_does_not_copy_payloads():
+    import tracemalloc
+
+    payload = {"arr": [0] * 2000, "map": {str(i): i for i in range(50)}}
+    envelope = {"envelope_id": "e4", "plan_id": "p4", "steps": [{"id": f"s{i}", "payload": payload} for i in range(3000)]}
+    tracemalloc.start()
+    trace = execute_envelope(envelope)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len({s["payload_hash"] for s in trace["steps"]}) == 1
+    # Deep-copying the payload for every step peaked above 50MB.
+    assert peak < 10 * 1024 * 1024
+
+
+def test_step_without_id_hashes_snapshotted_payload():
+    step = {"payload": {10: "b", 2: "a"}, "group": "g"}
+    trace = execute_envelope({"envelope_id": "e5", "plan_id": "p5", "steps": [step]})
+    assert trace["steps"][0]["id"] == _id_for(step)
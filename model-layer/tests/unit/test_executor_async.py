@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from model_layer.executor import MockAdapter, execute_envelope, execute_envelope_async, run_envelope
+from model_layer.orchestrator.orchestrator import build_execution_envelope
+
+
+def fanout_envelope(n, timeout_ms=None):
+    adapters = [{"adapter_id": f"a{i}"} for i in range(n)]
+    plan = {"plan_id": "p", "strategy": "fanout", "nodes": [a["adapter_id"] for a in adapters]}
+    if timeout_ms is not None:
+        plan["timeout_ms"] = timeout_ms
+    return build_execution_envelope(plan, adapters)
+
+
+def without_durations(trace):
+    return dict(trace, steps=[dict(s, duration_ms=None) for s in trace["steps"]])
+
+
+def test_fanout_steps_run_concurrently():
+    env = fanout_envelope(5)
+    mock = MockAdapter(200)
+    start = time.monotonic()
+    trace = run_envelope(env, mock)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.6
+    assert sorted(mock.completed) == sorted(s["id"] for s in env["steps"])
+    assert all(s["status"] == "ok" and s["duration_ms"] >= 190 for s in trace["steps"])
+
+
+def test_echo_adapter_reproduces_simulated_trace():
+    steps = [{"id": f"s{i}", "payload": {"v": i % 2}, "group": "g"} for i in range(5)]
+    steps.append({"payload": [1, 2], "timeout_ms": 1000})
+    env = {"envelope_id": "e", "plan_id": "p", "steps": steps}
+
+    assert without_durations(run_envelope(env, MockAdapter(0))) == without_durations(execute_envelope(env))
+
+
+def test_deadline_cancels_slow_step():
+    env = {"envelope_id": "e", "plan_id": "p", "steps": [
+        {"id": "fast", "payload": 1, "timeout_ms": 500},
+        {"id": "slow", "payload": 2, "timeout_ms": 50, "simulate_duration_ms": 5000},
+    ]}
+    mock = MockAdapter()
+    start = time.monotonic()
+    trace = run_envelope(env, mock)
+
+    assert time.monotonic() - start < 1.0
+    fast, slow = trace["steps"]
+    assert fast["status"] == "ok"
+    assert slow["status"] == "timed_out" and slow["result"] is None and 50 <= slow["duration_ms"] < 1000
+    assert mock.cancelled == ["slow"]
+
+
+def test_adapters_by_id_failures_and_concurrency_limit():
+    env = fanout_envelope(4)
+    slow, flaky = MockAdapter(100), MockAdapter(0, fail=[env["steps"][3]["id"]])
+    adapters = {"a0": slow, "a1": slow, "a2": slow, "a3": flaky}
+    start = time.monotonic()
+    trace = run_envelope(env, adapters, max_concurrency=1)
+
+    assert time.monotonic() - start >= 0.3
+    assert [s["status"] for s in trace["steps"]] == ["ok", "ok", "ok", "failed"]
+    with pytest.raises(ValueError, match="no adapter callable"):
+        run_envelope(env, {"a0": slow})
+
+
+def test_outer_cancellation_cancels_running_steps():
+    env = fanout_envelope(3)
+    mock = MockAdapter(10_000)
+
+    async def main():
+        task = asyncio.ensure_future(execute_envelope_async(env, mock))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert sorted(mock.cancelled) == sorted(s["id"] for s in env["steps"])
+
+
+def test_early_quorum_returns_at_the_median_responder():
+    steps = [{"id": f"v{i}", "group": "g", "payload": {"answer": 42}} for i in range(3)]
+    env = {"envelope_id": "e", "plan_id": "p", "steps": steps}
+    mock = MockAdapter(latencies={"v0": 10, "v1": 50, "v2": 5000})
+    start = time.monotonic()
+    trace = run_envelope(env, mock, early_quorum=True)
+
+    assert time.monotonic() - start < 1.0
+    assert [s["status"] for s in trace["steps"]] == ["ok", "ok", "skipped"]
+    assert trace["quorum"] == {"g": True}
+    assert mock.cancelled == ["v2"]
@@ -0,0 +1,50 @@
+import pytest
+
+from model_layer.executor import TraceCache, execute_envelope, execute_envelopes
+
+
+def make_envelope(tag, payload=1):
+    return {"envelope_id": f"e-{tag}", "plan_id": "p", "steps": [
+        {"id": "s1", "payload": {"v": payload}, "group": "g"},
+        {"id": "s2", "payload": {"v": payload}, "group": "g"},
+    ]}
+
+
+def test_batch_matches_individual_execution_and_counts_hits():
+    envs = [make_envelope("a"), make_envelope("b"), make_envelope("a"), make_envelope("a", payload=2)]
+    cache = TraceCache()
+    traces = execute_envelopes(envs, cache=cache)
+
+    assert traces == [execute_envelope(e) for e in envs]
+    # Same envelope_id but a different payload is a different envelope.
+    assert cache.stats() == {"hits": 1, "misses": 3, "size": 3, "maxsize": 128}
+
+    execute_envelopes([make_envelope("b")], cache=cache)
+    assert cache.hits == 2
+
+
+def test_returned_traces_are_independent_copies():
+    cache = TraceCache()
+    first = execute_envelopes([make_envelope("a")], cache=cache)[0]
+    first["steps"][0]["status"] = "tampered"
+    first["quorum"]["g"] = False
+
+    assert execute_envelopes([make_envelope("a")], cache=cache)[0] == execute_envelope(make_envelope("a"))
+
+
+def test_cache_is_bounded_lru():
+    cache = TraceCache(2)
+    execute_envelopes([make_envelope("a"), make_envelope("b")], cache=cache)
+    execute_envelopes([make_envelope("a"), make_envelope("c")], cache=cache)  # touches a, evicts b
+    execute_envelopes([make_envelope("a"), make_envelope("b")], cache=cache)
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_invalid_envelope_fails_before_any_execution():
+    bad = {"envelope_id": "e", "plan_id": "p", "steps": []}
+    cache = TraceCache()
+    with pytest.raises(ValueError):
+        execute_envelopes([make_envelope("a"), bad], cache=cache)
+    assert len(cache) == 0
@@ -0,0 +1,99 @@
+import hashlib
+import json
+
+import pytest
+
+from model_layer.executor import executor
+from model_layer.executor.executor import execute_envelope
+
+
+def trace_hash(trace):
+    return hashlib.sha256(json.dumps(trace, sort_keys=True).encode()).hexdigest()
+
+
+def make_envelope():
+    shared = {"v": "same"}
+    steps = []
+    for i in range(200):
+        step = {"id": f"s{i}", "payload": shared if i % 3 else {"i": i}, "group": f"g{i % 7}"}
+        if i % 11 == 0:
+            step.update(timeout_ms=5, simulate_duration_ms=10)
+        steps.append(step)
+    steps.append({"payload": {"no": "id"}})
+    return {"envelope_id": "e-par", "plan_id": "p-par", "steps": steps}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Use the process pool whatever this machine's CPU count and however small the envelope.
+    monkeypatch.setattr(executor, "_cpu_count", lambda: 8)
+    monkeypatch.setattr(executor, "_MIN_STEPS_PER_WORKER", 1)
+
+
+def test_trace_identical_for_any_worker_count(pool):
+    env = make_envelope()
+    serial = execute_envelope(env)
+    for workers in (1, 2, 3):
+        assert trace_hash(execute_envelope(env, workers=workers)) == trace_hash(serial)
+
+
+def test_parallel_raises_first_failing_step_error(pool):
+    env = {"envelope_id": "e-err", "plan_id": "p", "steps": [
+        {"id": "a", "payload": {"x": 1}},
+        {"id": "b", "simulate_duration_ms": "not-a-number"},
+        {"id": "c", "payload": {"bad": object()}},
+    ]}
+    with pytest.raises(ValueError):
+        execute_envelope(env, workers=2)
+
+
+def test_rejects_invalid_worker_count():
+    with pytest.raises(ValueError):
+        execute_envelope(make_envelope(), workers=0)
+
+
+class Rewriting(dict):
+    """Serializing it rewrites the payload shared with the first step."""
+
+    def __init__(self, target):
+        super().__init__(k=1)
+        self.target = target
+
+    def items(self):
+        self.target["v"] = "rewritten"
+        return super().items()
+
+
+def test_pool_snapshots_match_serial_for_side_effecting_payloads(pool):
+    shared = {"v": "original"}
+    steps = [{"id": "a", "payload": shared}, {"id": "b", "payload": [shared, {"n": 1.5, "t": (1, 2)}]},
+             {"id": "c", "payload": Rewriting(shared)}, {"payload": {"no": "id"}}]
+    env = {"envelope_id": "e", "plan_id": "p", "steps": steps}
+    serial = execute_envelope(env)
+    shared["v"] = "original"
+    assert execute_envelope(env, workers=2) == serial
+
+
+def test_pool_is_skipped_when_it_cannot_pay_off(monkeypatch):
+    monkeypatch.setattr(executor, "_cpu_count", lambda: 4)
+    assert executor._pool_workers(None, 10**6) == 1
+    assert executor._pool_workers(8, 10**6) == 4
+    assert executor._pool_workers(8, 2500) == 2
+    assert executor._pool_workers(8, 500) == 1
+    monkeypatch.setattr(executor, "_cpu_count", lambda: 1)
+    assert executor._pool_workers(8, 10**6) == 1
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_errors_of_steps_that_never_run_are_discarded(pool, workers):
+    bad = {1: "a", "b": 2}  # mixed key types cannot be canonicalized
+    steps = [{"id": f"v{i}", "group": "g", "payload": {"v": 1}} for i in range(3)]
+    steps.append({"id": "late", "group": "g", "payload": bad})
+    steps += [{"id": "gen", "timeout_ms": 1, "simulate_duration_ms": 5},
+              {"id": "dep", "payload": bad, "after": ["gen"]}]
+    env = {"envelope_id": "e", "plan_id": "p", "steps": steps}
+
+    trace = execute_envelope(env, workers, early_quorum=True)
+    assert [s["status"] for s in trace["steps"]] == ["ok", "ok", "ok", "skipped", "timed_out", "blocked"]
+    with pytest.raises(TypeError):
+        execute_envelope(env, workers)
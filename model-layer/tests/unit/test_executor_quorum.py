@@ -14,3 +14,23 @@ def test_quorum_verification():
     }
     trace = execute_envelope(envelope)
     assert trace["quorum"]["g1"] is True
+
+
+def test_early_quorum_skips_settled_groups():
+    steps = [{"id": f"a{i}", "group": "agree", "payload": {"v": 1}} for i in range(5)]
+    steps += [{"id": f"d{i}", "group": "split", "payload": {"v": i}} for i in range(5)]
+    steps.append({"id": "solo", "payload": {"v": 0}})
+    envelope = {"envelope_id": "e4", "plan_id": "p4", "steps": steps}
+
+    full = execute_envelope(envelope)
+    trace = execute_envelope(envelope, early_quorum=True)
+    statuses = {s["id"]: s["status"] for s in trace["steps"]}
+
+    assert trace["quorum"] == full["quorum"] == {"agree": True, "split": False}
+    # Three of five agreeing settles the group; after four distinct results no three can agree.
+    assert [statuses[f"a{i}"] for i in range(5)] == ["ok"] * 3 + ["skipped"] * 2
+    assert [statuses[f"d{i}"] for i in range(5)] == ["ok"] * 4 + ["skipped"]
+    assert statuses["solo"] == "ok"
+    skipped = trace["steps"][3]
+    assert (skipped["result"], skipped["payload_hash"], skipped["duration_ms"]) == (None, None, 0)
+    assert execute_envelope(envelope, workers=2, early_quorum=True) == trace
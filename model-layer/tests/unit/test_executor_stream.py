@@ -0,0 +1,54 @@
+import json
+import tracemalloc
+
+import pytest
+
+from model_layer.executor import execute_envelope, iter_execute_envelope, write_trace_ndjson
+
+
+def make_envelope(n):
+    shared = {"v": 1}
+    steps = [{"id": f"s{i}", "payload": shared if i % 2 else {"i": i}, "group": f"g{i % 3}"} for i in range(n)]
+    return {"envelope_id": "e-stream", "plan_id": "p-stream", "steps": steps}
+
+
+def test_iter_matches_execute_envelope():
+    env = make_envelope(50)
+    items = list(iter_execute_envelope(env))
+    trace = execute_envelope(env)
+
+    assert items[:-1] == trace["steps"]
+    assert items[-1] == {"envelope_id": "e-stream", "plan_id": "p-stream", "quorum": trace["quorum"]}
+
+
+def test_iter_validates_on_first_next():
+    gen = iter_execute_envelope({"envelope_id": "e", "steps": []})
+    with pytest.raises(ValueError):
+        next(gen)
+
+
+def test_ndjson_writer_streams_trace(tmp_path):
+    env = make_envelope(20)
+    path = tmp_path / "trace.ndjson"
+    summary = write_trace_ndjson(env, path)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    trace = execute_envelope(env)
+    assert lines[:-1] == trace["steps"]
+    assert lines[-1] == summary and summary["quorum"] == trace["quorum"]
+
+
+def test_iter_does_not_retain_step_results():
+    shared = {"v": 1}
+    env = {"envelope_id": "e-big", "plan_id": "p-big", "steps": [{"id": f"s{i}", "payload": shared, "group": "g"} for i in range(30000)]}
+
+    tracemalloc.start()
+    for _ in iter_execute_envelope(env):
+        pass
+    _, streamed = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    execute_envelope(env)
+    _, materialized = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert streamed * 3 < materialized
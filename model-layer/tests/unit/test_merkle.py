@@ -0,0 +1,75 @@
+import hashlib
+
+import pytest
+
+from model_layer.executor import execute_envelope
+from model_layer.merkle import (
+    MerkleAccumulator, envelope_slice, leaf_hash, range_proof, range_root, slice_envelope_id,
+)
+from model_layer.orchestrator.orchestrator import build_execution_envelope
+
+ADAPTERS = [{"adapter_id": f"n{i:02d}"} for i in range(13)]
+PLAN = {"plan_id": "p", "strategy": "fanout", "nodes": [a["adapter_id"] for a in ADAPTERS]}
+
+
+def _reference_root(leaves):
+    # RFC 6962 MTH, written recursively
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return hashlib.sha256(b"\x01" + _reference_root(leaves[:k]) + _reference_root(leaves[k:])).digest()
+
+
+def test_incremental_root_matches_reference_tree():
+    ids = [f"s{i}" for i in range(40)]
+    acc = MerkleAccumulator()
+    for i, step_id in enumerate(ids, 1):
+        acc.append(step_id)
+        assert acc.root() == _reference_root([leaf_hash(s) for s in ids[:i]])
+    assert acc.size == 40 and len(acc._peaks) == bin(40).count("1")
+
+
+def test_every_range_verifies_with_logarithmic_proof():
+    ids = [f"s{i}" for i in range(13)]
+    root = MerkleAccumulator(ids).root()
+    for lo in range(13):
+        for hi in range(lo + 1, 14):
+            proof = range_proof(ids, lo, hi)
+            assert len(proof) <= 2 * 4
+            assert range_root(13, lo, ids[lo:hi], proof) == root
+
+    proof = range_proof(ids, 5, 6)
+    assert range_root(13, 5, ["forged"], proof) != root
+    with pytest.raises(ValueError, match="invalid merkle proof"):
+        range_root(13, 5, ids[5:6], proof[:-1])
+    with pytest.raises(ValueError, match="invalid merkle proof"):
+        range_root(13, 5, ids[5:6], proof + [proof[0]])
+
+
+def test_merkle_envelope_is_executed_and_tamper_checked():
+    flat = build_execution_envelope(PLAN, ADAPTERS)
+    env = build_execution_envelope(PLAN, ADAPTERS, id_scheme="merkle")
+    assert env["steps"] == flat["steps"] and env["envelope_id"] != flat["envelope_id"]
+
+    trace = execute_envelope(env)
+    assert [s["id"] for s in trace["steps"]] == [s["id"] for s in env["steps"]]
+
+    reordered = dict(env, steps=env["steps"][::-1])
+    with pytest.raises(ValueError, match="envelope_id mismatch"):
+        execute_envelope(reordered)
+
+
+def test_slice_verifies_without_the_rest_of_the_envelope():
+    env = build_execution_envelope(PLAN, ADAPTERS, id_scheme="merkle")
+    part = envelope_slice(env, 4, 7)
+    assert slice_envelope_id(part) == env["envelope_id"]
+
+    trace = execute_envelope(part)
+    assert trace["envelope_id"] == env["envelope_id"]
+    assert [s["id"] for s in trace["steps"]] == [s["id"] for s in env["steps"][4:7]]
+
+    shifted = dict(part, step_offset=5)
+    with pytest.raises(ValueError, match="envelope_id mismatch"):
+        execute_envelope(shifted)
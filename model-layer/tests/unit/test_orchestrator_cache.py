@@ -0,0 +1,64 @@
+import copy
+
+import pytest
+
+from model_layer.executor import execute_envelope
+from model_layer.orchestrator.orchestrator import EnvelopeCache, adapter_fingerprint, build_execution_envelope
+
+ADAPTERS = [{"adapter_id": n, "capabilities": {}} for n in ("a", "b", "c")]
+PLAN = {"strategy": "fanout", "nodes": ["c", "a", "b"], "timeout_ms": 100}
+
+
+def test_cached_envelope_is_shared_and_equal_to_fresh_build():
+    cache = EnvelopeCache(4)
+    first = build_execution_envelope(dict(PLAN), list(ADAPTERS), cache=cache)
+    second = build_execution_envelope(dict(PLAN), copy.deepcopy(ADAPTERS), cache=cache)
+
+    assert first is second
+    assert first == build_execution_envelope(PLAN, ADAPTERS)
+    assert execute_envelope(first) == execute_envelope(build_execution_envelope(PLAN, ADAPTERS))
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 4}
+
+
+def test_cache_key_covers_plan_adapters_and_id_scheme():
+    cache = EnvelopeCache()
+    build_execution_envelope(PLAN, ADAPTERS, cache=cache)
+    build_execution_envelope(dict(PLAN, timeout_ms=200), ADAPTERS, cache=cache)
+    build_execution_envelope(PLAN, ADAPTERS + [{"adapter_id": "d", "capabilities": {}}], cache=cache)
+    build_execution_envelope(PLAN, ADAPTERS, id_scheme="merkle", cache=cache)
+
+    assert (cache.hits, cache.misses) == (0, 4)
+    assert adapter_fingerprint(ADAPTERS) != adapter_fingerprint(ADAPTERS[::-1])
+
+
+def test_cached_envelopes_are_immutable():
+    env = build_execution_envelope(PLAN, ADAPTERS, cache=EnvelopeCache())
+    with pytest.raises(TypeError):
+        env["envelope_id"] = "x"
+    with pytest.raises(TypeError):
+        env["steps"].append({})
+    with pytest.raises(TypeError):
+        env["steps"][0]["id"] = "x"
+
+    mutable = copy.deepcopy(env)
+    mutable["steps"][0]["id"] = "x"
+    assert env["steps"][0]["id"] != "x"
+
+
+def test_invalid_plans_are_not_cached():
+    cache = EnvelopeCache()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            build_execution_envelope({"strategy": "single", "nodes": ["zz"]}, ADAPTERS, cache=cache)
+    assert len(cache) == 0
+
+
+def test_plans_of_the_wrong_shape_do_not_hit_valid_entries():
+    cache = EnvelopeCache()
+    plan = dict(PLAN, depends_on={"a": ["b"]})
+    build_execution_envelope(plan, ADAPTERS, cache=cache)
+    with pytest.raises(TypeError, match="nodes must be a list"):
+        build_execution_envelope(dict(plan, nodes=tuple(plan["nodes"])), ADAPTERS, cache=cache)
+    with pytest.raises(TypeError, match="must be a list"):
+        build_execution_envelope(dict(plan, depends_on={"a": ("b",)}), ADAPTERS, cache=cache)
+    assert cache.hits == 0
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pytest
+
+from model_layer.executor import execute_envelope, run_envelope
+from model_layer.orchestrator.orchestrator import build_execution_envelope
+
+FLOW = {
+    "plan_id": "p",
+    "strategy": "verify",
+    "nodes": ["merge", "v1", "v2", "gen"],
+    "depends_on": {"v1": ["gen"], "v2": ["gen"], "merge": ["v2", "v1"]},
+}
+
+
+def adapters_for(nodes):
+    return [{"adapter_id": n, "capabilities": {}} for n in nodes]
+
+
+def test_flow_steps_are_topological_and_pin_their_dependencies():
+    env = build_execution_envelope(FLOW, adapters_for(FLOW["nodes"]))
+    steps = {s["node"]: s for s in env["steps"]}
+
+    assert [s["node"] for s in env["steps"]] == ["gen", "v1", "v2", "merge"]
+    assert "after" not in steps["gen"]
+    assert steps["v1"]["after"] == [steps["gen"]["id"]]
+    assert steps["merge"]["after"] == [steps["v1"]["id"], steps["v2"]["id"]]
+
+    rewired = dict(FLOW, depends_on={"v1": ["gen"], "merge": ["v2", "v1"]})
+    assert build_execution_envelope(rewired, adapters_for(FLOW["nodes"]))["envelope_id"] != env["envelope_id"]
+    assert execute_envelope(env)["steps"][3]["status"] == "ok"
+
+
+def test_ready_steps_are_ordered_by_critical_path():
+    plan = {"plan_id": "p", "strategy": "fanout", "nodes": ["a", "z1", "z2", "z3"],
+            "depends_on": {"z2": ["z1"], "z3": ["z2"]}}
+    env = build_execution_envelope(plan, adapters_for(plan["nodes"]))
+    assert [s["node"] for s in env["steps"]] == ["z1", "z2", "a", "z3"]
+
+
+def test_invalid_graphs_are_rejected():
+    adapters = adapters_for(FLOW["nodes"])
+    with pytest.raises(ValueError, match="dependency cycle among nodes: gen, merge, v1"):
+        build_execution_envelope(dict(FLOW, depends_on={"v1": ["gen"], "merge": ["v1"], "gen": ["merge"]}), adapters)
+    with pytest.raises(ValueError, match="cycle"):
+        build_execution_envelope(dict(FLOW, depends_on={"gen": ["gen"]}), adapters)
+    with pytest.raises(ValueError, match="not in plan.nodes"):
+        build_execution_envelope(dict(FLOW, depends_on={"v1": ["other"]}), adapters)
+    with pytest.raises(ValueError, match="schedule"):
+        build_execution_envelope(FLOW, adapters, schedule="waves")
+
+
+def dag_envelope():
+    return {"envelope_id": "e", "plan_id": "p", "steps": [
+        {"id": "gen", "payload": 1, "timeout_ms": 10, "simulate_duration_ms": 50},
+        {"id": "other", "payload": 2},
+        {"id": "verify", "payload": 3, "after": ["gen"], "group": "g"},
+        {"id": "merge", "payload": 4, "after": ["verify", "other"]},
+    ]}
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_steps_after_a_timed_out_dependency_are_blocked(workers):
+    trace = execute_envelope(dag_envelope(), workers)
+    assert [(s["id"], s["status"]) for s in trace["steps"]] == [
+        ("gen", "timed_out"), ("other", "ok"), ("verify", "blocked"), ("merge", "blocked")]
+    assert trace["quorum"] == {"g": False}
+
+
+def test_executor_rejects_forward_references():
+    env = dag_envelope()
+    env["steps"][0]["after"] = ["merge"]
+    with pytest.raises(ValueError, match="ids of earlier steps"):
+        execute_envelope(env)
+
+
+def test_async_executor_runs_branches_concurrently_and_passes_inputs():
+    env = build_execution_envelope(FLOW, adapters_for(FLOW["nodes"]))
+    seen = {}
+    in_flight = []
+    overlaps = []
+
+    async def call(step):
+        seen[step["node"]] = step.get("inputs")
+        overlaps.append(sorted(in_flight))
+        in_flight.append(step["node"])
+        await asyncio.sleep(0.1)
+        in_flight.remove(step["node"])
+        return step["node"]
+
+    start = time.monotonic()
+    trace = run_envelope(env, call)
+
+    assert time.monotonic() - start >= 0.3  # three stages
+    assert all(s["status"] == "ok" for s in trace["steps"])
+    assert overlaps == [[], [], ["v1"], []]  # v2 starts while v1 runs; merge waits for both
+    assert seen == {"gen": None, "v1": ["gen"], "v2": ["gen"], "merge": ["v1", "v2"]}
+
+
+def test_async_executor_blocks_dependents_of_failed_steps():
+    env = build_execution_envelope(FLOW, adapters_for(FLOW["nodes"]))
+    started = []
+
+    async def call(step):
+        started.append(step["node"])
+        if step["node"] == "v2":
+            raise RuntimeError("verifier down")
+        return step["node"]
+
+    trace = run_envelope(env, call)
+    assert [s["status"] for s in trace["steps"]] == ["ok", "ok", "failed", "blocked"]
+    assert "merge" not in started
+
+
+def verify_group_envelope():
+    # Three verifiers of one group; two of them wait on a generator that times out.
+    return {"envelope_id": "e", "plan_id": "p", "steps": [
+        {"id": "gen", "payload": 1, "timeout_ms": 10, "simulate_duration_ms": 50},
+        {"id": "v1", "payload": "yes", "group": "g"},
+        {"id": "v2", "payload": "yes", "group": "g", "after": ["gen"]},
+        {"id": "v3", "payload": "yes", "group": "g", "after": ["gen"]},
+    ]}
+
+
+@pytest.mark.parametrize("early_quorum", [False, True])
+def test_blocked_members_count_against_the_group_majority(early_quorum):
+    trace = execute_envelope(verify_group_envelope(), early_quorum=early_quorum)
+    assert [s["status"] for s in trace["steps"]] == ["timed_out", "ok", "blocked", "blocked"]
+    assert trace["quorum"] == {"g": False}
+
+    env = verify_group_envelope()
+    env["steps"][3]["after"] = []
+    assert execute_envelope(env, early_quorum=early_quorum)["quorum"] == {"g": True}
+
+
+def test_async_blocked_members_count_against_the_group_majority():
+    env = verify_group_envelope()
+
+    async def call(step):
+        if step["id"] == "gen":
+            raise RuntimeError("generator down")
+        return step["payload"]
+
+    trace = run_envelope(env, call)
+    assert [s["status"] for s in trace["steps"]] == ["failed", "ok", "blocked", "blocked"]
+    assert trace["quorum"] == {"g": False}
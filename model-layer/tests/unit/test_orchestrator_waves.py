@@ -0,0 +1,95 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from model_layer.executor import execute_envelope, run_envelope
+from model_layer.orchestrator.orchestrator import build_execution_envelope
+from model_layer.orchestrator.waves import wave_slots
+
+
+def adapter(adapter_id, concurrency=1, memory_mb_max=None):
+    d = {"adapter_id": adapter_id, "capabilities": {"concurrency": concurrency}}
+    if memory_mb_max is not None:
+        d["limits"] = {"timeout_ms_max": 30000, "memory_mb_max": memory_mb_max}
+    return d
+
+
+ADAPTERS = [adapter("a", 1), adapter("b", 2), adapter("c", 3), adapter("d", 4), adapter("e", 10)]
+
+
+def test_wide_fanout_is_packed_into_saturating_waves():
+    plan = {"plan_id": "p", "strategy": "fanout", "nodes": [a["adapter_id"] for a in ADAPTERS] * 200}
+    env = build_execution_envelope(plan, ADAPTERS, schedule="waves")
+    steps = env["steps"]
+
+    assert len(steps) == 1000 and len({s["id"] for s in steps}) == 1000
+    assert [s["wave"] for s in steps] == sorted(s["wave"] for s in steps)
+    per_wave = Counter((s["wave"], s["adapter"]) for s in steps)
+    slots = {a["adapter_id"]: a["capabilities"]["concurrency"] for a in ADAPTERS}
+    assert all(n <= slots[aid] for (_, aid), n in per_wave.items())
+    # Every adapter is full in each wave until its steps run out; "a" (1 slot) sets the length.
+    assert max(s["wave"] for s in steps) == 199
+    assert [per_wave[(w, "e")] for w in range(21)] == [10] * 20 + [0]
+    assert sum(1 for s in steps if s["wave"] == 0) == 20
+
+    trace = execute_envelope(env)
+    assert [t["id"] for t in trace["steps"]] == [s["id"] for s in steps]
+
+
+def test_memory_limit_bounds_slots_and_rejects_oversized_plans():
+    assert wave_slots(adapter("m", 4, 8192)) == 4
+    assert wave_slots(adapter("m", 4, 8192), 3000) == 2
+    assert wave_slots(adapter("m", 4), 3000) == 4
+
+    adapters = [adapter("m", 4, 8192)]
+    env = build_execution_envelope({"plan_id": "p", "strategy": "fanout", "nodes": ["m"] * 5, "memory_mb": 3000},
+                                   adapters, schedule="waves")
+    assert [s["wave"] for s in env["steps"]] == [0, 0, 1, 1, 2]
+    with pytest.raises(ValueError, match="exceeds memory_mb_max"):
+        build_execution_envelope({"strategy": "single", "nodes": ["m"], "memory_mb": 9000}, adapters, schedule="waves")
+
+
+def test_default_envelope_is_unscheduled():
+    plan = {"plan_id": "p", "strategy": "fanout", "nodes": ["b", "a"]}
+    env = build_execution_envelope(plan, ADAPTERS)
+    assert all("wave" not in s and "replica" not in s for s in env["steps"])
+    with pytest.raises(ValueError, match="duplicate node"):
+        build_execution_envelope(dict(plan, nodes=["a", "a"]), ADAPTERS)
+    with pytest.raises(ValueError, match="unknown schedule"):
+        build_execution_envelope(plan, ADAPTERS, schedule="greedy")
+
+    waved = build_execution_envelope(plan, ADAPTERS, schedule="waves")
+    assert [s["wave"] for s in waved["steps"]] == [0, 0]
+    assert waved["envelope_id"] != env["envelope_id"]
+
+
+def test_executor_rejects_steps_out_of_wave_order():
+    env = {"envelope_id": "e", "plan_id": "p", "steps": [{"id": "s1", "wave": 1}, {"id": "s2", "wave": 0}]}
+    with pytest.raises(ValueError, match="ordered by wave"):
+        execute_envelope(env)
+    env["steps"][1] = {"id": "s2"}
+    with pytest.raises(ValueError, match="every step or no step"):
+        execute_envelope(env)
+
+
+def test_async_executor_runs_one_wave_at_a_time():
+    adapters = [adapter("a", 2), adapter("b", 1)]
+    env = build_execution_envelope({"plan_id": "p", "strategy": "fanout", "nodes": ["a"] * 4 + ["b"] * 2},
+                                   adapters, schedule="waves")
+    in_flight = Counter()
+    peak = Counter()
+    started = []
+
+    async def call(step):
+        started.append(step["wave"])
+        in_flight[step["adapter"]] += 1
+        peak[step["adapter"]] = max(peak[step["adapter"]], in_flight[step["adapter"]])
+        await asyncio.sleep(0.01)
+        in_flight[step["adapter"]] -= 1
+        return step["node"]
+
+    trace = run_envelope(env, call)
+    assert all(s["status"] == "ok" for s in trace["steps"])
+    assert started == sorted(started) == [0, 0, 0, 1, 1, 1]
+    assert peak == {"a": 2, "b": 1}
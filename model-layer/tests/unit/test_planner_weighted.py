@@ -0,0 +1,113 @@
+import pathlib
+import sys
+from collections import Counter
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from planner.planner import build_execution_plan as build_c11_plan
+
+from model_layer.planner.planner import build_execution_plan
+from model_layer.planner.selection import adapter_weights, weighted_allocation, weighted_order
+
+
+def adapter(adapter_id, concurrency=1):
+    return {"adapter_id": adapter_id, "capabilities": {"concurrency": concurrency, "supported_strategies": ["single", "fanout"]}}
+
+
+def first_pick_shares(adapters, health=None, seeds=2000):
+    counts = Counter(weighted_order(adapters, seed, health)[0] for seed in range(seeds))
+    return {aid: n / seeds for aid, n in counts.items()}
+
+
+def test_first_pick_share_tracks_concurrency():
+    shares = first_pick_shares([adapter("a", 3), adapter("b", 1)])
+    assert shares["a"] == pytest.approx(0.75, abs=0.04)
+
+
+def test_latency_and_health_status_scale_weights():
+    adapters = [adapter("fast"), adapter("slow"), adapter("unknown"), adapter("down"), adapter("meh")]
+    health = {
+        "fast": {"status": "ok", "details": {"latency_ms": 10}},
+        "slow": {"status": "ok", "details": {"latency_ms": 40}},
+        "down": {"status": "unavailable", "details": {"latency_ms": 1}},
+        "meh": {"status": "degraded", "details": {"latency_ms": 10}},
+    }
+    weights = adapter_weights(adapters, health)
+    assert weights["fast"] == 4 * weights["slow"] == 2 * weights["meh"]
+    assert weights["unknown"] == weights["fast"]  # median of known latencies (1, 10, 10, 40)
+    assert weights["down"] == 0.0
+    assert "down" not in weighted_order(adapters, 7, health)
+
+    shares = first_pick_shares([adapter("fast"), adapter("slow")], health)
+    assert shares["fast"] == pytest.approx(0.8, abs=0.04)
+
+
+def test_order_is_deterministic_and_input_order_independent():
+    adapters = [adapter(f"n{i}", i + 1) for i in range(5)]
+    order = weighted_order(adapters, 42)
+    assert order == weighted_order(list(reversed(adapters)), 42)
+    assert sorted(order) == [a["adapter_id"] for a in adapters]
+    with pytest.raises(ValueError, match="no available adapters"):
+        weighted_order(adapters, 0, {a["adapter_id"]: {"status": "unavailable"} for a in adapters})
+
+
+def test_model_layer_planner_weighted_selection():
+    adapters = [adapter("a", 3), adapter("b", 1)]
+    seeded = build_execution_plan("p", adapters, seed=5)
+    assert seeded == build_execution_plan("p", adapters, seed=5, selection="seeded")
+
+    picks = Counter(build_execution_plan("p", adapters, seed=s, selection="weighted")["nodes"][0] for s in range(1000))
+    assert picks["a"] / 1000 == pytest.approx(0.75, abs=0.05)
+
+    plan = build_execution_plan("p", adapters, strategy="fanout", fanout=4, seed=1, selection="weighted")
+    assert Counter(plan["nodes"]) == {"a": 3, "b": 1}
+    assert plan["plan_id"] != build_execution_plan("p", adapters, strategy="fanout", fanout=4, seed=1)["plan_id"]
+    with pytest.raises(ValueError, match="selection"):
+        build_execution_plan("p", adapters, seed=1, selection="random")
+
+
+def test_c11_planner_weighted_selection():
+    adapters = [adapter("a"), adapter("b"), adapter("c", 8)]
+    health = {"a": {"status": "unavailable"}}
+    sorted_plan = build_c11_plan({"prompt": "x"}, adapters, strategy_hint="single")
+    assert sorted_plan["nodes"] == ["a"]
+
+    picks = Counter(
+        build_c11_plan({"prompt": f"x{i}"}, adapters, strategy_hint="single", selection="weighted", health=health)["nodes"][0]
+        for i in range(500)
+    )
+    assert set(picks) == {"b", "c"} and picks["c"] > 5 * picks["b"]
+
+    plan = build_c11_plan({"prompt": "x"}, adapters, strategy_hint="fanout", selection="weighted", health=health)
+    assert sorted(plan["nodes"]) == ["b", "c"] and "weighted" in plan["_explain"]["reason"]
+
+
+def test_wide_fanout_replicas_follow_weights():
+    adapters = [adapter(f"a{i}", 16 if i == 4 else 1) for i in range(5)]
+    plan = build_execution_plan("p", adapters, strategy="fanout", fanout=1000, seed=3, selection="weighted")
+    assert Counter(plan["nodes"]) == {"a0": 50, "a1": 50, "a2": 50, "a3": 50, "a4": 800}
+
+    nodes = weighted_allocation([adapter("x", 2), adapter("y", 1)], 7, 0)
+    assert Counter(nodes) == {"x": 5, "y": 2}  # 4.67 + 2.33: the remainder goes to x
+    assert "yy" not in "".join(nodes)  # interleaved, not bunched
+    assert weighted_allocation(adapters, 3, 9) == weighted_order(adapters, 9)[:3]
+
+
+def test_unseeded_weighted_plans_spread_by_prompt():
+    adapters = [adapter(f"a{i}", 16 if i == 4 else 1) for i in range(5)]
+    picks = {build_execution_plan(f"prompt {i}", adapters, selection="weighted")["nodes"][0] for i in range(40)}
+    assert "a4" in picks and len(picks) > 1
+    first = build_execution_plan("same", adapters, selection="weighted")
+    assert first == build_execution_plan("same", adapters, selection="weighted")
+
+
+def test_verify_rejects_quorum_above_available_adapters():
+    adapters = [adapter("a"), adapter("b"), adapter("c")]
+    health = {"a": {"status": "unavailable"}, "b": {"status": "unavailable"}}
+    with pytest.raises(ValueError, match="exceeds the 1 available adapters"):
+        build_execution_plan("p", adapters, strategy="verify", quorum=2, seed=0, selection="weighted", health=health)
+    plan = build_execution_plan("p", adapters, strategy="verify", quorum=1, seed=0, selection="weighted", health=health)
+    assert plan["nodes"] == ["c"]
@@ -0,0 +1,36 @@
+import sys
+
+from model_layer.executor import execute_envelope, iter_trace_records
+from model_layer.records import EnvelopeStep, Plan, TraceStep, pack_digest, unpack_digest
+
+DIGEST = "ab" * 32
+
+
+def test_only_lowercase_hex_digests_are_packed():
+    assert pack_digest(DIGEST) == bytes.fromhex(DIGEST)
+    for value in ("s1", DIGEST.upper(), DIGEST[:-1], 7, None):
+        assert pack_digest(value) == value
+    assert unpack_digest(pack_digest(DIGEST)) == DIGEST
+
+
+def test_records_round_trip_dict_contracts():
+    plan = {"plan_id": DIGEST, "strategy": "verify", "nodes": ["a", "b"], "seed": 0, "quorum": 2}
+    step = {"node": "a", "adapter": "a", "mode": "dry-run", "timeout_ms": 10, "id": DIGEST}
+    trace_step = {"id": "s1", "status": "ok", "duration_ms": 0, "result": DIGEST, "payload_hash": DIGEST, "group": None}
+    timed_out = dict(trace_step, status="timed_out", result=None, payload_hash=None)
+
+    assert Plan.from_dict(plan).to_dict() == plan
+    assert list(EnvelopeStep.from_dict(step).to_dict()) == list(step)
+    for d in (trace_step, timed_out):
+        assert TraceStep.from_dict(d).to_dict() == d
+
+
+def test_trace_records_hold_raw_digests():
+    env = {"envelope_id": "e", "plan_id": "p", "steps": [{"id": "s1", "payload": {"x": 1}}]}
+    record, summary = list(iter_trace_records(env))
+
+    assert not hasattr(record, "__dict__")
+    assert len(record.result) == 32 and len(record.payload_hash) == 32
+    assert record.to_dict() == execute_envelope(env)["steps"][0]
+    assert summary["quorum"] == {}
+    assert sys.getsizeof(record) < sys.getsizeof(record.to_dict())
@@ -0,0 +1,93 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'tools'))
+
+from planner.planner import build_execution_plan as build_c11_plan
+from validate_adapter import AdapterValidationError, check_plan_acceptance, validate_descriptor
+
+from model_layer.orchestrator.orchestrator import EnvelopeCache, adapter_fingerprint, build_execution_envelope
+from model_layer.planner.planner import build_execution_plan
+from model_layer.registry import AdapterRegistry
+
+
+def descriptor(adapter_id, strategies=("single", "fanout"), deterministic=True, backend="cpu"):
+    return {
+        "adapter_id": adapter_id,
+        "adapter_version": "1.0.0",
+        "backend_type": backend,
+        "vendor": "acme",
+        "capabilities": {
+            "max_tokens": 1024,
+            "deterministic": deterministic,
+            "supported_prompt_types": ["task"],
+            "supported_strategies": list(strategies),
+            "concurrency": 1,
+        },
+        "limits": {"timeout_ms_max": 30000, "memory_mb_max": 1024},
+    }
+
+
+ADAPTERS = [
+    descriptor("zeta"),
+    descriptor("alpha", strategies=("single", "verify"), backend="gpu"),
+    descriptor("mid", deterministic=False, backend="remote"),
+]
+
+
+def test_indexes_follow_adds_and_removes():
+    reg = AdapterRegistry(ADAPTERS, validator=validate_descriptor)
+    assert reg.ids() == ("zeta", "alpha", "mid")
+    assert reg.sorted_ids() == ("alpha", "mid", "zeta")
+    assert [d["adapter_id"] for d in reg.supporting("fanout")] == ["zeta", "mid"]
+    assert [d["adapter_id"] for d in reg.with_backend("gpu")] == ["alpha"]
+    assert [d["adapter_id"] for d in reg.deterministic(False)] == ["mid"]
+
+    before = reg.fingerprint
+    reg.remove("alpha")
+    assert reg.supporting("verify") == [] and reg.with_backend("gpu") == []
+    assert reg.sorted_ids() == ("mid", "zeta")
+    reg.add(descriptor("alpha", strategies=("single", "verify"), backend="gpu"))
+    assert reg.ids() == ("zeta", "mid", "alpha") and reg.fingerprint != before
+
+
+def test_rejects_invalid_and_duplicate_descriptors():
+    reg = AdapterRegistry(ADAPTERS, validator=validate_descriptor)
+    with pytest.raises(ValueError, match="duplicate adapter_id"):
+        reg.add(descriptor("zeta"))
+    with pytest.raises(ValueError):
+        reg.add({"capabilities": {}})
+    with pytest.raises(AdapterValidationError):
+        reg.add({"adapter_id": "bare"})
+    assert len(reg) == 3
+
+
+def test_stored_descriptors_are_frozen_copies():
+    source = descriptor("a")
+    reg = AdapterRegistry([source])
+    source["capabilities"]["supported_strategies"].append("verify")
+    assert reg.supporting("verify") == []
+    with pytest.raises(TypeError):
+        reg.get("a")["capabilities"]["deterministic"] = False
+
+
+def test_stages_accept_registry_in_place_of_list():
+    reg = AdapterRegistry(ADAPTERS)
+    for strategy, kw in (("single", {"seed": 4}), ("fanout", {"fanout": 5, "seed": 1}), ("verify", {"quorum": 2})):
+        assert build_execution_plan("p", reg, strategy=strategy, **kw) == build_execution_plan("p", ADAPTERS, strategy=strategy, **kw)
+    for hint in (None, "fanout", "quorum"):
+        assert build_c11_plan({"prompt": "x"}, reg, strategy_hint=hint) == build_c11_plan({"prompt": "x"}, ADAPTERS, strategy_hint=hint)
+
+    plan = {"strategy": "fanout", "nodes": ["mid", "zeta"], "timeout_ms": 1000}
+    assert build_execution_envelope(plan, reg) == build_execution_envelope(plan, ADAPTERS)
+    assert reg.fingerprint == adapter_fingerprint(ADAPTERS)
+    cache = EnvelopeCache()
+    assert build_execution_envelope(plan, reg, cache=cache) is build_execution_envelope(plan, ADAPTERS, cache=cache)
+
+    check_plan_acceptance(reg.get("zeta"), plan, reg)
+    with pytest.raises(AdapterValidationError):
+        check_plan_acceptance(reg.get("zeta"), dict(plan, nodes=["ghost"]), reg)
@@ -3,12 +3,19 @@ Simple validator for C10 adapter descriptors and plan acceptance checks.
 
 This module intentionally keeps behavior deterministic and minimal for unit testing.
 """
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Optional, Union
 
 from jsonschema import validate as js_validate, ValidationError as JSValidationError
 
 from pathlib import Path
 import json
+import sys
+
+try:
+    from model_layer.registry import AdapterRegistry
+except ImportError:  # run as a script from the source tree
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from model_layer.registry import AdapterRegistry
 
 SCHEMA_DIR = Path(__file__).resolve().parents[1] / 'adapters' / 'schemas'
 
@@ -34,8 +41,11 @@ def validate_descriptor(descriptor: Dict) -> None:
         raise AdapterValidationError(str(e))
 
 
-def check_plan_acceptance(descriptor: Dict, plan: Dict, discovered_nodes: Iterable[str], *, max_timeout_ms: Optional[int] = None) -> None:
-    """Raise AdapterValidationError if plan must be rejected by this adapter."""
+def check_plan_acceptance(descriptor: Dict, plan: Dict, discovered_nodes: Union[Iterable[str], AdapterRegistry], *, max_timeout_ms: Optional[int] = None) -> None:
+    """Raise AdapterValidationError if plan must be rejected by this adapter.
+
+    `discovered_nodes` may be an AdapterRegistry, whose adapter ids are the nodes.
+    """
     # descriptor validated already
     caps = descriptor['capabilities']
     limits = descriptor['limits']
@@ -61,7 +71,8 @@ def check_plan_acceptance(descriptor: Dict, plan: Dict, discovered_nodes: Iterab
     nodes = plan.get('nodes', [])
     if not nodes:
         raise AdapterValidationError('limit_exceeded')
-    unknown = [n for n in nodes if n not in set(discovered_nodes)]
+    known = discovered_nodes if isinstance(discovered_nodes, AdapterRegistry) else set(discovered_nodes)
+    unknown = [n for n in nodes if n not in known]
     if unknown:
         raise AdapterValidationError('limit_exceeded')
 
@@ -4,9 +4,15 @@ policy decisions (e.g., external system prompt rejection).
 """
 import jsonschema
 import json
-import hashlib
+import sys
 from pathlib import Path
 
+try:
+    from model_layer.canonical import sha256_hex
+except ImportError:  # run as a script from the source tree
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from model_layer.canonical import sha256_hex
+
 SCHEMA_DIR = Path(__file__).resolve().parents[1] / 'contracts' / 'schemas'
 INPUT_SCHEMA = json.loads((SCHEMA_DIR / 'input.json').read_text())
 OUTPUT_SCHEMA = json.loads((SCHEMA_DIR / 'output.json').read_text())
@@ -21,8 +27,7 @@ class ValidationError(Exception):
 
 
 def compute_request_hash(obj: dict) -> str:
-    canonical = json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
-    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    return sha256_hex(obj, ensure_ascii=False)
 
 
 def validate_input(obj: dict, payload_bytes: int = None, external_submission: bool = True) -> dict:
@@ -61,7 +66,6 @@ def rejection_response(code: str, reason: str) -> dict:
 
 
 if __name__ == '__main__':
-    import sys
     raw = sys.stdin.read()
     try:
         obj = json.loads(raw)
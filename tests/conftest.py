@@ -0,0 +1,120 @@
+"""Shared fixtures for llm-cli tests: a tiny in-process stand-in for Ollama."""
+
+import json
+import pathlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "llm-cli"))
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != "/api/ps":
+            self.send_error(404)
+            return
+        time.sleep(self.server.ps_delay)
+        data = json.dumps({"models": [{"name": m, "model": m} for m in self.server.models]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path in self.server.fail_paths:
+            self.send_error(404)
+            return
+        req = json.loads(body)
+        with self.server.lock:
+            self.server.requests.append(req)
+            status = self.server.fail_next.pop(0) if self.server.fail_next else None
+        if status is not None:
+            self.send_error(status)
+            return
+
+        text = "echo:" + req.get("prompt", "")
+        if not req.get("stream"):
+            data = json.dumps({
+                "model": req.get("model"), "response": text, "done": True,
+                "total_duration": 5000000, "load_duration": 1000000,
+                "prompt_eval_count": 3, "prompt_eval_duration": 1000000,
+                "eval_count": 2, "eval_duration": 2000000,
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = [{"response": tok, "done": False} for tok in ("echo:", req.get("prompt", ""))]
+        chunks.append({"response": "", "done": True, "eval_count": 2, "eval_duration": 1000000})
+        for c in chunks:
+            time.sleep(self.server.chunk_delay)
+            line = (json.dumps(c) + "\n").encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OllamaHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = []
+    server.chunk_delay = 0
+    server.ps_delay = 0
+    server.fail_paths = set()
+    server.models = []
+    server.fail_next = []
+    server.url = "http://127.0.0.1:%d/api/generate" % server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _stop_stub(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ollama_stub():
+    server = _start_stub()
+    try:
+        yield server
+    finally:
+        _stop_stub(server)
+
+
+@pytest.fixture
+def ollama_stubs():
+    """Two independent stand-ins, for multi-endpoint routing."""
+    servers = [_start_stub(), _start_stub()]
+    try:
+        yield servers
+    finally:
+        for server in servers:
+            _stop_stub(server)
+
@@ -0,0 +1,64 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import llm
+
+
+class SlowClient:
+    """Fake client: earlier prompts take longer, and peak concurrency is tracked."""
+
+    def __init__(self, n):
+        self.n = n
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def generate(self, prompt, model=None, **kw):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01 * (self.n - int(prompt)))
+        with self.lock:
+            self.active -= 1
+        return "r" + prompt
+
+
+def run_batch(tmp_path, monkeypatch, capsys, lines, **kw):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    src = tmp_path / "in.jsonl"
+    src.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    args = SimpleNamespace(input_file=str(src), model="m", concurrency=kw.get("concurrency", 3), unordered=kw.get("unordered", False))
+    client = kw.get("client") or SlowClient(len(lines))
+    failures = llm.handle_jsonl_mode(args, client=client)
+    out = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return failures, out, client
+
+
+def test_jsonl_preserves_input_order_with_bounded_inflight(tmp_path, monkeypatch, capsys):
+    lines = [json.dumps({"prompt": str(i)}) for i in range(8)]
+    failures, out, client = run_batch(tmp_path, monkeypatch, capsys, lines)
+
+    assert failures == 0
+    assert [o["index"] for o in out] == list(range(8))
+    assert [o["response"] for o in out] == ["r%d" % i for i in range(8)]
+    assert len({o["request"]["request_id"] for o in out}) == 8
+    assert client.peak <= 3
+
+    audit = [json.loads(line) for line in (tmp_path / "audit.log").read_text().splitlines()]
+    assert len(audit) == 8
+    assert all(a["mode"] == "jsonl" and a["ok"] for a in audit)
+
+
+def test_jsonl_unordered_and_bad_records(tmp_path, monkeypatch, capsys):
+    lines = [json.dumps({"prompt": "0"}), "", "not json", json.dumps({"nope": 1}), json.dumps({"prompt": "4"})]
+    failures, out, _ = run_batch(tmp_path, monkeypatch, capsys, lines, unordered=True, client=SlowClient(5))
+
+    assert failures == 2
+    assert sorted(o["index"] for o in out) == [0, 1, 2, 3]
+    by_index = {o["index"]: o for o in out}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1]["status"] == "error"
+    assert by_index[2]["status"] == "error"
+    assert by_index[3]["response"] == "r4"
@@ -0,0 +1,59 @@
+import json
+import os
+import time
+
+import llm
+from llm_cache import ResponseCache
+from llm_client import LLMClient
+
+
+def test_cache_roundtrip_and_ttl(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60)
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, "hello", model="m")
+    assert cache.get("ab" * 32) == "hello"
+
+    # Age the entry past its TTL
+    path = tmp_path / "ab" / ("ab" * 32 + ".json")
+    entry = json.loads(path.read_text())
+    entry["created"] = time.time() - 120
+    path.write_text(json.dumps(entry))
+    assert cache.get("ab" * 32) is None
+    assert not path.exists()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    probe = ResponseCache(tmp_path / "probe")
+    probe.put("aa" * 32, "x" * 60)
+    entry_size = (tmp_path / "probe" / "aa" / ("aa" * 32 + ".json")).stat().st_size
+    # room for three entries, not four
+    cache = ResponseCache(tmp_path / "c", max_bytes=entry_size * 3 + entry_size // 2)
+    keys = ["%02x" % i * 32 for i in range(3)]
+    for i, k in enumerate(keys):
+        cache.put(k, "x" * 60)
+        # distinct mtimes regardless of filesystem timestamp resolution
+        p = tmp_path / "c" / k[:2] / (k + ".json")
+        os.utime(p, (1000 + i, 1000 + i))
+    cache.get(keys[0])  # refresh the oldest entry
+
+    cache.put("ff" * 32, "y" * 60)
+    assert cache.get(keys[0]) == "x" * 60
+    assert cache.get(keys[1]) is None
+    assert cache.get("ff" * 32) == "y" * 60
+
+
+def test_run_request_hits_cache(ollama_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    cache = ResponseCache(tmp_path / "cache")
+    with LLMClient(ollama_stub.url) as client:
+        first = llm.run_request({"prompt": "q"}, "m", client=client, cache=cache)
+        second = llm.run_request({"prompt": "q"}, "m", client=client, cache=cache)
+        other = llm.run_request({"prompt": "q", "options": {"seed": 1}}, "m", client=client, cache=cache)
+
+    assert (first["cache_hit"], second["cache_hit"], other["cache_hit"]) == (False, True, False)
+    assert second["response"] == first["response"] == "echo:q"
+    assert len(ollama_stub.requests) == 2
+    assert ollama_stub.requests[1]["options"] == {"seed": 1}
+
+    audit = [json.loads(line) for line in (tmp_path / "audit.log").read_text().splitlines()]
+    assert [a["cache_hit"] for a in audit] == [False, True, False]
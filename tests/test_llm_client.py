@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+
+import llm
+import pytest
+
+from llm_client import HTTPStatusError, LLMClient, RetryPolicy, StdlibClient
+
+
+def test_client_reuses_pooled_connection(ollama_stub):
+    client = LLMClient(ollama_stub.url, pool_size=2)
+    try:
+        for i in range(5):
+            assert client.generate(f"p{i}", model="m") == f"echo:p{i}"
+    finally:
+        client.close()
+
+    assert len(ollama_stub.requests) == 5
+    assert ollama_stub.connections == 1
+
+
+def test_client_shared_across_threads(ollama_stub):
+    client = LLMClient(ollama_stub.url, pool_size=4)
+    results = {}
+
+    def worker(i):
+        results[i] = client.generate(f"t{i}", model="m")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    client.close()
+
+    assert results == {i: f"echo:t{i}" for i in range(16)}
+    assert ollama_stub.connections <= 4
+
+
+def test_call_llm_sends_guard_and_streams(ollama_stub):
+    with LLMClient(ollama_stub.url) as client:
+        out = llm.call_llm("hi", model="m", stream=True, client=client)
+    assert out == "echo:hi"
+    assert ollama_stub.requests[0]["system"] == llm.SYSTEM_GUARD
+
+
+def test_stream_flushes_tokens_before_completion(ollama_stub):
+    ollama_stub.chunk_delay = 0.1
+    arrivals = []
+    with LLMClient(ollama_stub.url) as client:
+        response, metrics = llm.stream_llm("hi", model="m", on_token=lambda t: arrivals.append(time.perf_counter()), client=client)
+    done = time.perf_counter()
+
+    assert response == "echo:hi"
+    assert done - arrivals[0] >= 0.15
+    assert metrics["ttft_ms"] is not None and metrics["ttft_ms"] < metrics["total_ms"]
+    assert metrics["tokens"] == 2
+    assert metrics["tokens_per_sec"] == 2000.0
+
+
+def test_json_stream_emits_token_and_done_events(ollama_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    events = []
+    with LLMClient(ollama_stub.url) as client:
+        llm.run_stream_request({"prompt": "x"}, "m", events.append, client=client)
+
+    assert [e["event"] for e in events] == ["token", "token", "done"]
+    assert "".join(e["text"] for e in events[:-1]) == events[-1]["response"] == "echo:x"
+    assert "ttft_ms" in events[-1]["request"]
+    audit = json.loads((tmp_path / "audit.log").read_text())
+    assert audit["mode"] == "json-stream" and audit["tokens_per_sec"] == 2000.0
+
+
+def test_stdlib_client_keeps_connection_alive(ollama_stub):
+    with StdlibClient(ollama_stub.url) as client:
+        assert client.generate("a", model="m") == "echo:a"
+        assert [c["response"] for c in client.stream_generate("b", model="m")] == ["echo:", "b", ""]
+        assert client.generate("c", model="m", stream=True) == "echo:c"
+    assert ollama_stub.connections == 1
+
+
+def test_stdlib_client_raises_on_http_error(ollama_stub):
+    bad_url = ollama_stub.url.replace("/api/generate", "/missing")
+    ollama_stub.fail_paths = {"/missing"}
+    with StdlibClient(bad_url) as client:
+        with pytest.raises(HTTPStatusError) as exc:
+            client.generate("a", model="m")
+    assert exc.value.status == 404
+
+
+@pytest.mark.parametrize("client_cls", [LLMClient, StdlibClient])
+def test_timings_breakdown(ollama_stub, client_cls):
+    first, second = {}, {}
+    with client_cls(ollama_stub.url) as client:
+        client.generate("a", model="m", timings=first)
+        client.generate("b", model="m", timings=second)
+
+    assert first["connect_ms"] > 0
+    assert second["connect_ms"] == 0
+    assert 0 < first["ttfb_ms"] <= first["total_ms"]
+    assert (first["load_ms"], first["prompt_eval_count"], first["eval_count"], first["eval_ms"]) == (1.0, 3, 2, 2.0)
+    assert first["overhead_ms"] == round(max(first["total_ms"] - 5.0, 0.0), 3)
+
+
+def test_run_request_records_timings(ollama_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    with StdlibClient(ollama_stub.url) as client:
+        out = llm.run_request({"prompt": "t"}, "m", client=client)
+
+    timings = out["request"]["timings"]
+    assert timings["ollama_total_ms"] == 5.0
+    assert json.loads((tmp_path / "audit.log").read_text())["timings"] == timings
+    assert llm.format_timings(timings).startswith("timings: connect")
+
+
+def test_identical_inflight_requests_share_one_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    calls = []
+
+    class GatedClient:
+        def generate(self, prompt, model=None, **kw):
+            calls.append(prompt)
+            time.sleep(0.2)
+            return "answer:" + prompt
+
+    client = GatedClient()
+    outs = []
+    threads = [threading.Thread(target=lambda: outs.append(llm.run_request({"prompt": "same"}, "m", client=client)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["same"]
+    assert [o["response"] for o in outs] == ["answer:same"] * 5
+    assert sorted(o["coalesced"] for o in outs) == [False] + [True] * 4
+    audit = [json.loads(line) for line in (tmp_path / "audit.log").read_text().splitlines()]
+    assert len({a["request_id"] for a in audit}) == 5
+
+    # Once the call has finished nothing is remembered: the next caller goes upstream.
+    assert llm.run_request({"prompt": "same"}, "m", client=client)["coalesced"] is False
+    assert len(calls) == 2
+
+
+def test_transient_errors_are_retried_and_audited(ollama_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    monkeypatch.setattr(llm, "RETRY_POLICY", RetryPolicy(3, backoff=0.001))
+    ollama_stub.fail_next = [503, 503]
+    with StdlibClient(ollama_stub.url) as client:
+        out = llm.run_request({"prompt": "r"}, "m", client=client)
+
+    assert out["response"] == "echo:r"
+    attempts = json.loads((tmp_path / "audit.log").read_text())["attempts"]
+    assert [(a["attempt"], a["ok"], a.get("status")) for a in attempts] == [(1, False, 503), (2, False, 503), (3, True, None)]
+    assert all("backoff_ms" in a for a in attempts[:2])
+
+
+def test_client_errors_are_not_retried(ollama_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    ollama_stub.fail_next = [400]
+    with StdlibClient(ollama_stub.url) as client:
+        with pytest.raises(HTTPStatusError) as exc:
+            llm.call_llm("x", model="m", client=client, retry=RetryPolicy(3, backoff=0.001))
+    llm.audit_failure(None, "m", "json", exc.value)
+
+    assert len(ollama_stub.requests) == 1
+    assert json.loads((tmp_path / "audit.log").read_text())["attempts"][0]["status"] == 400
+
+
+def test_deadline_bounds_a_hung_request(ollama_stub):
+    ollama_stub.chunk_delay = 1.0
+    start = time.perf_counter()
+    with StdlibClient(ollama_stub.url) as client:
+        with pytest.raises(OSError) as exc:
+            llm.stream_llm("slow", model="m", client=client, retry=RetryPolicy(5, backoff=0.001, deadline=0.2))
+
+    assert time.perf_counter() - start < 0.8
+    assert len(exc.value.attempts) == 1
+
+
+@pytest.mark.parametrize("mode_args", [["--json", "--input-file", "{input}"], ["hello"]])
+def test_one_shot_failures_audit_every_attempt(tmp_path, monkeypatch, mode_args):
+    import io
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        dead = f"http://127.0.0.1:{s.getsockname()[1]}"
+    (tmp_path / "in.json").write_text(json.dumps({"prompt": "hello"}))
+    argv = [a.format(input=tmp_path / "in.json") for a in mode_args]
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    monkeypatch.setattr("sys.stdin", io.StringIO(""))
+    monkeypatch.setattr("sys.argv", ["llm.py", "--endpoint", dead, "--retries", "2", "--retry-backoff", "0.001", *argv])
+    with pytest.raises(SystemExit):
+        llm.main()
+
+    entry = json.loads((tmp_path / "audit.log").read_text().splitlines()[-1])
+    assert entry["ok"] is False and entry["prompt_hash"] == llm.sha256_hex("hello")
+    assert [(a["attempt"], a["ok"]) for a in entry["attempts"]] == [(1, False), (2, False), (3, False)]
+
+
+def test_malformed_response_body_is_not_retried():
+    from llm_client import retryable
+
+    class BodyError(OSError, ValueError):  # shape of requests.exceptions.JSONDecodeError
+        pass
+
+    assert not retryable(BodyError("Expecting value"))
+    assert retryable(ConnectionRefusedError())
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import llm
+from llm_client import LLMClient
+from llm_daemon import DaemonClient, DaemonServer
+
+
+@pytest.fixture
+def daemon(ollama_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "AUDIT_PATH", tmp_path / "audit.log")
+    client = LLMClient(ollama_stub.url)
+    path = str(tmp_path / "llm.sock")
+
+    def dispatch(req, emit):
+        llm.handle_daemon_request(req, emit, model="m", client=client)
+
+    server = DaemonServer(path, dispatch)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        client.close()
+
+
+def test_daemon_serves_json_contract_over_one_connection(daemon, ollama_stub, tmp_path):
+    dc = DaemonClient(daemon.server_address)
+    first = list(dc.request({"prompt": "a"}))
+    second = list(dc.request({"prompt": "b", "model": "other"}))
+    streamed = list(dc.request({"prompt": "c", "stream": True}))
+    bad = list(dc.request({"nope": 1}))
+    dc.close()
+
+    assert first[0]["status"] == "ok" and first[0]["response"] == "echo:a"
+    assert second[0]["request"]["model"] == "other"
+    assert [r.get("event") for r in streamed] == ["token", "token", "done"]
+    assert bad == [{"status": "error", "message": "JSON input must be an object with a 'prompt' string field"}]
+
+    modes = [json.loads(line)["mode"] for line in (tmp_path / "audit.log").read_text().splitlines()]
+    assert modes == ["daemon", "daemon", "daemon-stream", "daemon"]
+
+
+def test_thin_client_forwards_to_daemon(daemon, tmp_path):
+    env = dict(os.environ, LLM_SOCKET=daemon.server_address, LLM_AUDIT_PATH=str(tmp_path / "client-audit.log"))
+    p = subprocess.run(
+        [sys.executable, "llm-cli/llm.py", "--json"],
+        input=json.dumps({"prompt": "fwd"}),
+        text=True,
+        capture_output=True,
+        env=env,
+    )
+
+    assert p.returncode == 0, p.stderr
+    out = json.loads(p.stdout)
+    assert out["status"] == "ok" and out["response"] == "echo:fwd"
+    # The daemon, not the thin client, owns the audit trail.
+    assert not (tmp_path / "client-audit.log").exists()
+
+
+def test_refuses_to_replace_live_socket(daemon):
+    with pytest.raises(OSError, match="already listening"):
+        DaemonServer(daemon.server_address, lambda req, emit: None)
+
+
+def test_jsonl_batch_survives_a_missing_daemon(tmp_path):
+    env = dict(os.environ, LLM_SOCKET=str(tmp_path / "absent.sock"), LLM_AUDIT_PATH=str(tmp_path / "audit.log"))
+    p = subprocess.run(
+        [sys.executable, "llm-cli/llm.py", "--jsonl"],
+        input='{"prompt": "a"}\n{"prompt": "b"}\n',
+        text=True,
+        capture_output=True,
+        env=env,
+    )
+
+    assert p.returncode == 2, p.stderr
+    lines = [json.loads(line) for line in p.stdout.splitlines()]
+    assert [(r["index"], r["status"]) for r in lines] == [(0, "error"), (1, "error")]
+    assert all("daemon unavailable" in r["message"] for r in lines)
+    assert len((tmp_path / "audit.log").read_text().splitlines()) == 2
+
+
+def test_forward_request_reports_a_silent_daemon():
+    class Silent:
+        path = "silent.sock"
+
+        def request(self, req):
+            return iter(())
+
+    with pytest.raises(llm.LLMError, match="daemon closed connection"):
+        llm.forward_request(Silent(), {"prompt": "x"}, lambda reply: None)
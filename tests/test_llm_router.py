@@ -0,0 +1,123 @@
+import socket
+import time
+
+import pytest
+
+import llm
+from llm_client import LLMClient, StdlibClient
+from llm_router import RoutingClient, parse_endpoints
+
+
+def dead_url():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return "http://127.0.0.1:%d/api/generate" % port
+
+
+def test_parse_endpoints_accepts_base_urls():
+    assert parse_endpoints(" http://a:11434/, http://b:1/api/generate ,") == [
+        "http://a:11434/api/generate",
+        "http://b:1/api/generate",
+    ]
+
+
+@pytest.mark.parametrize("client_cls", [LLMClient, StdlibClient])
+def test_loaded_models(ollama_stub, client_cls):
+    ollama_stub.models = ["b:7b", "a:2b"]
+    with client_cls(ollama_stub.url) as client:
+        assert client.loaded_models() == ["a:2b", "b:7b"]
+
+
+def test_prefers_endpoint_with_model_loaded(ollama_stubs):
+    cold, warm = ollama_stubs
+    warm.models = ["m"]
+    timings = {}
+    with RoutingClient([StdlibClient(cold.url), StdlibClient(warm.url)]) as router:
+        for i in range(3):
+            assert router.generate(f"p{i}", model="m", timings=timings) == f"echo:p{i}"
+
+    assert timings["endpoint"] == warm.url
+    assert (len(cold.requests), len(warm.requests)) == (0, 3)
+
+
+def test_model_refresh_does_not_hold_up_requests(ollama_stubs):
+    cold, warm = ollama_stubs
+    warm.models = ["m"]
+    now = [0.0]
+    router = RoutingClient([StdlibClient(cold.url), StdlibClient(warm.url)], ps_interval=10, ps_timeout=0.5,
+                           clock=lambda: now[0])
+    assert router.generate("first", model="m") == "echo:first"  # first probe, on the request path
+
+    # A stale list is refreshed in the background; meanwhile the last known one routes.
+    cold.models, warm.models = ["m"], []
+    cold.ps_delay = warm.ps_delay = 0.3
+    now[0] = 11.0
+    start = time.perf_counter()
+    assert router.generate("stale", model="m") == "echo:stale"
+    assert time.perf_counter() - start < 0.25
+    assert [r["prompt"] for r in warm.requests] == ["first", "stale"]
+
+    deadline = time.monotonic() + 5
+    while "m" not in router.endpoints[0].models and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert router.endpoints[0].models == {"m"}
+    router.close()
+
+
+def test_first_probe_is_bounded_by_ps_timeout(ollama_stub):
+    ollama_stub.ps_delay = 1.0
+    with RoutingClient([StdlibClient(ollama_stub.url)], ps_timeout=0.1) as router:
+        start = time.perf_counter()
+        assert router.generate("p", model="m") == "echo:p"
+    assert time.perf_counter() - start < 0.8
+
+
+def test_falls_back_to_least_outstanding(ollama_stubs):
+    first, second = ollama_stubs
+    with RoutingClient([StdlibClient(first.url), StdlibClient(second.url)], ps_interval=None) as router:
+        held = router.stream_generate("held", model="m")
+        next(held)  # one request in flight on the first endpoint
+        assert router.generate("other", model="m") == "echo:other"
+        list(held)
+
+    assert [r["prompt"] for r in first.requests] == ["held"]
+    assert [r["prompt"] for r in second.requests] == ["other"]
+
+
+def test_fails_over_and_sidelines_unhealthy_endpoint(ollama_stub):
+    now = [0.0]
+    router = RoutingClient(
+        [StdlibClient(dead_url()), StdlibClient(ollama_stub.url)],
+        failure_threshold=2, cooldown=10, ps_interval=None, clock=lambda: now[0],
+    )
+    dead = router.endpoints[0]
+
+    # Fresh models, so tie-breaking keeps preferring the dead endpoint until it is sidelined.
+    for i in range(4):
+        assert router.generate(f"p{i}", model=f"m{i}") == f"echo:p{i}"
+    assert dead.failures == 2 and not dead.healthy(now[0])
+    assert len(ollama_stub.requests) == 4
+
+    # After the cooldown it gets a trial request, which trips it again.
+    now[0] = 11.0
+    assert router.generate("again", model="y") == "echo:again"
+    assert dead.failures == 3 and not dead.healthy(now[0])
+    assert all(ep.outstanding == 0 for ep in router.endpoints)
+
+
+def test_deadline_caps_each_endpoint_timeout(ollama_stub):
+    ollama_stub.chunk_delay = 1.0
+    bounded = RoutingClient([StdlibClient(ollama_stub.url, read_timeout=0.1)], ps_interval=None)
+    default = RoutingClient([StdlibClient(ollama_stub.url)], ps_interval=None)
+    assert llm._deadline_timeout(default, 5.0) == {"remaining": 5.0}
+
+    start = time.perf_counter()
+    with pytest.raises(OSError):
+        list(bounded.stream_generate("slow", model="m", remaining=5.0))  # the endpoint's own read bound
+    with pytest.raises(OSError):
+        list(default.stream_generate("slow", model="m", remaining=0.2))  # the budget, not the default bound
+    assert time.perf_counter() - start < 0.8
+    bounded.close()
+    default.close()
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+IMPORT_SCRIPT = """
+import sys
+sys.path.insert(0, "llm-cli")
+import llm
+loaded = set(sys.modules)
+from startup_bench import LAZY_MODULES
+print(sorted(m for m in loaded if m.split(".")[0] in LAZY_MODULES or m in LAZY_MODULES), "llm_client" in loaded)
+"""
+
+
+def test_cold_start_keeps_heavy_imports_lazy():
+    # Which modules load, not how long they take: see llm-cli/startup_bench.py for the timing budget.
+    p = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], text=True, capture_output=True)
+    assert p.stdout.strip() == "[] True", p.stderr
+
+
+VALIDATION_ERROR_SCRIPT = """
+import io, runpy, sys
+sys.argv = ["llm.py", "--json"]
+sys.stdin = io.StringIO('{"nope": 1}')
+sys.path.insert(0, "llm-cli")
+try:
+    runpy.run_path("llm-cli/llm.py", run_name="__main__")
+except SystemExit:
+    pass
+print("requests" in sys.modules, "http.client" in sys.modules)
+"""
+
+
+def test_validation_error_path_skips_http_stack(tmp_path):
+    env = dict(os.environ, LLM_AUDIT_PATH=str(tmp_path / "audit.log"))
+    p = subprocess.run([sys.executable, "-c", VALIDATION_ERROR_SCRIPT], text=True, capture_output=True, env=env)
+    assert p.stdout.strip() == "False False", p.stderr
@@ -0,0 +1,95 @@
+"""Executor payload-hashing benchmark.
+
+Times `execute_envelope` on large envelopes against a reference that derives
+each step's digests the unmemoized way (canonicalize + SHA-256 the payload
+twice per step), and checks that both produce the same digests.
+
+Usage:
+  PYTHONPATH=model-layer python tools/bench/executor_bench.py
+  PYTHONPATH=model-layer python tools/bench/executor_bench.py --steps 10000 --repeat 5 --output bench_output.txt
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from model_layer.executor.executor import _id_for, execute_envelope
+
+
+def _reference_digests(envelope: Dict[str, Any]) -> List[Dict[str, str]]:
+    # Per-step snapshot and double canonicalization, as the executor did before memoization.
+    out = []
+    for step in envelope["steps"]:
+        payload = copy.deepcopy(step.get("payload"))
+        out.append({
+            "result": _id_for({"id": step["id"], "payload": payload}),
+            "payload_hash": _id_for(payload),
+        })
+    return out
+
+
+def _envelopes(steps: int) -> Dict[str, Dict[str, Any]]:
+    shared = {"arr": list(range(200)), "map": {str(i): i for i in range(20)}, "text": "classify this"}
+    return {
+        "shared_payload": {
+            "envelope_id": "bench-shared", "plan_id": "bench",
+            "steps": [{"id": f"s{i}", "payload": shared} for i in range(steps)],
+        },
+        "distinct_payloads": {
+            "envelope_id": "bench-distinct", "plan_id": "bench",
+            "steps": [{"id": f"s{i}", "payload": dict(shared, i=i)} for i in range(steps)],
+        },
+    }
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_bench(steps: int, repeat: int) -> Dict[str, Any]:
+    cases = {}
+    ok = True
+    for name, env in _envelopes(steps).items():
+        trace = execute_envelope(env)
+        digests = [{"result": s["result"], "payload_hash": s["payload_hash"]} for s in trace["steps"]]
+        identical = digests == _reference_digests(env)
+        ok = ok and identical
+
+        executor_sec = _best(lambda: execute_envelope(env), repeat)
+        reference_sec = _best(lambda: _reference_digests(env), repeat)
+        cases[name] = {
+            "executor_sec": round(executor_sec, 4),
+            "reference_sec": round(reference_sec, 4),
+            "speedup": round(reference_sec / executor_sec, 2) if executor_sec else None,
+            "identical_digests": identical,
+        }
+    return {"steps": steps, "repeat": repeat, "ok": ok, "cases": cases}
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--steps", type=int, default=10000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--output", type=str, default=None, help="file path to write summary JSON")
+    args = p.parse_args()
+
+    summary = run_bench(args.steps, args.repeat)
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if not summary["ok"]:
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Executor process-pool benchmark.
+
+Times `execute_envelope(env, workers=N)` against the serial path on a large
+envelope of distinct payloads and checks the traces are identical. Also
+times the part of the work that stays in the parent process: the payload
+snapshot, which is canonical JSON serially and a plain pickle for the pool.
+That share bounds the speedup any number of workers can give (Amdahl).
+
+Worker counts above the usable CPUs are capped by the executor itself
+(`effective_workers`); on a single-CPU machine every run is serial. Pass
+--force-pool to lift the caps and measure the pool regardless.
+
+Usage:
+  PYTHONPATH=model-layer python tools/bench/executor_parallel_bench.py
+  PYTHONPATH=model-layer python tools/bench/executor_parallel_bench.py --steps 20000 --workers 2 4 8 --output bench_output.txt
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from model_layer.executor import executor
+from model_layer.executor.executor import execute_envelope
+
+
+def _envelope(steps: int) -> Dict[str, Any]:
+    return {
+        "envelope_id": "bench-parallel", "plan_id": "bench",
+        "steps": [{"id": f"s{i}", "payload": {"arr": list(range(200)), "map": {str(j): j for j in range(20)},
+                                             "text": "classify this", "i": i}}
+                  for i in range(steps)],
+    }
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_bench(steps: int, workers: List[int], repeat: int) -> Dict[str, Any]:
+    env = _envelope(steps)
+    serial_trace = execute_envelope(env)
+    serial_sec = _best(lambda: execute_envelope(env), repeat)
+
+    snapshot_serial = _best(lambda: executor._snapshot_payloads(env["steps"], {}), repeat)
+    snapshot_pool = _best(lambda: executor._snapshot_for_pool(env["steps"], {}), repeat)
+
+    runs = {}
+    ok = True
+    for n in workers:
+        identical = execute_envelope(env, workers=n) == serial_trace
+        ok = ok and identical
+        sec = _best(lambda: execute_envelope(env, workers=n), repeat)
+        runs[str(n)] = {
+            "effective_workers": executor._pool_workers(n, steps),
+            "sec": round(sec, 4),
+            "speedup": round(serial_sec / sec, 2) if sec else None,
+            "identical_trace": identical,
+        }
+    return {
+        "steps": steps,
+        "repeat": repeat,
+        "cpus": executor._cpu_count(),
+        "serial_sec": round(serial_sec, 4),
+        "parent_snapshot_sec": {"serial": round(snapshot_serial, 4), "pool": round(snapshot_pool, 4)},
+        # Upper bound on pool speedup from the work left in the parent.
+        "max_speedup": round(serial_sec / snapshot_pool, 1) if snapshot_pool else None,
+        "workers": runs,
+        "ok": ok,
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--steps", type=int, default=20000)
+    p.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--force-pool", action="store_true", help="use the pool even beyond the usable CPUs")
+    p.add_argument("--output", type=str, default=None, help="file path to write summary JSON")
+    args = p.parse_args()
+
+    if args.force_pool:
+        executor._cpu_count = lambda: max(args.workers)
+    summary = run_bench(args.steps, args.workers, args.repeat)
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if not summary["ok"]:
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
-import hashlib
 import subprocess
 from typing import Any, Dict, List
 
 
 def _hash(obj: Any) -> str:
-    return hashlib.sha256(json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+    # Imported lazily like the pipeline stages, so tag-baseline works without model_layer.
+    from model_layer.canonical import sha256_hex
+    return sha256_hex(obj)
 
 
 def tag_baseline(name: str = "pre-break") -> None:
@@ -4,12 +4,11 @@ from __future__ import annotations
 
 import argparse
 import json
-import hashlib
 import time
 import traceback
 import resource
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 # --- runtime dependency check ---
 import os
@@ -17,6 +16,8 @@ try:
     from model_layer.planner.planner import build_execution_plan
     from model_layer.orchestrator.orchestrator import build_execution_envelope
     from model_layer.executor.executor import execute_envelope
+    from model_layer.executor.batch import TraceCache, execute_envelopes
+    from model_layer.canonical import sha256_hex
     # Ensure the imported module resolves to the local project, not an external site-packages install.
     import importlib
     _ml = importlib.import_module("model_layer")
@@ -34,19 +35,15 @@ except Exception as _e:
 # --- end runtime dependency check ---
 
 
-def _canonical(obj: Any) -> str:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
-
-
 def _hash(obj: Any) -> str:
-    return hashlib.sha256(_canonical(obj).encode("utf-8")).hexdigest()
+    return sha256_hex(obj)
 
 
-def _run_one(run_id: int, seed: int, prompt: str, adapters: List[Dict[str, Any]], strategy: str, fanout: int, quorum: int) -> Tuple[int, Dict[str, str], str]:
+def _run_one(run_id: int, seed: int, prompt: str, adapters: List[Dict[str, Any]], strategy: str, fanout: int, quorum: int, cache: Optional["TraceCache"] = None) -> Tuple[int, Dict[str, str], str]:
     try:
         plan = build_execution_plan(prompt, adapters, strategy=strategy, fanout=fanout if fanout else None, quorum=quorum if quorum else None, seed=seed)
         envelope = build_execution_envelope(plan, adapters)
-        trace = execute_envelope(envelope)
+        trace = execute_envelope(envelope) if cache is None else execute_envelopes([envelope], cache=cache)[0]
         meta = {"plan_id": plan.get("plan_id"), "envelope_id": envelope.get("envelope_id")}
         th = _hash(trace)
         return (run_id, meta, th)
@@ -54,13 +51,17 @@ def _run_one(run_id: int, seed: int, prompt: str, adapters: List[Dict[str, Any]]
         return (run_id, {"error": repr(e)}, traceback.format_exc())
 
 
-def run_stress(runs: int, workers: int, seed: int, prompt: str, adapters: List[Dict[str, Any]], strategy: str, fanout: int, quorum: int, fail_on_violation: bool = True) -> Dict[str, Any]:
+def run_stress(runs: int, workers: int, seed: int, prompt: str, adapters: List[Dict[str, Any]], strategy: str, fanout: int, quorum: int, fail_on_violation: bool = True, trace_cache: int = 0) -> Dict[str, Any]:
+    # trace_cache > 0 serves repeated envelopes from a shared LRU of that size.
+    # Off by default: a cached trace is not re-executed, so executor
+    # nondeterminism would go unnoticed (planner/orchestrator drift still shows).
     start = time.perf_counter()
     start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cache = TraceCache(trace_cache) if trace_cache else None
 
     results = []
     with ThreadPoolExecutor(max_workers=workers) as ex:
-        futures = {ex.submit(_run_one, i, seed, prompt, adapters, strategy, fanout, quorum): i for i in range(runs)}
+        futures = {ex.submit(_run_one, i, seed, prompt, adapters, strategy, fanout, quorum, cache): i for i in range(runs)}
         for fut in as_completed(futures):
             try:
                 res = fut.result()
@@ -97,6 +98,8 @@ def run_stress(runs: int, workers: int, seed: int, prompt: str, adapters: List[D
         "start_rss": start_rss,
         "peak_rss": peak_rss,
     }
+    if cache is not None:
+        summary["trace_cache"] = cache.stats()
 
     if fail_on_violation and not ok:
         raise RuntimeError(f"Phase3 invariants violated: {reasons}")
@@ -115,6 +118,7 @@ def main() -> None:
     p.add_argument("--quorum", type=int, default=0)
     p.add_argument("--smoke", action="store_true", help="run a small smoke workload and exit")
     p.add_argument("--output", type=str, default=None, help="file path to write summary JSON")
+    p.add_argument("--trace-cache", type=int, default=0, help="serve repeated envelopes from an LRU trace cache of this size")
     args = p.parse_args()
 
     if args.smoke:
@@ -125,7 +129,7 @@ def main() -> None:
 
     print(f"Phase3: runs={args.runs} workers={args.workers} seed={args.seed} strategy={args.strategy} fanout={args.fanout} quorum={args.quorum}")
 
-    summary = run_stress(args.runs, args.workers, args.seed, args.prompt, adapters, args.strategy, args.fanout, args.quorum)
+    summary = run_stress(args.runs, args.workers, args.seed, args.prompt, adapters, args.strategy, args.fanout, args.quorum, trace_cache=args.trace_cache)
 
     print("Summary:", json.dumps(summary, indent=2))
 